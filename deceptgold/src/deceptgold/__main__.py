@@ -1,3 +1,4 @@
+import sys
 import time
 import timeit
 import warnings
@@ -23,55 +24,78 @@ def _get_app_version() -> str:
         return "0.0.0"
 
 
-def init_app():
+# Sub-apps are registered by import path and only imported when their command is dispatched; their help text comes
+# from COMMAND_HELP, which the modules' own App(help=...) also use, so the top-level --help does not import them.
+COMMANDS = (
+    ("user", "deceptgold.commands.user:users_app"),
+    ("service", "deceptgold.commands.service:services_app"),
+    ("notify", "deceptgold.commands.notify:notify_app"),
+    ("ai", "deceptgold.commands.ai:ai_app"),
+    ("reports", "deceptgold.commands.reports:reports_app"),
+    ("dashboard", "deceptgold.commands.dashboard:dashboard_app"),
+)
+
+# Invocations that only print something or query state skip the AI model and telemetry checks. A bare 'deceptgold'
+# still runs them: it is how the model installation is first offered.
+_NO_STARTUP_CHECKS_FLAGS = {"--help", "-h", "--version"}
+_NO_STARTUP_CHECKS_COMMANDS = {"status", "list", "stop", "exec", "profile"}
+
+
+def needs_startup_checks(argv) -> bool:
+    if not argv:
+        return True
+    if _NO_STARTUP_CHECKS_FLAGS.intersection(argv):
+        return False
+    positional = [arg for arg in argv if not arg.startswith("-")]
+    return not _NO_STARTUP_CHECKS_COMMANDS.intersection(positional[1:2])
+
+
+def run_startup_checks():
+    from deceptgold.helper.notify.telemetry.send import exec_telemetry
+    from deceptgold.helper.ai_model import ensure_default_model_installed, list_installed_models
+
+    # Check if AI models are installed, if not show installation interface
+    if not list_installed_models():
+        # Import and run the AI model installation command
+        from deceptgold.commands.ai import install_model
+        try:
+            install_model()
+        except SystemExit:
+            pass  # User may have cancelled installation
+    else:
+        ensure_default_model_installed(interactive=True)
+
+    exec_telemetry()
+
+
+def build_app() -> App:
+    from deceptgold.helper.descripton import COMMAND_HELP, get_description
+
+    app = App(name="DeceptGold", help=get_description(), version=_get_app_version())
+    for name, import_path in COMMANDS:
+        app.command(import_path, name=name, help=COMMAND_HELP[name])
+    return app
+
+
+def init_app(argv=None):
     my_self_developer_fn = None
     try:
         if not hasattr(time, "clock"):
             time.clock = timeit.default_timer
 
-        from deceptgold.helper.descripton import get_description
-        from deceptgold.helper.opencanary.proxy_logger import CustomFileHandler
         from deceptgold.helper.helper import my_self_developer as my_self_developer_fn
-        from deceptgold.helper.message_formatter import MessageFormatter, MessageTemplates
-        from deceptgold.commands.user import users_app
-        from deceptgold.commands.service import services_app
-        from deceptgold.commands.notify import notify_app
-        from deceptgold.commands.ai import ai_app
-        from deceptgold.commands.reports import reports_app
-        from deceptgold.commands.dashboard import dashboard_app
-        from deceptgold.configuration import log
-        from deceptgold.helper.notify.telemetry.send import exec_telemetry
-        from deceptgold.helper.ai_model import ensure_default_model_installed, list_installed_models
 
+        argv = sys.argv[1:] if argv is None else list(argv)
 
         logger = logging.getLogger(__name__)
-        logging.FileHandler = CustomFileHandler
         logger.info("Initialization complete the application.")
 
-        app = App(name="DeceptGold", help=get_description(), version=_get_app_version())
-
-        # Check if AI models are installed, if not show installation interface
-        installed_models = list_installed_models()
-        if not installed_models:
-            # Import and run the AI model installation command
-            from deceptgold.commands.ai import install_model
-            try:
-                install_model()
-            except SystemExit:
-                pass  # User may have cancelled installation
-        else:
-            ensure_default_model_installed(interactive=True)
-
-        exec_telemetry()
-
-        app.command(users_app)
-        app.command(services_app)
-        app.command(notify_app)
-        app.command(ai_app)
-        app.command(reports_app)
-        app.command(dashboard_app)
-
-        app()
+        app = build_app()
+
+        if needs_startup_checks(argv):
+            run_startup_checks()
+
+        app(argv)
 
         if logger:
             logger.info("Finally application!")
@@ -5,6 +5,7 @@ import shutil
 import os
 import subprocess
 import sys
+import threading
 import psutil
 import platform
 from pathlib import Path
@@ -16,11 +17,12 @@ from deceptgold.helper.helper import NAME_FILE_PID
 from deceptgold.configuration.config_manager import get_config
 from deceptgold.helper.ai_model import list_available_models, install_model_by_key, is_interactive
 from deceptgold.helper.message_formatter import MessageTemplates
+from deceptgold.helper.descripton import COMMAND_HELP
 
 
 logger = logging.getLogger(__name__)
 
-ai_app = App(name="ai", help="Local AI agent commands")
+ai_app = App(name="ai", help=COMMAND_HELP["ai"])
 
 
 @ai_app.command(name="select-model", help="Select preferred AI model for threat analysis")
@@ -114,50 +116,75 @@ def _iter_jsonl_follow(
     path: str,
     sleep_s: float = 0.2,
     show_wait_notice: bool = False,
+    start: str = "end",
+    cursor=None,
+    on_idle=None,
 ):
+    """
+    Yields (line, position, caught_up) for the lines of the log, from ``start`` ("start", "end" or "checkpoint",
+    the position saved in ``cursor``). ``caught_up`` is False for the whole backlog present when the follower started
+    and True once live tailing. ``on_idle()`` is called whenever the follower waits for new lines.
+    """
+    from deceptgold.helper.log_follower import READ_SIZE, open_follower
+
     log_path = Path(path)
-    did_notice = False
+    if show_wait_notice and not log_path.exists():
+        print(
+            "AI log follower is waiting for the honeypot log to appear.\n\n"
+            "What this command does:\n"
+            "  - It tails the honeypot JSONL log file and enriches events in real time.\n"
+            "  - When LLM is enabled, it also generates an AI analysis per event.\n\n"
+            "Why nothing is showing yet:\n"
+            "  - The log file does not exist yet, which usually means the honeypot is not running.\n\n"
+            "What you need to do:\n"
+            "  - Start the honeypot/service, then generate traffic (or wait for hits).\n"
+            "  - As soon as the honeypot creates the log file, this command will start streaming events automatically.\n\n"
+            f"Waiting for: {log_path}"
+        )
 
-    while True:
-        if not log_path.exists():
-            if show_wait_notice and not did_notice:
-                print(
-                    "AI log follower is waiting for the honeypot log to appear.\n\n"
-                    "What this command does:\n"
-                    "  - It tails the honeypot JSONL log file and enriches events in real time.\n"
-                    "  - When LLM is enabled, it also generates an AI analysis per event.\n\n"
-                    "Why nothing is showing yet:\n"
-                    "  - The log file does not exist yet, which usually means the honeypot is not running.\n\n"
-                    "What you need to do:\n"
-                    "  - Start the honeypot/service, then generate traffic (or wait for hits).\n"
-                    "  - As soon as the honeypot creates the log file, this command will start streaming events automatically.\n\n"
-                    f"Waiting for: {log_path}"
-                )
-                did_notice = True
+    with open_follower(log_path, start=start, cursor=cursor, poll_interval=sleep_s) as follower:
+        live = False
+        while True:
+            for line, position in follower.poll_entries(READ_SIZE):
+                yield line, position, live
+            if follower.caught_up:
+                live = True
+                if on_idle is not None:
+                    on_idle()
+                follower.wait()
 
-            time.sleep(sleep_s)
-            continue
 
-        try:
-            with open(log_path, "r", encoding="utf-8", errors="ignore") as f:
-                f.seek(0, 2)
-                while True:
-                    line = f.readline()
-                    if not line:
-                        if not log_path.exists():
-                            break
-                        time.sleep(sleep_s)
-                        continue
-                    line = line.strip()
-                    if not line:
-                        continue
-                    yield line
-        except FileNotFoundError:
-            time.sleep(sleep_s)
-            continue
-        except OSError:
-            time.sleep(sleep_s)
-            continue
+def _cache_namespace(model_path) -> str:
+    return f"ai:{Path(str(model_path)).name}"
+
+
+def _llm_handler_factory(llm, model_path, cache=None):
+    """
+    Per analysis worker: the first one uses the already loaded model, the others load their own. Analyses are
+    stored in ``cache`` under the event signature.
+    """
+    from deceptgold.helper.analysis_cache import cacheable_analysis, event_signature
+
+    models = [llm]
+    lock = threading.Lock()
+    namespace = _cache_namespace(model_path)
+
+    def factory():
+        with lock:
+            model = models.pop() if models else None
+        if model is None:
+            model = _load_llm(model_path)
+
+        def analyze(enriched):
+            analysis = _llm_analyze(model, enriched)
+            if cache is not None:
+                evt = enriched.get("event", {})
+                cache.put(namespace, event_signature(evt), cacheable_analysis(analysis, evt))
+            return analysis
+
+        return analyze
+
+    return factory
 
 
 def _service_pid_file() -> str:
@@ -487,6 +514,12 @@ def _llm_analyze(llm, enriched: dict) -> dict:
         "  include-logtypes=3001,4000      Only process selected logtypes\n"
         "  llm=true|false                  Enable local LLM analysis (default: from config ai.enabled)\n"
         "  model=/path/to/model.gguf       Override config ai.model_path\n"
+        "  from=checkpoint|start|end       Where to start reading the log (default: checkpoint, i.e. where the\n"
+        "                                 previous run stopped, or the end of the log on the first run)\n"
+        "  consumer=<name>                 Name of the saved position, for several followers (default: ai)\n"
+        "  workers=<n>                     LLM analysis workers, each with its own model instance\n"
+        "                                 (default: config ai_settings.analysis_workers, 1)\n"
+        "  metrics-port=<port>             Serve the analysis queue depth/lag metrics on localhost:<port>\n"
     ),
 )
 def start(*args):
@@ -511,6 +544,22 @@ def start(*args):
 
     llm_enabled = bool(parsed_args.get("llm", False))
 
+    from deceptgold.helper.log_follower import START_MODES, FollowerCursor
+
+    start_mode = str(parsed_args.get("from") or "checkpoint").strip().lower()
+    if start_mode not in START_MODES:
+        print(f"from must be one of: {', '.join(START_MODES)}")
+        raise SystemExit(1)
+    cursor = FollowerCursor(str(parsed_args.get("consumer") or "ai").strip() or "ai")
+    try:
+        analysis_workers = max(int(parsed_args.get("workers") or get_config("ai_settings", "analysis_workers", 1)), 1)
+        metrics_port = int(parsed_args.get("metrics_port") or 0)
+    except (TypeError, ValueError):
+        print("workers and metrics-port must be numbers")
+        raise SystemExit(1)
+    analysis_queue = None
+    analysis_cache = None
+
     model_path = _find_model_path(parsed_args.get("model"))
 
     llm = None
@@ -615,32 +664,130 @@ def start(*args):
                     f"Waiting for: {log_path}"
                 )
 
-        for raw in _iter_jsonl_follow(log_file, show_wait_notice=False):
+        output_lock = threading.Lock()
+
+        def _emit(enriched: dict, analysis=None, shed_reason=None, flush=True):
+            if analysis is not None:
+                enriched["ai"]["analysis"] = analysis
+            if shed_reason:
+                enriched["ai"]["shed"] = shed_reason
+            line = json.dumps(enriched, ensure_ascii=False)
+            with output_lock:
+                print(line, flush=flush)
+                if out_handle is not None:
+                    out_handle.write(line + "\n")
+                    if flush:
+                        out_handle.flush()
+
+        if llm is not None:
+            from deceptgold.helper.analysis_queue import AnalysisQueue, DEFAULT_MAX_SIZE, DEFAULT_SHED_AT, \
+                DEFAULT_SHED_RULES
+            from deceptgold.helper.metrics import REGISTRY, stats_collector
+            from deceptgold.helper.analysis_cache import analysis_for_event, event_signature, get_analysis_cache
+
+            analysis_cache = get_analysis_cache()
+            analysis_queue = AnalysisQueue(
+                _llm_handler_factory(llm, model_path, analysis_cache),
+                lambda enriched, analysis, shed_reason: _emit(enriched, analysis, shed_reason),
+                max_size=int(get_config("ai_settings", "analysis_queue_size", DEFAULT_MAX_SIZE)),
+                workers=analysis_workers,
+                shed_rules=get_config("ai_settings", "analysis_shed_rules", DEFAULT_SHED_RULES),
+                shed_at=float(get_config("ai_settings", "analysis_shed_at", DEFAULT_SHED_AT)),
+                on_progress=lambda token: cursor.advance(*token),
+            ).start()
+            REGISTRY.register_collector(stats_collector(
+                "deceptgold_analysis_queue", "AI analysis queue", analysis_queue.snapshot,
+                counters=("submitted", "analyzed", "failed", "shed", "evicted", "blocked"),
+                gauges=("depth", "active", "max_depth", "lag_seconds")))
+            if metrics_port:
+                from deceptgold.helper.metrics import start_metrics_server
+                start_metrics_server(port=metrics_port)
+
+        def _done(token):
+            if analysis_queue is not None:
+                analysis_queue.skip(token)
+            else:
+                cursor.advance(*token)
+
+        def _on_idle():
+            # The end of a backlog was written without flushing.
+            with output_lock:
+                sys.stdout.flush()
+                if out_handle is not None:
+                    out_handle.flush()
+            cursor.commit()
+
+        for raw, position, caught_up in _iter_jsonl_follow(log_file, show_wait_notice=False, start=start_mode,
+                                                           cursor=cursor, on_idle=_on_idle):
+            token = (raw, position)
             try:
                 evt = json.loads(raw)
             except Exception:
+                _done(token)
                 continue
 
             enriched = _enrich_event(evt)
             if not _should_process(enriched, include_logtypes):
+                _done(token)
                 continue
 
-            if llm is not None:
-                enriched["ai"]["analysis"] = _llm_analyze(llm, enriched)
-
-            line = json.dumps(enriched, ensure_ascii=False)
-            print(line)
-            if out_handle is not None:
-                out_handle.write(line + "\n")
-                out_handle.flush()
+            if analysis_queue is not None:
+                cached = None
+                if analysis_cache is not None:
+                    cached = analysis_cache.get(_cache_namespace(model_path), event_signature(evt))
+                if cached is not None:
+                    # Same kind of event as one analysed before: no inference.
+                    enriched["ai"]["cached"] = True
+                    _emit(enriched, analysis_for_event(cached, evt), flush=caught_up)
+                    _done(token)
+                else:
+                    # The backlog waits for the workers (nothing is shed); live events may be shed.
+                    analysis_queue.submit(enriched, token, block=not caught_up)
+            else:
+                # While catching up on a backlog, output is flushed by the buffers instead of once per event.
+                _emit(enriched, flush=caught_up)
+                _done(token)
 
     except KeyboardInterrupt:
         return
     finally:
+        if analysis_queue is not None:
+            # Events still queued are not recorded in the cursor and are analysed again by the next run.
+            analysis_queue.stop(drain_timeout=0)
+        cursor.commit()
         if out_handle is not None:
             out_handle.close()
 
 
+@ai_app.command(
+    name="cache-stats",
+    help=(
+        "Show the AI analysis cache: stored analyses and the event signatures reused the most.\n\n"
+        "Optional arguments (key=value):\n"
+        "  limit=<n>                       Number of signatures shown (default: 20)\n"
+    ),
+)
+def cache_stats(*args):
+    from deceptgold.helper.analysis_cache import get_analysis_cache
+
+    parsed_args = parse_args(args)
+    cache = get_analysis_cache()
+    if cache is None:
+        print("The AI analysis cache is disabled (ai_settings.cache_enabled).")
+        return
+    try:
+        limit = max(int(parsed_args.get("limit") or 20), 1)
+    except (TypeError, ValueError):
+        limit = 20
+    print(f"Cached analyses: {cache.entries()} (ttl {int(cache.ttl)} s, {cache.path})")
+    rows = cache.top_signatures(limit)
+    if not rows:
+        return
+    print("Hits  Signature (namespace:logtype|attack_type|service|dst_port|username class|password class)")
+    for key, hits in rows:
+        print(f"{hits:>4}  {key}")
+
+
 @ai_app.command(
     name="install-model",
     help=(
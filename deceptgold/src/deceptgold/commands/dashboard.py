@@ -4,6 +4,7 @@ Web server for the Deceptgold dashboard.
 Serves the HTML page and provides a real-time data API.
 """
 
+import hmac
 import json
 import os
 import secrets
@@ -13,17 +14,24 @@ import subprocess
 import sys
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import parse_qs, urlparse
 import socketserver
 from cyclopts import App
 import qrcode_terminal
 
 from deceptgold.commands.dashboard_handler import DashboardHandler, set_dashboard_token
+from deceptgold.helper.live_stream import get_live_aggregator, serve_event_stream
+from deceptgold.helper.descripton import COMMAND_HELP
+from deceptgold.helper.metrics import read_metrics_from_config
 
 DEFAULT_HOST = "0.0.0.0"
 RUNTIME_DIR = Path("/tmp/deceptgold_dashboard")
 PID_FILE = RUNTIME_DIR / "dashboard.pid"
 STATE_FILE = RUNTIME_DIR / "dashboard_state.json"
-dashboard_app = App(name="dashboard", help="Dashboard commands")
+STREAM_PATH = "/api/stream"
+METRICS_PATH = "/api/metrics"
+dashboard_app = App(name="dashboard", help=COMMAND_HELP["dashboard"])
+_api_token = None
 
 
 class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
@@ -32,6 +40,47 @@ class ThreadedTCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
     daemon_threads = True
 
 
+class StreamingDashboardHandler(DashboardHandler):
+    """
+    Dashboard handler with the live event stream (Server-Sent Events) on /api/stream and the daemon's metrics
+    (JSON) on /api/metrics.
+    """
+
+    def _api_authorized(self, query):
+        if not _api_token:
+            return True
+        supplied = (query.get("token") or [""])[0] or self.headers.get("X-Dashboard-Token", "")
+        authorization = self.headers.get("Authorization", "")
+        if not supplied and authorization.startswith("Bearer "):
+            supplied = authorization[len("Bearer "):]
+        return hmac.compare_digest(supplied.encode("utf-8"), _api_token.encode("utf-8"))
+
+    def _send_json(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Cache-Control", "no-store")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path not in (STREAM_PATH, METRICS_PATH):
+            return super().do_GET()
+        if not self._api_authorized(parse_qs(parsed.query)):
+            self.send_error(401, "Unauthorized")
+            return
+        if parsed.path == STREAM_PATH:
+            serve_event_stream(self, get_live_aggregator())
+            return
+        metrics = read_metrics_from_config()
+        if metrics is None:
+            self._send_json(503, {"error": "The honeypot daemon's metrics endpoint is not reachable."})
+        else:
+            self._send_json(200, metrics)
+
+
 def _ensure_runtime_dir():
     RUNTIME_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -158,10 +207,13 @@ def _build_access_url(host, port, token=None):
 
 def start_dashboard_server(port=8080, host="0.0.0.0", token=None):
     """Start the dashboard server."""
+    global _api_token
     if token:
         set_dashboard_token(token)
+        _api_token = token
     try:
-        with ThreadedTCPServer((host, port), DashboardHandler) as httpd:
+        get_live_aggregator()
+        with ThreadedTCPServer((host, port), StreamingDashboardHandler) as httpd:
             access_url = _build_access_url(host, port, token)
             print("Dashboard started")
             print(f"Static directory: {os.environ.get('DECEPTGOLD_DASHBOARD_DIR', 'default')}")
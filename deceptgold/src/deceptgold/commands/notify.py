@@ -9,11 +9,12 @@ from deceptgold.helper.notify.discord import configure_webhook_discord
 from deceptgold.helper.helper import parse_args, is_valid_url
 from deceptgold.configuration.config_manager import get_config, update_config
 from deceptgold.helper.message_formatter import MessageTemplates
+from deceptgold.helper.descripton import COMMAND_HELP
 
 
 logger = logging.getLogger(__name__)
 
-notify_app = App(name="notify", help="These are the configuration options regarding notifications to be sent to the honeypot administrator.")
+notify_app = App(name="notify", help=COMMAND_HELP["notify"])
 
 
 @notify_app.command(name="--telegram=false", help="To disable sending notifications via telegram.")
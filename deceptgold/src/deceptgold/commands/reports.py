@@ -1,22 +1,21 @@
 import json
 import os
 import logging
-import random
 import sys
 import time
 import itertools
-from collections import Counter
-from datetime import datetime
 from pathlib import Path
 
 from cyclopts import App
 
 from deceptgold.helper.helper import get_temp_log_path, NAME_FILE_LOG
 from deceptgold.helper.ai_model import ensure_model_installed, list_installed_models
+from deceptgold.helper.log_aggregate import aggregate_log
+from deceptgold.helper.heavy_hitters import DEFAULT_CAPACITY
+from deceptgold.helper.descripton import COMMAND_HELP
 
 
 logger = logging.getLogger(__name__)
-_SAMPLE_LIMIT = 40
 
 
 def _is_interactive() -> bool:
@@ -26,15 +25,7 @@ def _is_interactive() -> bool:
         return False
 
 
-def _iter_jsonl_lines_stream(path: Path):
-    with path.open("rb") as f:
-        for bline in f:
-            try:
-                yield bline.decode("utf-8", errors="ignore"), len(bline)
-            except Exception:
-                continue
-
-reports_app = App(name="reports", help="Reports commands")
+reports_app = App(name="reports", help=COMMAND_HELP["reports"])
 
 
 def _load_llm(model_path: str):
@@ -100,6 +91,8 @@ def _build_prompt_payload(aggregates: dict, sample_limit: int):
         "top_paths": _top("top_paths", 10),
         "top_useragents": _top("top_useragents", 8),
     }
+    if aggregates.get("count_error_bounds"):
+        payload["count_error_bounds"] = aggregates["count_error_bounds"]
 
     samples = aggregates.get("event_samples") or []
     if isinstance(samples, list):
@@ -129,274 +122,59 @@ def _build_prompt_payload(aggregates: dict, sample_limit: int):
     return payload
 
 
-def _parse_time(value: str | None):
-    if not value:
-        return None
-    for fmt in (
-        "%Y-%m-%d %H:%M:%S.%f",
-        "%Y-%m-%d %H:%M:%S",
-        "%Y-%m-%dT%H:%M:%S.%f",
-        "%Y-%m-%dT%H:%M:%S",
-    ):
-        try:
-            return datetime.strptime(value, fmt)
-        except Exception:
-            continue
-    return None
-
-
-def _aggregate_jsonl(source_path: Path, max_events: int | None = None):
-    total = 0
-
-    logtype_counter = Counter()
-    src_counter = Counter()
-    dst_port_counter = Counter()
-    service_counter = Counter()
-
-    usernames = Counter()
-    paths = Counter()
-    useragents = Counter()
-    country_counter = Counter()
-    city_counter = Counter()
-    city_country_counter = Counter()
-
-    samples: list[dict] = []
-    seen_events = 0
-
-    first_ts = None
-    last_ts = None
-
-    def _bump(counter: Counter, value):
-        if value is None:
-            return
-        s = str(value).strip()
-        if not s:
-            return
-        counter[s] += 1
-
-    def _parse_event(line: str):
-        line = (line or "").strip()
-        if not line:
-            return None
-        try:
-            evt = json.loads(line)
-        except Exception:
-            return None
-        return evt if isinstance(evt, dict) else None
-
-    def _event_timestamp(evt: dict):
-        return (
-            _parse_time(evt.get("local_time_adjusted"))
-            or _parse_time(evt.get("local_time"))
-            or _parse_time(evt.get("utc_time"))
-        )
-
-    def _add_sample(evt: dict):
-        geo = _extract_geo(evt)
-        sample = {
-            "timestamp": evt.get("timestamp")
-            or evt.get("local_time_adjusted")
-            or evt.get("utc_time")
-            or evt.get("local_time"),
-            "logtype": evt.get("logtype"),
-            "service": evt.get("service"),
-            "src_host": evt.get("src_host"),
-            "src_port": evt.get("src_port"),
-            "dst_host": evt.get("dst_host"),
-            "dst_port": evt.get("dst_port"),
-            "severity": evt.get("severity"),
-            "attack_type": evt.get("attack_type"),
-            "public_ip": evt.get("public_ip"),
-            "country": geo.get("country"),
-            "city": geo.get("city"),
-            "logdata": evt.get("logdata"),
-            "details": evt.get("details"),
-        }
-
-        try:
-            encoded = json.dumps(sample, ensure_ascii=False)
-            if len(encoded) > 1500:
-                sample = {
-                    "timestamp": sample.get("timestamp"),
-                    "logtype": sample.get("logtype"),
-                    "service": sample.get("service"),
-                    "src_host": sample.get("src_host"),
-                    "public_ip": sample.get("public_ip"),
-                    "country": sample.get("country"),
-                    "city": sample.get("city"),
-                    "dst_port": sample.get("dst_port"),
-                    "attack_type": sample.get("attack_type"),
-                    "logdata": sample.get("logdata"),
-                }
-        except Exception:
-            sample = {
-                "timestamp": evt.get("timestamp"),
-                "logtype": evt.get("logtype"),
-                "service": evt.get("service"),
-                "src_host": evt.get("src_host"),
-                "public_ip": evt.get("public_ip"),
-                "country": geo.get("country"),
-                "city": geo.get("city"),
-                "dst_port": evt.get("dst_port"),
-                "attack_type": evt.get("attack_type"),
-            }
-
-        nonlocal seen_events
-        seen_events += 1
-        if len(samples) < _SAMPLE_LIMIT:
-            samples.append(sample)
-            return
-
-        j = random.randrange(seen_events)
-        if j < _SAMPLE_LIMIT:
-            samples[j] = sample
-
-    def _extract_geo(evt: dict) -> dict:
-        def _pick(*values):
-            for value in values:
-                if value is None:
-                    continue
-                text = str(value).strip()
-                if text:
-                    return text
-            return None
-
-        details = evt.get("details")
-        details = details if isinstance(details, dict) else {}
-        logdata = evt.get("logdata")
-        logdata = logdata if isinstance(logdata, dict) else {}
-
-        country = _pick(
-            evt.get("country"),
-            evt.get("country_name"),
-            evt.get("geo_country"),
-            details.get("country"),
-            details.get("country_name"),
-            details.get("geo_country"),
-            logdata.get("country"),
-            logdata.get("country_name"),
-            logdata.get("geo_country"),
-        )
-        city = _pick(
-            evt.get("city"),
-            evt.get("geo_city"),
-            details.get("city"),
-            details.get("geo_city"),
-            logdata.get("city"),
-            logdata.get("geo_city"),
-        )
-        return {"country": country, "city": city}
-
+def _aggregate_jsonl(source_path: Path, max_events: int | None = None, incremental: bool = True, workers: int = 1,
+                     approximate: int | None = None):
+    """
+    Aggregate the honeypot log. Runs resume from the checkpoint in REPORT_STATE_PATH and only parse what was
+    appended since; incremental=False aggregates the whole log again. workers > 1 parses large logs in parallel.
+    approximate=<capacity> counts sources, cities, usernames, paths and user agents in fixed memory.
+    """
+    interactive = _is_interactive()
     total_bytes = 0
     try:
         total_bytes = source_path.stat().st_size
     except Exception:
         total_bytes = 0
 
-    if _is_interactive():
+    if interactive:
         try:
             mb = total_bytes / (1024 * 1024)
             print(f"Parsing log: {mb:.1f} MB", flush=True)
         except Exception:
             pass
 
-    processed = 0
-    bytes_read = 0
     last_progress = 0.0
-    for line, nbytes in _iter_jsonl_lines_stream(source_path):
-        if max_events is not None and total >= max_events:
-            break
-
-        evt = _parse_event(line)
-        if evt is None:
-            continue
-
-        total += 1
-        processed += 1
-        bytes_read += nbytes
-
-        _bump(logtype_counter, evt.get("logtype"))
-        _bump(src_counter, evt.get("src_host"))
-
-        dst_port = evt.get("dst_port")
-        if dst_port not in (None, -1, "-1"):
-            _bump(dst_port_counter, dst_port)
-        _bump(service_counter, evt.get("service"))
-
-        geo = _extract_geo(evt)
-        country = geo.get("country")
-        city = geo.get("city")
-        if country:
-            _bump(country_counter, country)
-        if city:
-            _bump(city_counter, city)
-        if city and country:
-            _bump(city_country_counter, f"{city}, {country}")
-
-        logdata = evt.get("logdata")
-        if isinstance(logdata, dict):
-            _bump(usernames, logdata.get("USERNAME"))
-            _bump(paths, logdata.get("PATH"))
-            ua = logdata.get("USERAGENT")
-            if ua:
-                useragents[str(ua)[:200]] += 1
-
-        ts = _event_timestamp(evt)
-        if ts is not None:
-            if first_ts is None or ts < first_ts:
-                first_ts = ts
-            if last_ts is None or ts > last_ts:
-                last_ts = ts
-
-        _add_sample(evt)
-
-        if _is_interactive():
-            now = time.monotonic()
-            if processed == 1 or (now - last_progress) >= 0.25 or processed % 2500 == 0:
-                last_progress = now
-                if total_bytes > 0:
-                    pct = (bytes_read / total_bytes) * 100
-                    print(
-                        f"Parsing log: {bytes_read}/{total_bytes} bytes ({pct:5.1f}%)",
-                        end="\r",
-                        flush=True,
-                    )
-                else:
-                    print(f"Parsing log: {processed} events", end="\r", flush=True)
 
-    if _is_interactive():
+    def _progress(bytes_read, bytes_total, events):
+        nonlocal last_progress
+        now = time.monotonic()
+        if (now - last_progress) < 0.25:
+            return
+        last_progress = now
+        if bytes_total > 0:
+            pct = (bytes_read / bytes_total) * 100
+            print(f"Parsing log: {bytes_read}/{bytes_total} bytes ({pct:5.1f}%)", end="\r", flush=True)
+        else:
+            print(f"Parsing log: {events} events", end="\r", flush=True)
+
+    aggregate = aggregate_log(source_path, incremental=incremental, max_events=max_events,
+                              progress=_progress if interactive else None, workers=workers,
+                              approximate=approximate)
+
+    if interactive:
         print("".ljust(80), end="\r", flush=True)
-        print(f"Parsing done: {processed} events", flush=True)
-
-    def _as_items(counter: Counter, limit: int):
-        return [{"value": k, "count": v} for (k, v) in counter.most_common(limit)]
-
-    return {
-        "total_events": total,
-        "time_range": {
-            "first": first_ts.isoformat() if first_ts else None,
-            "last": last_ts.isoformat() if last_ts else None,
-        },
-        "top_logtypes": _as_items(logtype_counter, 15),
-        "top_sources": _as_items(src_counter, 30),
-        "top_countries": _as_items(country_counter, 20),
-        "top_cities": _as_items(city_counter, 25),
-        "top_city_country": _as_items(city_country_counter, 25),
-        "top_dst_ports": _as_items(dst_port_counter, 15),
-        "top_services": _as_items(service_counter, 15),
-        "top_usernames": _as_items(usernames, 20),
-        "top_paths": _as_items(paths, 20),
-        "top_useragents": _as_items(useragents, 10),
-        "event_samples": samples,
-        "schema_notes": {
-            "top_logtypes": "Tipos de evento (evt.logtype).",
-            "top_sources": "Valores de evt.src_host (podem ser IPs, vazios ou outros identificadores dependendo do evento).",
-            "top_countries": "Países de origem quando presentes nos eventos.",
-            "top_cities": "Cidades de origem quando presentes nos eventos.",
-            "top_city_country": "Combinação cidade, país para distribuição geográfica de origem.",
-            "event_samples": "Amostra limitada de eventos brutos (campos principais) para que a IA infira técnicas e recomendações sem heurísticas no código.",
-        },
+        print(f"Parsing done: {aggregate.total} events", flush=True)
+
+    result = aggregate.result()
+    result["schema_notes"] = {
+        "top_logtypes": "Tipos de evento (evt.logtype).",
+        "top_sources": "Valores de evt.src_host (podem ser IPs, vazios ou outros identificadores dependendo do evento).",
+        "top_countries": "Países de origem quando presentes nos eventos.",
+        "top_cities": "Cidades de origem quando presentes nos eventos.",
+        "top_city_country": "Combinação cidade, país para distribuição geográfica de origem.",
+        "event_samples": "Amostra limitada de eventos brutos (campos principais) para que a IA infira técnicas e recomendações sem heurísticas no código.",
     }
+    return result
 
 
 def _prompt_report(aggregates: dict) -> dict:
@@ -609,6 +387,11 @@ def _write_pdf(dest: Path, markdown_text: str):
         "  model=<key>                     Model key to use (same keys shown in 'deceptgold ai install-model').\n"
         "                                 If not provided: uses the only installed model, or prompts if multiple are installed.\n"
         "                                 You can also set DECEPTGOLD_AI_MODEL=<key>.\n"
+        "  rebuild=true                    Aggregate the whole log again instead of resuming from the last run.\n"
+        "  workers=<n>                     Processes used to parse large logs (default: number of CPUs).\n"
+        "  approximate=true|<n>            Count top sources/usernames/paths/... in fixed memory (n keys per\n"
+        "                                 dimension, default 1000). Counts are then upper bounds; the error bound\n"
+        "                                 is included in the aggregate.\n"
     ),
 )
 def ai_report(*args):
@@ -619,16 +402,33 @@ def ai_report(*args):
     dest = parsed.get("dest")
     fmt = (parsed.get("format") or "").strip().lower()
     model_key_arg = (parsed.get("model") or "").strip()
+    rebuild = parsed.get("rebuild") is True
+    try:
+        workers = max(int(parsed.get("workers") or os.cpu_count() or 1), 1)
+    except (TypeError, ValueError):
+        print("workers must be a positive integer")
+        raise SystemExit(1)
+    approximate = parsed.get("approximate")
+    if approximate is True:
+        approximate = DEFAULT_CAPACITY
+    elif approximate is False or approximate is None:
+        approximate = None
+    else:
+        try:
+            approximate = max(int(approximate), 1)
+        except ValueError:
+            print("approximate must be true or a number of tracked keys")
+            raise SystemExit(1)
 
-    allowed_keys = {"dest", "format", "model"}
+    allowed_keys = {"dest", "format", "model", "rebuild", "workers", "approximate"}
     unknown = sorted(set(parsed.keys()) - allowed_keys)
     if unknown:
         print(f"Unknown arguments: {', '.join(unknown)}")
-        print("Usage: deceptgold reports ai-report dest=/path/to/output format=markdown|pdf [model=<key>]")
+        print("Usage: deceptgold reports ai-report dest=/path/to/output format=markdown|pdf [model=<key>] [rebuild=true] [workers=<n>] [approximate=true|<n>]")
         raise SystemExit(1)
 
     if not dest or fmt not in {"markdown", "pdf"}:
-        print("Usage: deceptgold reports ai-report dest=/path/to/output format=markdown|pdf [model=<key>]")
+        print("Usage: deceptgold reports ai-report dest=/path/to/output format=markdown|pdf [model=<key>] [rebuild=true] [workers=<n>] [approximate=true|<n>]")
         raise SystemExit(1)
 
     source_path = Path(get_temp_log_path(NAME_FILE_LOG))
@@ -680,7 +480,8 @@ def ai_report(*args):
 
     model_path = str(installed)
 
-    aggregates = _aggregate_jsonl(source_path, max_events=None)
+    aggregates = _aggregate_jsonl(source_path, max_events=None, incremental=not rebuild, workers=workers,
+                                 approximate=approximate)
 
     llm = _load_llm(model_path)
 
@@ -840,3 +641,51 @@ def ai_report(*args):
         _write_pdf(dest_path, report_md)
         print(f"Report written to: {dest_path}")
         return
+
+
+@reports_app.command(
+    name="top",
+    help=(
+        "Show the most frequent values of an event field from the columnar event archive.\n\n"
+        "Optional arguments (key=value):\n"
+        "  field=src_host|service|logtype|dst_port   Field to rank (default: src_host)\n"
+        "  hours=<n>                       Only events of the last n hours (default: all)\n"
+        "  logtype=<n>                     Only events of this logtype\n"
+        "  limit=<n>                       Number of values shown (default: 10)\n"
+        "  compact=false                   Query the archive as is, without compacting the log first.\n"
+    ),
+)
+def top(*args):
+    from datetime import datetime, timedelta
+    from deceptgold.helper.helper import parse_args
+    from deceptgold.helper.event_archive import COLUMNS, archive_from_config
+
+    parsed = parse_args(args)
+    unknown = sorted(set(parsed.keys()) - {"field", "hours", "logtype", "limit", "compact"})
+    field = str(parsed.get("field") or "src_host")
+    if unknown or field not in COLUMNS:
+        print("Usage: deceptgold reports top [field=src_host|service|logtype|dst_port] [hours=<n>] [logtype=<n>] "
+              "[limit=<n>] [compact=false]")
+        raise SystemExit(1)
+    try:
+        # parse_args turns 1/0 into booleans; they are numbers here.
+        limit = max(int(parsed.get("limit") or 10), 1)
+        hours = float(parsed["hours"]) if "hours" in parsed else None
+        logtype = int(parsed["logtype"]) if "logtype" in parsed else None
+    except (TypeError, ValueError):
+        print("limit, hours and logtype must be numbers")
+        raise SystemExit(1)
+
+    archive = archive_from_config()
+    source_path = Path(get_temp_log_path(NAME_FILE_LOG))
+    if parsed.get("compact") is not False and source_path.exists():
+        archive.compact(source_path)
+
+    since = datetime.now() - timedelta(hours=hours) if hours is not None else None
+    rows = archive.top(field, limit=limit, since=since, logtype=logtype)
+    if not rows:
+        print("No archived events match.")
+        return
+    width = max(len(str(value)) for value, _ in rows)
+    for value, count in rows:
+        print(f"{str(value):<{width}}  {count}")
@@ -16,10 +16,9 @@ from rich import box
 
 from deceptgold.configuration.opecanary import generate_config, toggle_config, PATH_CONFIG_OPENCANARY
 from deceptgold.configuration.config_manager import get_config
-from deceptgold.helper.opencanary.help_opencanary import start_opencanary_internal
 from deceptgold.helper.helper import parse_args, my_self_developer, get_temp_log_path, check_open_port
 from deceptgold.helper.helper import NAME_FILE_LOG, NAME_FILE_PID
-from deceptgold.helper.notify.notify import check_send_notify
+from deceptgold.helper.descripton import COMMAND_HELP
 
 
 hidden_group = Group(name="Hidden group", show=False)
@@ -30,7 +29,7 @@ i_dev = my_self_developer()
 #     from memory_profiler import profile
 
 
-services_app = App(name="service", help="Module service available")
+services_app = App(name="service", help=COMMAND_HELP["service"])
 
 PID_FILE = get_temp_log_path(NAME_FILE_PID)
 LOG_FILE = get_temp_log_path(NAME_FILE_LOG)
@@ -83,6 +82,9 @@ def start(*args):
 
     msg_already_run = "The service is already running. Consider using the 'service stop' command to stop it from running if necessary."
     if not daemon:
+        # Heavy imports (opencanary, twisted, notification clients) are only needed by the honeypot process itself.
+        from deceptgold.helper.opencanary.help_opencanary import start_opencanary_internal
+        from deceptgold.helper.notify.notify import check_send_notify
         try:
             if not recall:
                 if os.path.exists(PID_FILE):
@@ -315,6 +317,47 @@ def list_services():
 
 
 
+@services_app.command(name="profile")
+def profile(action: Annotated[str, Parameter(help="'toggle' switches request profiling on/off in the running daemon, 'dump' writes the collected samples.")] = "dump"):
+    """
+    Control the request profiler of the running daemon (Unix only; signals SIGUSR1/SIGUSR2).
+    Example: deceptgold service profile toggle
+    """
+    import signal
+    import time
+    from deceptgold.helper.profiling import PROFILE_DUMP_PATH
+
+    if not hasattr(signal, 'SIGUSR1'):
+        print("Request profiling control is not available on this operating system.")
+        return
+    if action not in ('toggle', 'dump'):
+        print(f"Unknown action '{action}'. Use 'toggle' or 'dump'.")
+        return
+    try:
+        with open(PID_FILE, 'r') as f:
+            pid = int(f.read())
+    except Exception:
+        print("No running DeceptGold daemon found.")
+        return
+
+    previous = os.path.getmtime(PROFILE_DUMP_PATH) if os.path.exists(PROFILE_DUMP_PATH) else None
+    try:
+        os.kill(pid, signal.SIGUSR1 if action == 'toggle' else signal.SIGUSR2)
+    except Exception as e:
+        print(f"Unable to signal the DeceptGold daemon (PID: {pid}). {e}")
+        return
+    if action == 'toggle':
+        print(f"Request profiling toggled in the DeceptGold daemon (PID: {pid}). Check {LOG_FILE} for the new state.")
+        return
+
+    for _ in range(50):
+        if os.path.exists(PROFILE_DUMP_PATH) and os.path.getmtime(PROFILE_DUMP_PATH) != previous:
+            print(f"Profile written to {PROFILE_DUMP_PATH}")
+            return
+        time.sleep(0.1)
+    print(f"The daemon did not write a profile yet. Check {LOG_FILE}.")
+
+
 @services_app.command(name="--node_id", help="Provide the desired name for recognition of this machine for the entire deceptgold system.")
 def register(node_id: Annotated[str, Parameter(help="The default recognized name is the hostname configured in your system's environment variables.")]):
     # Reuse of the configuration function. It is due to the reuse of code that the service name is device.
@@ -4,12 +4,12 @@ import json
 
 from cyclopts import App, Parameter, Group
 from typing import Annotated
-from web3 import Web3
 
-from deceptgold.configuration.config_manager import update_config, get_config
+from deceptgold.configuration.config_manager import update_config, get_config, config_batch
+from deceptgold.helper.descripton import COMMAND_HELP
 logger = logging.getLogger(__name__)
 
-users_app = App(name="user", help="User management")
+users_app = App(name="user", help=COMMAND_HELP["user"])
 
 hidden_group = Group(name="Hidden commands", show=False)
 
@@ -28,12 +28,13 @@ def register(my_address: Annotated[str, Parameter(help="User's wallet address. U
     Mandatory command to collect your rewards
     :param my_address: your address wallet pattern ERC20 example: 0x0105d8Ceab792bfece1b2994B71992Af56930081
     """
-    update_config("address", my_address, module_name='user')
+    with config_batch():
+        update_config("address", my_address, module_name='user')
 
-    update_config('net_rpc', 'https://data-seed-prebsc-1-s1.binance.org:8545/', 'blockchain')
-    update_config('key_public_expected_signer', '0xfA6a145a7e1eF7367888A39CBf68269625C489D2', 'blockchain')
-    update_config('contract_token_address', '0x606c0fE69D437F42BfC11D3eec82F596cC02C02a', 'blockchain')
-    update_config('contract_validator_address', '0x12485DAE42bFc5bF625f4Da5738847e79CFe2cAD', 'blockchain')
+        update_config('net_rpc', 'https://data-seed-prebsc-1-s1.binance.org:8545/', 'blockchain')
+        update_config('key_public_expected_signer', '0xfA6a145a7e1eF7367888A39CBf68269625C489D2', 'blockchain')
+        update_config('contract_token_address', '0x606c0fE69D437F42BfC11D3eec82F596cC02C02a', 'blockchain')
+        update_config('contract_validator_address', '0x12485DAE42bFc5bF625f4Da5738847e79CFe2cAD', 'blockchain')
 
 @users_app.command(name="--show-balance", help="Show deceptgold wallet value balance.")
 def show_balance():
@@ -44,6 +45,9 @@ def show_balance():
     if not address_user:
         print('It is not possible to check the balance of your deceptgold tokens without having your wallet address previously configured. Please configure it using "user --my-address <public_address>". Then you can call the command "user --show-balance"')
         return None
+
+    from web3 import Web3
+
     w3 = Web3(Web3.HTTPProvider(get_config('blockchain', 'net_rpc')))
     try:
         root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "resources"))
@@ -62,4 +66,17 @@ def show_balance():
         print(f"Balance (base units): {balance}")
         print(f"Explorer: https://testnet.bscscan.com/address/{user_address}")
     except Exception as e:
-        print(f"[handle_balance] Erro: {e}")
\ No newline at end of file
+        print(f"[handle_balance] Erro: {e}")
+
+@users_app.command(name="--check-network", help="Check the connection to the blockchain RPC and reward contracts.")
+def check_network():
+    """
+    Connect to the configured RPC endpoint and report its health. Rewards are only claimed when this succeeds.
+    """
+    from deceptgold.helper.blockchain.client import get_blockchain_client
+
+    status = get_blockchain_client().health_check()
+    if status['connected']:
+        print(f"RPC: {status['rpc']} (chain {status['chain_id']}, block {status['block_number']}, {status['latency_ms']} ms)")
+    else:
+        print(f"RPC: {status['rpc']} unavailable after {status['latency_ms']} ms: {status['error']}")
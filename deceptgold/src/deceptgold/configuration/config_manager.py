@@ -1,13 +1,173 @@
-import inspect
+import contextlib
+import copy
 import logging
 import os
 import json
+import stat
+import sys
+import tempfile
+import threading
 from pathlib import Path
 
+from deceptgold.helper import inotify
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
 logging = logging.getLogger(__name__)
 
 CONFIG_PATH = Path.home() / ".deceptgold.conf"
 
+_stores = {}
+_stores_lock = threading.Lock()
+_watcher = None
+_watcher_lock = threading.Lock()
+_batch = threading.local()
+
+
+class _ConfigStore:
+    """
+    Parsed view of one config file, served from memory.
+
+    When the file is watched by inotify the cached dict is reused until an event for the file arrives. Otherwise the
+    file is stat'ed on each read and re-parsed only when its inode, mtime or size changed.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.watched = False
+        self._lock = threading.Lock()
+        self._data = None
+        self._signature = None
+        self._changed = True
+        self._decoded = {}
+
+    def _stat_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def invalidate(self):
+        self._changed = True
+
+    def snapshot(self) -> dict:
+        data = self._data
+        if self.watched and not self._changed and data is not None:
+            return data
+
+        with self._lock:
+            self._changed = False
+            signature = self._stat_signature()
+            if self._data is not None and signature == self._signature and not self.watched:
+                return self._data
+
+            data = {}
+            if signature is not None and signature[2] > 0:
+                try:
+                    with open(self.path, "r") as file_config:
+                        data = json.load(file_config)
+                except Exception:
+                    self._changed = True
+                    raise
+            self._data = data
+            self._signature = signature
+            self._decoded = {}
+            return data
+
+    def replace(self, data: dict):
+        """Write-through after this process rewrote the file."""
+        with self._lock:
+            self._data = data
+            self._signature = self._stat_signature()
+            self._decoded = {}
+
+    def decoded(self, module_name: str, key: str, passwd: str, value):
+        cache_key = (module_name, key, passwd, value)
+        result = self._decoded.get(cache_key)
+        if result is None:
+            result = decode(value, passwd)
+            self._decoded[cache_key] = result
+        return result
+
+
+class _ConfigWatcher:
+    """Single background thread mapping inotify events on config directories to store invalidations."""
+
+    def __init__(self, notifier):
+        self._notifier = notifier
+        self._lock = threading.Lock()
+        self._dirs = {}
+        self._stores = {}
+        self._thread = threading.Thread(target=self._run, name="deceptgold-config-watch", daemon=True)
+        self._thread.start()
+
+    def watch(self, store: _ConfigStore) -> bool:
+        directory = str(store.path.parent)
+        with self._lock:
+            wd = self._dirs.get(directory)
+            if wd is None:
+                try:
+                    wd = self._notifier.add_watch(directory, inotify.IN_FILE_CHANGES | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF)
+                except OSError:
+                    return False
+                self._dirs[directory] = wd
+            self._stores[(wd, store.path.name)] = store
+        return True
+
+    def _run(self):
+        while True:
+            try:
+                events = self._notifier.read_events(timeout=None)
+            except Exception:
+                return
+            for wd, mask, _, name in events:
+                with self._lock:
+                    if mask & inotify.IN_Q_OVERFLOW:
+                        affected = list(self._stores.values())
+                    elif mask & (inotify.IN_IGNORED | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF):
+                        affected = [s for (w, _), s in self._stores.items() if w == wd]
+                        for store in affected:
+                            store.watched = False
+                    else:
+                        store = self._stores.get((wd, name))
+                        affected = [store] if store else []
+                for store in affected:
+                    store.invalidate()
+
+
+def _get_watcher():
+    global _watcher
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                notifier = inotify.open_inotify()
+                _watcher = _ConfigWatcher(notifier) if notifier else False
+    return _watcher
+
+
+def _get_store(config_file) -> _ConfigStore:
+    path = Path(os.path.abspath(config_file))
+    store = _stores.get(path)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(path)
+            if store is None:
+                store = _ConfigStore(path)
+                watcher = _get_watcher()
+                if watcher and path.parent.is_dir():
+                    store.watched = watcher.watch(store)
+                _stores[path] = store
+    return store
+
 
 def encode(data, passwd):
     return ''.join(chr(ord(c) ^ ord(passwd[i % len(passwd)])) for i, c in enumerate(data))
@@ -16,32 +176,127 @@ def decode(data, passwd):
     return encode(data, passwd)
 
 
-def update_config(key: str, value: str, module_name=None, passwd=None, config_file=None):
+def _merge_updates(target: dict, updates: dict):
+    for module_name, values in updates.items():
+        if not isinstance(target.get(module_name), dict):
+            target[module_name] = {}
+        target[module_name].update(values)
+
+
+@contextlib.contextmanager
+def _file_lock(config_file: Path):
+    """Advisory lock on a sidecar file, shared by the daemon, the AI follower and the dashboard."""
+    fd = os.open(f"{config_file}.lock", os.O_RDWR | os.O_CREAT, 0o600)
     try:
-        if not config_file:
-            config_file = CONFIG_PATH
-        config_file = Path(config_file)
-        caller_frame = inspect.stack()[1]
-        caller_filename = os.path.basename(caller_frame.filename)
-        if not module_name:
-            module_name = os.path.splitext(caller_filename)[0]
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+        yield
+    finally:
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+
+def _atomic_write_json(config_file: Path, data: dict):
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{config_file.name}.", suffix=".tmp", dir=config_file.parent)
+    try:
+        with os.fdopen(fd, "w") as file_config:
+            json.dump(data, file_config, indent=4)
+            file_config.flush()
+            os.fsync(file_config.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(config_file).st_mode))
+        except OSError:
+            pass
+        os.replace(tmp_path, config_file)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if hasattr(os, "O_DIRECTORY"):
+        try:
+            dir_fd = os.open(config_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        except OSError:
+            pass
+
 
+def _commit(config_file: Path, updates: dict):
+    """Read-modify-write under the file lock, so concurrent writers never lose each other's keys."""
+    with _file_lock(config_file):
         config = {}
         if config_file.exists() and config_file.stat().st_size > 0:
             with open(config_file, "r") as file_config:
                 config = json.load(file_config)
+        _merge_updates(config, updates)
+        _atomic_write_json(config_file, config)
+    _get_store(config_file).replace(config)
 
-        if module_name not in config:
-            config[module_name] = {}
+
+@contextlib.contextmanager
+def config_batch():
+    """
+    Group several update_config calls into one locked, atomic write per file.
+
+    Example:
+        with config_batch():
+            update_config('net_rpc', url, 'blockchain')
+            update_config('contract_token_address', address, 'blockchain')
+    """
+    outer = getattr(_batch, "updates", None)
+    if outer is not None:
+        yield
+        return
+
+    _batch.updates = {}
+    try:
+        yield
+    finally:
+        updates, _batch.updates = _batch.updates, None
+        for path, file_updates in updates.items():
+            try:
+                _commit(path, file_updates)
+            except Exception as error:
+                logging.error(f"Unable to write configuration file {path}: {error}")
+
+
+def update_config(key: str, value: str, module_name=None, passwd=None, config_file=None):
+    """
+    Set one key. The write is atomic (temp file + fsync + rename) and serialized by an advisory file lock; use
+    config_batch() to coalesce several keys into one write.
+    """
+    try:
+        if not config_file:
+            config_file = CONFIG_PATH
+        config_file = Path(os.path.abspath(config_file))
+        if not module_name:
+            # One frame up is the caller; unlike inspect.stack() this does not walk the stack or read source files.
+            module_name = os.path.splitext(os.path.basename(sys._getframe(1).f_code.co_filename))[0]
 
         if passwd:
             value = encode(value, passwd)
 
-        config[module_name][key] = value
+        updates = {module_name: {key: value}}
 
-        with open(config_file, "w") as file_config:
-            json.dump(config, file_config, indent=4)
+        batch = getattr(_batch, "updates", None)
+        if batch is not None:
+            _merge_updates(batch.setdefault(config_file, {}), updates)
+            return True
 
+        _commit(config_file, updates)
         return True
     except Exception as ex:
         return False
@@ -49,17 +304,18 @@ def update_config(key: str, value: str, module_name=None, passwd=None, config_fi
 def get_config(module_name_honeypot: str, key: str, default=None, passwd=None, file_config=None):
     if not file_config:
         file_config = CONFIG_PATH
-    file_config = Path(file_config)
+    store = _get_store(file_config)
     try:
-        if file_config.exists() and file_config.stat().st_size > 0:
-            with open(file_config, "r") as file_config_honeypot:
-                config_honeypot = json.load(file_config_honeypot)
-                result = config_honeypot[module_name_honeypot][key]
-                if not passwd or result == default:
-                    return result
-                else:
-                    return decode(config_honeypot.get(module_name_honeypot, {}).get(key, default), passwd)
-        return default
+        config_honeypot = store.snapshot()
+        if not config_honeypot:
+            return default
+        result = config_honeypot[module_name_honeypot][key]
+        if isinstance(result, (dict, list)):
+            result = copy.deepcopy(result)
+        if not passwd or result == default:
+            return result
+        else:
+            return store.decoded(module_name_honeypot, key, passwd, result)
     except KeyError:
         return default
     except:
@@ -0,0 +1,282 @@
+"""
+Cache of AI analyses keyed on a normalised event signature.
+
+Honeypot traffic repeats itself: the same scanner on the same port, the same admin/admin attempts. An analysis is
+stored under the event's signature (logtype, attack type, service, destination port and the class of the credentials
+tried, never the credentials or the source themselves), so a repeated event reuses it instead of running the model.
+
+Because the signature leaves the source and the credentials out, so must the cached value: only the
+source-independent part of an analysis (summary, recommended actions) is stored, an analysis that quotes the source or
+the credentials is not stored at all, and indicators of compromise are rebuilt from the event being analysed.
+
+Entries live in an in-memory LRU in front of a SQLite file shared by the daemon and the AI follower; both tiers
+expire entries after a TTL. Hits per signature are kept in the SQLite file so the signature can be tuned.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = Path.home() / ".deceptgold" / "analysis_cache.sqlite3"
+DEFAULT_TTL = 24 * 3600
+DEFAULT_MEMORY_SIZE = 1024
+DEFAULT_MAX_ROWS = 50000
+HIT_FLUSH_EVERY = 100
+
+PRIVILEGED_USERNAMES = {"admin", "root", "administrator", "sa", "postgres", "oracle", "ubuntu", "pi", "user", "test"}
+COMMON_PASSWORDS = {"admin", "password", "123456", "12345", "1234", "root", "guest", "toor", "qwerty", "12345678",
+                    "123456789", "test", "changeme", "default", "letmein"}
+
+
+def _username_class(username) -> str:
+    if not username or username == "unknown":
+        return "none"
+    return "privileged" if str(username).lower() in PRIVILEGED_USERNAMES else "other"
+
+
+def _password_class(password, username=None) -> str:
+    if not password or password == "unknown":
+        return "none"
+    password = str(password)
+    lowered = password.lower()
+    if username and lowered == str(username).lower():
+        return "same_as_user"
+    if lowered in COMMON_PASSWORDS:
+        return "common"
+    if password.isdigit():
+        return "numeric"
+    if len(password) < 6:
+        return "short"
+    if password.isalpha():
+        return "alpha"
+    if password.isalnum():
+        return "alnum"
+    return "complex"
+
+
+def event_signature(evt: dict) -> str:
+    """Normalised signature of an event: what it is, not who sent it."""
+    username, password = _credentials(evt)
+    parts = (
+        evt.get("logtype"),
+        evt.get("attack_type"),
+        evt.get("service"),
+        evt.get("dst_port"),
+        _username_class(username),
+        _password_class(password, username),
+    )
+    return "|".join("" if part is None else str(part).strip().lower() for part in parts)
+
+
+CACHEABLE_FIELDS = ("summary", "recommended_actions")
+# Shorter values (e.g. a one-letter username) would match unrelated text.
+MIN_IDENTIFYING_LENGTH = 3
+
+
+def _credentials(evt: dict):
+    logdata = evt.get("logdata")
+    logdata = logdata if isinstance(logdata, dict) else {}
+    return evt.get("username") or logdata.get("USERNAME"), evt.get("password") or logdata.get("PASSWORD")
+
+
+def identifying_values(evt: dict) -> set:
+    """The source and credentials of an event, which a cached analysis must not carry over to another event."""
+    values = {evt.get("src_host"), *_credentials(evt)}
+    return {str(value) for value in values
+            if value and value != "unknown" and len(str(value)) >= MIN_IDENTIFYING_LENGTH}
+
+
+def mentions_any(text, values) -> bool:
+    text = str(text or "")
+    return any(value in text for value in values)
+
+
+def event_iocs(evt: dict) -> list:
+    """Indicators of compromise of this event: its source and the credentials it tried."""
+    iocs = [str(evt["src_host"])] if evt.get("src_host") else []
+    username, password = _credentials(evt)
+    if username or password:
+        iocs.append(f"{username or ''}:{password or ''}")
+    return iocs
+
+
+def cacheable_analysis(analysis, evt: dict):
+    """The source-independent part of an analysis of ``evt``, or None when it cannot be reused for other events."""
+    if not isinstance(analysis, dict):
+        return None
+    value = {key: analysis[key] for key in CACHEABLE_FIELDS if analysis.get(key)}
+    if not value or mentions_any(json.dumps(value, ensure_ascii=False), identifying_values(evt)):
+        return None
+    return value
+
+
+def analysis_for_event(cached: dict, evt: dict) -> dict:
+    """A cached analysis completed with the indicators of ``evt``."""
+    return {"summary": cached.get("summary", ""), "iocs": event_iocs(evt),
+            "recommended_actions": cached.get("recommended_actions", [])}
+
+
+class AnalysisCache:
+    def __init__(self, path=CACHE_PATH, ttl=DEFAULT_TTL, memory_size=DEFAULT_MEMORY_SIZE, max_rows=DEFAULT_MAX_ROWS):
+        self.path = Path(path) if path else None
+        self.ttl = float(ttl)
+        self.memory_size = max(int(memory_size), 1)
+        self.max_rows = max(int(max_rows), 1)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        self._pending_hits = {}
+        self.stats = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "expired": 0}
+        if self.path is not None:
+            try:
+                self._db = self._open_db()
+            except sqlite3.Error as e:
+                logger.warning(f"[AnalysisCache] Erro: unable to open {self.path}, caching in memory only: {e}")
+
+    def _open_db(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                   "expires REAL NOT NULL, hits INTEGER NOT NULL DEFAULT 0)")
+        db.execute("DELETE FROM analyses WHERE expires < ?", (time.time(),))
+        return db
+
+    @staticmethod
+    def key(namespace: str, signature: str) -> str:
+        return f"{namespace}:{signature}"
+
+    def get(self, namespace: str, signature: str):
+        """The cached analysis, or None on a miss."""
+        key = self.key(namespace, signature)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._memory.move_to_end(key)
+                    self._hit(key, "memory_hits")
+                    return entry[1]
+                del self._memory[key]
+                self.stats["expired"] += 1
+            if self._db is not None:
+                try:
+                    row = self._db.execute("SELECT value, expires FROM analyses WHERE key = ?", (key,)).fetchone()
+                except sqlite3.Error as e:
+                    logger.warning(f"[AnalysisCache] Erro: {e}")
+                    row = None
+                if row is not None and row[1] >= now:
+                    value = json.loads(row[0])
+                    self._remember(key, row[1], value)
+                    self._hit(key, "disk_hits")
+                    return value
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, namespace: str, signature: str, value):
+        if value is None:
+            return
+        key = self.key(namespace, signature)
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, expires, value)
+            self.stats["stores"] += 1
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT INTO analyses (key, value, expires) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE "
+                        "SET value = excluded.value, expires = excluded.expires",
+                        (key, json.dumps(value, ensure_ascii=False), expires))
+                    if self.stats["stores"] % 100 == 0:
+                        self._prune()
+                except sqlite3.Error as e:
+                    logger.warning(f"[AnalysisCache] Erro: {e}")
+
+    def _remember(self, key, expires, value):
+        self._memory[key] = (expires, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def _hit(self, key, tier):
+        self.stats["hits"] += 1
+        self.stats[tier] += 1
+        self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+        if sum(self._pending_hits.values()) >= HIT_FLUSH_EVERY:
+            self._flush_hits()
+
+    def _flush_hits(self):
+        hits, self._pending_hits = self._pending_hits, {}
+        if self._db is None or not hits:
+            return
+        try:
+            self._db.executemany("UPDATE analyses SET hits = hits + ? WHERE key = ?",
+                                 [(count, key) for key, count in hits.items()])
+        except sqlite3.Error as e:
+            logger.warning(f"[AnalysisCache] Erro: {e}")
+
+    def _prune(self):
+        self._db.execute("DELETE FROM analyses WHERE expires < ?", (time.time(),))
+        self._db.execute("DELETE FROM analyses WHERE key IN (SELECT key FROM analyses ORDER BY expires DESC "
+                         "LIMIT -1 OFFSET ?)", (self.max_rows,))
+
+    def hit_ratio(self) -> float:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def top_signatures(self, limit=20) -> list:
+        """[(key, hits)] of the stored signatures reused the most."""
+        with self._lock:
+            self._flush_hits()
+            if self._db is None:
+                return []
+            return self._db.execute("SELECT key, hits FROM analyses WHERE expires >= ? ORDER BY hits DESC LIMIT ?",
+                                    (time.time(), int(limit))).fetchall()
+
+    def entries(self) -> int:
+        with self._lock:
+            if self._db is None:
+                return len(self._memory)
+            return self._db.execute("SELECT COUNT(*) FROM analyses WHERE expires >= ?", (time.time(),)).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._flush_hits()
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def _cache_collector(cache):
+    from deceptgold.helper.metrics import stats_collector
+
+    return stats_collector("deceptgold_analysis_cache", "AI analysis cache", lambda: cache.stats,
+                           counters=("hits", "memory_hits", "disk_hits", "misses", "stores", "expired"))
+
+
+@shared_instance(stop="close", collector=_cache_collector)
+def _shared_cache():
+    from deceptgold.configuration.config_manager import get_config
+
+    return AnalysisCache(
+        get_config('ai_settings', 'cache_path', str(CACHE_PATH)),
+        ttl=float(get_config('ai_settings', 'cache_ttl', DEFAULT_TTL)),
+        memory_size=int(get_config('ai_settings', 'cache_memory_size', DEFAULT_MEMORY_SIZE)),
+    )
+
+
+def get_analysis_cache():
+    """Shared cache as configured in the 'ai_settings' section, or None when cache_enabled is false."""
+    from deceptgold.configuration.config_manager import get_config
+
+    if str(get_config('ai_settings', 'cache_enabled', True)).lower() not in ('1', 'true', 'yes'):
+        return None
+    return _shared_cache()
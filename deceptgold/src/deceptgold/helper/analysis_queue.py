@@ -0,0 +1,242 @@
+"""
+Bounded priority queue feeding LLM analysis workers for the live AI follower.
+
+The log tailer only enriches events and submits them, so a slow generation no longer stops the log from being read.
+Events are analysed by severity (critical and high first, 1001 service-info last) by a pool of worker threads,
+each with its own handler (a llama.cpp model is not thread safe). Once the queue fills up, shedding rules sample
+matching events (e.g. low-risk HTTP probes), and a full queue drops its lowest-priority event for a more urgent
+one. Shed events are still emitted, without an analysis. Shedding only applies to live tailing: a backlog being
+caught up on is submitted with ``block=True`` and waits for free space instead, so every event of it is analysed.
+
+Items complete out of order; ``on_progress`` receives the token of the newest item such that it and every item
+submitted before it are done, which is the position a durable cursor may safely record.
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+
+from deceptgold.helper.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_SIZE = 256
+DEFAULT_WORKERS = 1
+DEFAULT_SHED_AT = 0.5
+SEVERITY_PRIORITY = {"critical": 0, "high": 1, "medium": 2, "low": 3}
+SERVICE_INFO_PRIORITY = 4
+# Sample 1 in 10 low-risk HTTP probes once the queue is half full; service-info events are only analysed when idle.
+DEFAULT_SHED_RULES = (
+    {"category": "http_probe", "sample": 0.1},
+    {"category": "service_info", "sample": 0},
+)
+
+QUEUE_LAG = REGISTRY.histogram("deceptgold_analysis_queue_lag_seconds",
+                               "Time an event waited in the AI analysis queue.")
+
+
+def event_priority(enriched: dict) -> int:
+    """Lower is analysed first: the event's severity, else the enrichment risk; 1001 service-info last."""
+    evt = enriched.get("event") or {}
+    if evt.get("logtype") == 1001:
+        return SERVICE_INFO_PRIORITY
+    severity = str(evt.get("severity") or (enriched.get("ai") or {}).get("risk") or "low").lower()
+    return SEVERITY_PRIORITY.get(severity, SEVERITY_PRIORITY["low"])
+
+
+class ShedRule:
+    """Matches events on enrichment fields (category, risk) or event fields (logtype, service) and keeps 1 in N."""
+
+    def __init__(self, sample=0.0, **match):
+        self.sample = min(max(float(sample), 0.0), 1.0)
+        self.match = match
+        self._every = max(round(1 / self.sample), 1) if self.sample > 0 else 0
+        self._seen = 0
+
+    def matches(self, enriched: dict) -> bool:
+        evt = enriched.get("event") or {}
+        ai = enriched.get("ai") or {}
+        return all(str(ai.get(key, evt.get(key))) == str(value) for key, value in self.match.items())
+
+    def keep(self) -> bool:
+        """Deterministic sampling: every (1 / sample)-th matching event is kept."""
+        if not self._every:
+            return False
+        kept = self._seen % self._every == 0
+        self._seen += 1
+        return kept
+
+
+def build_shed_rules(rules) -> list:
+    return [ShedRule(**dict(rule)) for rule in rules or ()]
+
+
+class AnalysisQueue:
+    """
+    ``handler_factory()`` is called once per worker thread and returns ``analyze(item) -> result``; ``emit(item,
+    result, shed_reason)`` publishes an item (from worker threads, or from the producer for shed items).
+    """
+
+    def __init__(self, handler_factory, emit, max_size=DEFAULT_MAX_SIZE, workers=DEFAULT_WORKERS,
+                 shed_rules=DEFAULT_SHED_RULES, shed_at=DEFAULT_SHED_AT, priority=event_priority, on_progress=None):
+        self.handler_factory = handler_factory
+        self.emit = emit
+        self.max_size = max(int(max_size), 1)
+        self.workers = max(int(workers), 1)
+        self.shed_rules = build_shed_rules(shed_rules)
+        self.shed_at = float(shed_at)
+        self.priority = priority
+        self.on_progress = on_progress
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._order = deque()
+        self._done = set()
+        self._active = 0
+        self._threads = []
+        self._stopping = False
+        self.stats = {"submitted": 0, "analyzed": 0, "failed": 0, "shed": 0, "evicted": 0, "blocked": 0,
+                      "max_depth": 0}
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"deceptgold-analysis-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def depth(self) -> int:
+        return len(self._heap)
+
+    def lag(self) -> float:
+        """Seconds the oldest queued item has been waiting."""
+        with self._cond:
+            if not self._heap:
+                return 0.0
+            return time.monotonic() - min(entry[2] for entry in self._heap)
+
+    def snapshot(self) -> dict:
+        return dict(self.stats, depth=self.depth(), active=self._active, lag_seconds=round(self.lag(), 3))
+
+    def submit(self, item, token=None, block=False):
+        """
+        Queue ``item`` for analysis; ``token`` is reported to on_progress once it and its predecessors are done. With
+        ``block``, wait for free space instead of shedding (backpressure).
+        """
+        seq = next(self._seq)
+        shed = None
+        with self._cond:
+            if block and len(self._heap) >= self.max_size:
+                self.stats["blocked"] += 1
+                self._cond.wait_for(lambda: len(self._heap) < self.max_size or self._stopping)
+            self._order.append((seq, token))
+            self.stats["submitted"] += 1
+            priority = self.priority(item)
+            if not block and len(self._heap) >= self.shed_at * self.max_size:
+                for rule in self.shed_rules:
+                    if rule.matches(item):
+                        if not rule.keep():
+                            shed = (seq, item, "sampled")
+                        break
+            if shed is None and not block and len(self._heap) >= self.max_size:
+                worst = max(self._heap)
+                if worst[0] > priority:
+                    self._heap.remove(worst)
+                    heapq.heapify(self._heap)
+                    self.stats["evicted"] += 1
+                    shed = (worst[1], worst[3], "queue_full")
+                else:
+                    shed = (seq, item, "queue_full")
+            if shed is not None:
+                self.stats["shed"] += 1
+            if shed is None or shed[0] != seq:
+                heapq.heappush(self._heap, (priority, seq, time.monotonic(), item))
+                self.stats["max_depth"] = max(self.stats["max_depth"], len(self._heap))
+                self._cond.notify()
+        if shed is not None:
+            self._publish(shed[1], None, shed[2])
+            self._complete(shed[0])
+
+    def skip(self, token=None):
+        """Record an event that needs no analysis, so the progress watermark can move past it."""
+        seq = next(self._seq)
+        with self._cond:
+            self._order.append((seq, token))
+        self._complete(seq)
+
+    def _publish(self, item, result, shed_reason):
+        try:
+            self.emit(item, result, shed_reason)
+        except Exception as e:
+            logger.error(f"[AnalysisQueue] Erro: {e}")
+
+    def _complete(self, seq):
+        with self._cond:
+            self._done.add(seq)
+            token, moved = None, False
+            while self._order and self._order[0][0] in self._done:
+                done_seq, token = self._order.popleft()
+                self._done.discard(done_seq)
+                moved = True
+            if not self._heap and not self._active:
+                self._cond.notify_all()
+            # Called under the lock so that tokens are reported in order.
+            if moved and token is not None and self.on_progress is not None:
+                try:
+                    self.on_progress(token)
+                except Exception as e:
+                    logger.error(f"[AnalysisQueue] Erro: {e}")
+
+    def _run(self):
+        try:
+            analyze = self.handler_factory()
+        except Exception as e:
+            logger.error(f"[AnalysisQueue] Erro: unable to start an analysis worker: {e}")
+            return
+        while True:
+            with self._cond:
+                while not self._heap and not self._stopping:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                _, seq, enqueued, item = heapq.heappop(self._heap)
+                self._active += 1
+                # Wakes a producer blocked on a full queue.
+                self._cond.notify_all()
+            QUEUE_LAG.observe(time.monotonic() - enqueued)
+            result = None
+            try:
+                result = analyze(item)
+                self.stats["analyzed"] += 1
+            except Exception as e:
+                self.stats["failed"] += 1
+                logger.error(f"[AnalysisQueue] Erro: {e}")
+            self._publish(item, result, None)
+            with self._cond:
+                self._active -= 1
+            self._complete(seq)
+
+    def join(self, timeout=None) -> bool:
+        """Wait until every queued item was handled; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, drain_timeout=None):
+        """Let the workers finish the queue (up to ``drain_timeout`` seconds), then stop them."""
+        if not self.join(drain_timeout):
+            logger.warning(f"[AnalysisQueue] Stopping with {self.depth()} events not analysed.")
+        with self._cond:
+            self._stopping = True
+            self._heap.clear()
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=1.0)
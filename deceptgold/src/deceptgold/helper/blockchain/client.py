@@ -0,0 +1,111 @@
+"""
+Lazily connected blockchain client.
+
+Nothing here touches the network (or imports web3) until the first call that needs the chain, typically the first
+reward claim. The connection is memoised per process; a failed attempt is not cached, so the next claim retries.
+"""
+
+import logging
+import threading
+import time
+
+from deceptgold.configuration.config_manager import get_config
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RPC_TIMEOUT = 10
+
+
+class BlockchainError(Exception):
+    pass
+
+
+class BlockchainClient:
+    def __init__(self, rpc_url=None, timeout=None):
+        self._rpc_url = rpc_url
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._connected = False
+        self.w3 = None
+        self.private_key = None
+        self.sender = None
+        self.expected_signer = None
+        self.token_address = None
+        self.validator_address = None
+
+    @property
+    def rpc_url(self):
+        return self._rpc_url or get_config('blockchain', 'net_rpc')
+
+    @property
+    def timeout(self):
+        return float(self._timeout or get_config('blockchain', 'rpc_timeout', DEFAULT_RPC_TIMEOUT))
+
+    def connect(self):
+        """Build the Web3 provider, recover the gas sender and validate both contracts. Raises BlockchainError."""
+        if self._connected:
+            return self
+        with self._lock:
+            if self._connected:
+                return self
+            try:
+                # pylint: disable=import-outside-toplevel
+                from web3 import Web3
+                from deceptgold.helper.blockchain.sender import Sender
+
+                w3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={'timeout': self.timeout}))
+                if not w3.is_connected():
+                    raise BlockchainError('Not connected network rpc.')
+
+                private_key, sender = Sender(w3).get_safe_key_sender()
+                token_address = Web3.to_checksum_address(get_config('blockchain', 'contract_token_address'))
+                validator_address = Web3.to_checksum_address(get_config('blockchain', 'contract_validator_address'))
+
+                if w3.eth.get_code(token_address) == b'':
+                    raise BlockchainError('Invalid contract token address.')
+                if w3.eth.get_code(validator_address) == b'':
+                    raise BlockchainError('Invalid contract validator address.')
+            except BlockchainError:
+                raise
+            except Exception as error:
+                raise BlockchainError(f'Unable to connect to the blockchain: {error}') from error
+
+            self.w3 = w3
+            self.private_key = private_key
+            self.sender = sender
+            self.expected_signer = get_config('blockchain', 'key_public_expected_signer')
+            self.token_address = token_address
+            self.validator_address = validator_address
+            self._connected = True
+        return self
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def reset(self):
+        with self._lock:
+            self._connected = False
+            self.w3 = None
+
+    def health_check(self) -> dict:
+        """Probe the RPC endpoint without raising. Connects first if needed."""
+        status = {'rpc': self.rpc_url, 'connected': False, 'chain_id': None, 'block_number': None,
+                  'latency_ms': None, 'error': None}
+        started = time.perf_counter()
+        try:
+            self.connect()
+            status['chain_id'] = self.w3.eth.chain_id
+            status['block_number'] = self.w3.eth.block_number
+            status['connected'] = True
+        except Exception as error:
+            status['error'] = str(error)
+        status['latency_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return status
+
+
+@shared_instance()
+def get_blockchain_client() -> BlockchainClient:
+    """Process-wide client. Construction is free; the network is only used on connect()."""
+    return BlockchainClient()
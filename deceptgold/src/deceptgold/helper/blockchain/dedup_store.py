@@ -0,0 +1,117 @@
+"""
+Append-only persistent store of 64-bit event digests used to deduplicate reward accounting.
+
+Digests come from ``deceptgold.helper.digest``. File layout: an 8 byte magic header followed by fixed-width little-endian uint64 records. Appending a digest is a
+single buffered write; opening the store maps the file and loads every record into an in-memory set index, so
+membership checks are O(1) and recovery never evaluates file contents. A torn record left by a crash is truncated on
+open.
+"""
+
+import array
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"DGDEDUP1"
+RECORD = struct.Struct("<Q")
+DIGEST_MASK = (1 << 64) - 1
+
+
+class DigestStore:
+    def __init__(self, path, flush_every: int = 10):
+        self.path = Path(path)
+        self.flush_every = max(int(flush_every), 1)
+        self.created = False
+        self._lock = threading.Lock()
+        self._digests = set()
+        self._unflushed = 0
+        self._file = None
+        self._open()
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            self._load()
+        else:
+            self.created = True
+
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+
+    def _load(self):
+        with open(self.path, "r+b") as f:
+            size = os.fstat(f.fileno()).st_size
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if size < len(MAGIC) or mm[:len(MAGIC)] != MAGIC:
+                    valid = False
+                else:
+                    valid = True
+                    count = (size - len(MAGIC)) // RECORD.size
+                    records = array.array("Q")
+                    records.frombytes(mm[len(MAGIC):len(MAGIC) + count * RECORD.size])
+                    if sys.byteorder != "little":
+                        records.byteswap()
+                    self._digests = set(records)
+
+            if valid:
+                expected = len(MAGIC) + count * RECORD.size
+                if size != expected:
+                    logger.warning(f"Truncating torn record at the end of {self.path}.")
+                    f.truncate(expected)
+                return
+
+        corrupt = self.path.with_name(self.path.name + ".corrupt")
+        logger.warning(f"Unrecognized digest store {self.path}, moving it to {corrupt}.")
+        os.replace(self.path, corrupt)
+        self.created = True
+
+    def add(self, digest: int) -> bool:
+        """Record a digest. Returns False when it was already present."""
+        digest &= DIGEST_MASK
+        with self._lock:
+            if digest in self._digests:
+                return False
+            self._file.write(RECORD.pack(digest))
+            self._digests.add(digest)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush_locked()
+            return True
+
+    def _flush_locked(self):
+        self._file.flush()
+        self._unflushed = 0
+
+    def flush(self):
+        with self._lock:
+            self._flush_locked()
+
+    def clear(self):
+        with self._lock:
+            self._file.flush()
+            self._file.truncate(len(MAGIC))
+            self._file.seek(0, os.SEEK_END)
+            os.fsync(self._file.fileno())
+            self._digests.clear()
+            self._unflushed = 0
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._file.close()
+                self._file = None
+
+    def __contains__(self, digest) -> bool:
+        return (digest & DIGEST_MASK) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
@@ -4,19 +4,19 @@ import logging
 import warnings
 import threading
 import ast
-import random
 import glob
 import tempfile
 
-from web3 import Web3
-from eth_account.messages import encode_defunct
-from opencanary.logger import getLogger
+from pathlib import Path
 
-from deceptgold.helper.helper import get_temp_log_path
 from deceptgold.helper.signature import generate_signature_and_hash, verify_signature
-from deceptgold.helper.blockchain.sender import Sender
-from deceptgold.configuration.config_manager import update_config, get_config
+from deceptgold.helper.blockchain.client import get_blockchain_client
+from deceptgold.helper.blockchain.dedup_store import DigestStore
+from deceptgold.helper.digest import event_digest
+from deceptgold.configuration.config_manager import get_config
 from deceptgold.helper.fingerprint import get_machine_fingerprint
+from deceptgold.helper.metrics import REGISTRY, REWARD_EVENTS, REWARD_LATENCY
+from deceptgold.helper.shared import shared_instance
 
 warnings.filterwarnings("ignore", category=UserWarning, module="eth_utils.functional")
 
@@ -33,54 +33,33 @@ Example configuration:
         "contract_validator_address": "0x12485DAE42bFc5bF625f4Da5738847e79CFe2cAD"
     }
 }    
-"""
-try:
-    BSC_TESTNET_RPC = get_config('blockchain', 'net_rpc')
-    w3 = Web3(Web3.HTTPProvider(BSC_TESTNET_RPC))
-
-    PRIVATE_KEY, SENDER = Sender(w3).get_safe_key_sender()
-
-    pending_nonce = w3.eth.get_transaction_count(SENDER, 'pending')
-    latest_nonce = w3.eth.get_transaction_count(SENDER, 'latest')
-
-    if not w3.is_connected():
-        raise Exception('Not connected network rpc.')
-
-    KEY_PUBLIC_EXPECTED_SIGNER = get_config('blockchain', 'key_public_expected_signer')
-    CONTRACT_TOKEN_ADDRESS = Web3.to_checksum_address(get_config('blockchain', 'contract_token_address'))
-    CONTRACT_VALIDATOR_ADDRESS = Web3.to_checksum_address(get_config('blockchain', 'contract_validator_address'))
-
-    if w3.eth.get_code(Web3.to_checksum_address(CONTRACT_TOKEN_ADDRESS)) == b'':
-        raise Exception('Invalid contract token address.')
-
-    if w3.eth.get_code(Web3.to_checksum_address(CONTRACT_VALIDATOR_ADDRESS)) == b'':
-        raise Exception('Invalid contract validator address.')
-
-except Exception as e:
-    pass
-
 
+The RPC connection is made by deceptgold.helper.blockchain.client on the first reward claim, never at import time.
+"""
 def call_first_upload_contract():
     """
     Attention: every time you update a system contract or create a new one, this function needs to be called.
     """
+    client = get_blockchain_client().connect()
+    w3 = client.w3
+
     root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "resources"))
     with open(os.path.join(root_dir, "TokenContract.abi.json")) as f:
         abi_token = json.load(f)
 
-    contract_token = w3.eth.contract(address=CONTRACT_TOKEN_ADDRESS, abi=abi_token)
+    contract_token = w3.eth.contract(address=client.token_address, abi=abi_token)
 
     current_validator = contract_token.functions.validatorContract().call()
-    if current_validator.lower() != CONTRACT_VALIDATOR_ADDRESS.lower():
+    if current_validator.lower() != client.validator_address.lower():
         print("Updating validatorContract token...")
-        tx_set = contract_token.functions.setValidatorContract(CONTRACT_VALIDATOR_ADDRESS).build_transaction({
-            'from': SENDER,
-            'nonce': w3.eth.get_transaction_count(SENDER, 'pending'),
+        tx_set = contract_token.functions.setValidatorContract(client.validator_address).build_transaction({
+            'from': client.sender,
+            'nonce': w3.eth.get_transaction_count(client.sender, 'pending'),
             'gas': 100000,
             'gasPrice': w3.to_wei('10', 'gwei')
         })
 
-        signed_tx_set = w3.eth.account.sign_transaction(tx_set, private_key=PRIVATE_KEY)
+        signed_tx_set = w3.eth.account.sign_transaction(tx_set, private_key=client.private_key)
         tx_hash_set = w3.eth.send_raw_transaction(signed_tx_set.raw_transaction)
         receipt_set = w3.eth.wait_for_transaction_receipt(tx_hash_set)
         print(f"ValidatorContract definido no token! {receipt_set}")
@@ -90,12 +69,19 @@ def call_first_upload_contract():
 
 
 def farm_deceptgold(wallet_address_target, request_honeypot):
+    # pylint: disable=import-outside-toplevel
+    from eth_account.messages import encode_defunct
+    from opencanary.logger import getLogger
+
+    client = get_blockchain_client().connect()
+    w3 = client.w3
+
     module_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "resources"))
     abi_path = os.path.join(module_dir, "ValidatorContract.abi.json")
     with open(abi_path) as f:
         abi_validator = json.load(f)
 
-    contract_validator = w3.eth.contract(address=CONTRACT_VALIDATOR_ADDRESS, abi=abi_validator)
+    contract_validator = w3.eth.contract(address=client.validator_address, abi=abi_validator)
 
     signature, json_hash, _ = generate_signature_and_hash(request_honeypot)
 
@@ -107,12 +93,12 @@ def farm_deceptgold(wallet_address_target, request_honeypot):
     message = encode_defunct(hexstr=message_hash.hex())
     signer_address = w3.eth.account.recover_message(message, signature=signature_bytes)
 
-    if KEY_PUBLIC_EXPECTED_SIGNER != signer_address:
-        raise Exception(f'Validation spoke in the comparison of expectations: {signer_address} != {KEY_PUBLIC_EXPECTED_SIGNER}')
+    if client.expected_signer != signer_address:
+        raise Exception(f'Validation spoke in the comparison of expectations: {signer_address} != {client.expected_signer}')
 
     tx = contract_validator.functions.claimToken(json_hash, signature, wallet_address_target).build_transaction({
-        'from': SENDER,
-        'nonce': w3.eth.get_transaction_count(SENDER, 'pending'),
+        'from': client.sender,
+        'nonce': w3.eth.get_transaction_count(client.sender, 'pending'),
         'gas': 100000,
         'gasPrice': w3.to_wei('5', 'gwei')
     })
@@ -125,7 +111,7 @@ def farm_deceptgold(wallet_address_target, request_honeypot):
         logger = getLogger(config)
 
         try:
-            signed_tx = w3.eth.account.sign_transaction(tx, private_key=PRIVATE_KEY)
+            signed_tx = w3.eth.account.sign_transaction(tx, private_key=client.private_key)
             tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
             tx_hash_0x = f'0x{tx_hash.hex()}'
 
@@ -161,56 +147,117 @@ def get_count_reward_final():
     return get_count_reward_first() * get_count_reward_second()
 
 
+REWARD_DIGEST_PATH = Path.home() / ".deceptgold" / "reward_digests.bin"
+BOOT_LOG_MARKER = 'added service from class'
+
+
 def search_stack_file():
     all_files = glob.glob(os.path.join(tempfile.gettempdir(), "*.stack"))
     return all_files[0] if all_files else None
 
-CONFIG_FILE = get_temp_log_path(''.join(random.choices('abcdef0123456789', k=7)) + '.stack')
-pre_file_stack = search_stack_file()
-if pre_file_stack:
-    CONFIG_FILE = pre_file_stack
+
+def migrate_stack_file(store, stack_file, passwd):
+    """
+    Import the hash cache of older versions (an XOR-encoded set literal in a temporary *.stack file) into the digest
+    store, so the reward progress survives the upgrade. The legacy file is removed afterwards.
+    """
+    try:
+        raw = get_config(key='hash', module_name_honeypot='cache', passwd=passwd, default='set()', file_config=stack_file)
+        legacy = ast.literal_eval(raw) if raw and raw != 'set()' else set()
+        for value in legacy:
+            if isinstance(value, int):
+                store.add(value)
+        store.flush()
+        os.remove(stack_file)
+    except Exception as e:
+        logging.error(f"[migrate_stack_file] Erro: {e}")
+
+
+def open_reward_store(path=REWARD_DIGEST_PATH):
+    store = DigestStore(path, flush_every=get_mod())
+    if store.created:
+        pre_file_stack = search_stack_file()
+        if pre_file_stack:
+            migrate_stack_file(store, pre_file_stack, get_machine_fingerprint())
+    return store
+
+
+def reward_skip_reason(log_honeypot):
+    """
+    None when a honeypot log counts towards the reward, else why it does not: not an event record, a system message
+    (a ``logdata.msg`` that cannot be parsed), or a boot log.
+    """
+    try:
+        logdata = json.loads(log_honeypot)['logdata']
+        has_msg = 'msg' in logdata.keys()
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return "invalid"
+    if not has_msg:
+        return None
+    try:
+        msg = ast.literal_eval(logdata['msg'])
+        is_boot = BOOT_LOG_MARKER in msg['logdata']
+    except Exception:
+        return "system_log"
+    return "boot_log" if is_boot else None
 
 
-pass_fingerprint = get_machine_fingerprint()
-list_logs = eval(get_config(key='hash', module_name_honeypot='cache', passwd=pass_fingerprint, default='set()', file_config=CONFIG_FILE))
 list_count = 0
 list_logs_lock = threading.Lock()
 reward_triggered = False
 
+
+@shared_instance(stop="close")
+def get_reward_store():
+    """Open the reward digest store on first use."""
+    return open_reward_store()
+
+
 def get_reward(log_honeypot):
+    with REWARD_LATENCY.time():
+        result = _count_reward_event(log_honeypot)
+    REWARD_EVENTS.inc(result=result)
+
+
+def _count_reward_event(log_honeypot) -> str:
+    """Account one honeypot log towards the next reward. Returns the outcome label used by the metrics."""
     global reward_triggered
     global list_count
 
     user_wallet = get_config("user", "address", None)
     if not user_wallet:
-        return None
+        return "no_wallet"
 
     try:
-        # Ignore system boot logs as they are not real attacks.
-        log_json = json.loads(log_honeypot)
-        if 'msg' in log_json['logdata'].keys():
-            msg = ast.literal_eval(log_json['logdata']['msg'])
-            if 'added service from class' in msg['logdata']:
-                return None
-        log_hash = hash(json.dumps(log_json, sort_keys=True))
+        # Ignore system and boot logs as they are not real attacks.
+        skip_reason = reward_skip_reason(log_honeypot)
+        if skip_reason:
+            return skip_reason
+        log_hash = event_digest(log_honeypot)
         with list_logs_lock:
             if reward_triggered:
-                return None
-
-            if log_hash not in list_logs:
-                list_logs.add(log_hash)
-                list_count = len(list_logs)
+                return "reward_pending"
 
-            if list_count % get_mod() == 0:
-                update_config(key='hash', value=str(list_logs), module_name='cache', passwd=pass_fingerprint, config_file=CONFIG_FILE)
+            reward_store = get_reward_store()
+            if not reward_store.add(log_hash):
+                return "duplicate"
+            list_count = len(reward_store)
 
             if list_count >= get_count_reward_final():
                 reward_triggered = True
-                update_config(key='hash', value=str(set()), module_name='cache', passwd=pass_fingerprint, config_file=CONFIG_FILE)
+                reward_store.clear()
                 threading.Thread(target=handle_reward_async, args=(log_honeypot,), daemon=True).start()
-                list_logs.clear()
+                return "reward_triggered"
+        return "counted"
     except Exception as e:
         logging.error(f"[get_reward] Erro: {e}")
+        return "error"
+
+
+@REGISTRY.register_collector
+def _reward_metrics():
+    yield "deceptgold_reward_progress", "gauge", "Distinct events counted towards the next reward.", [({}, list_count)]
+    yield "deceptgold_reward_target", "gauge", "Distinct events needed for a reward.", [({}, get_count_reward_final())]
 
 def handle_reward_async(log_honeypot):
     global reward_triggered
@@ -218,7 +265,7 @@ def handle_reward_async(log_honeypot):
         address_wallet_user = get_config('user', 'address')
         farm_deceptgold(address_wallet_user, log_honeypot)
         with list_logs_lock:
-            list_logs.clear()
+            get_reward_store().clear()
             reward_triggered = False
     except Exception as e:
         logging.error(f"[handle_reward_async] Erro: {e}")
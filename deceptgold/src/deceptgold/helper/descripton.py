@@ -1,3 +1,15 @@
+# Help text of each sub-command, shared by the sub-apps and the lazy registration in __main__ (which must not import
+# them to print the top-level --help).
+COMMAND_HELP = {
+    "user": "User management",
+    "service": "Module service available",
+    "notify": "These are the configuration options regarding notifications to be sent to the honeypot administrator.",
+    "ai": "Local AI agent commands",
+    "reports": "Reports commands",
+    "dashboard": "Dashboard commands",
+}
+
+
 def get_description():
     return """
 Deceptgold - Cyber Deception, Resource Reclamation & Active Defense
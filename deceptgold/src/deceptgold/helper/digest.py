@@ -0,0 +1,20 @@
+"""
+Canonical 64-bit event digests shared by every dedup consumer (reward accounting, notification coalescing, ...).
+
+The honeypot logger serialises each event once, so the raw log line is already a canonical representation: hashing
+its bytes avoids re-parsing and re-serialising with sorted keys. Unlike the built-in ``hash()``, results are stable
+across processes and restarts.
+"""
+
+from hashlib import blake2b
+
+DIGEST_SIZE = 8
+DIGEST_KEY = b"deceptgold.event.v1"
+
+
+def event_digest(raw) -> int:
+    """Digest of a raw log record (str or bytes) as an unsigned 64-bit int."""
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8", "surrogatepass")
+    return int.from_bytes(blake2b(raw, digest_size=DIGEST_SIZE, key=DIGEST_KEY).digest(), "little")
+
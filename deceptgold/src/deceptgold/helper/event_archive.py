@@ -0,0 +1,492 @@
+"""
+Columnar archive of the honeypot log for reports and the dashboard.
+
+Compaction takes the closed part of the JSONL log (every complete line past the last compacted offset) and stores it
+as a segment directory of NumPy columns: logtype and dst_port as int32, src_host and service dictionary-encoded
+(int32 codes plus a dictionary of values), and the event time as int64 microseconds since the epoch. Each segment
+also keeps its rows' time order (a sorted index) and one bitmap per logtype; the manifest records the min/max time
+of every segment, so a time window only opens the segments it overlaps.
+
+Queries such as the top sources of the last hour are then vectorised scans (searchsorted over the time index,
+bincount over the codes) on memory-mapped columns instead of decoding JSON line by line. Segments survive log
+rotation: when the log is replaced, compaction starts again at its beginning and the older segments stay queryable.
+Old segments are deleted after each compaction, past a retention age and beyond a total size.
+"""
+
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import shutil
+import threading
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from deceptgold.configuration.config_manager import _file_lock
+from deceptgold.helper.log_aggregate import _head_digest, event_timestamp, parse_event
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+ARCHIVE_PATH = Path.home() / ".deceptgold" / "archive"
+MANIFEST_NAME = "manifest.json"
+HEAD_BYTES = 4096
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_COMPACT_INTERVAL = 300
+DEFAULT_MIN_BYTES = 1024 * 1024
+DEFAULT_BYTES_PER_RUN = SEGMENT_MAX_BYTES
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+DICTIONARY_COLUMNS = ("src_host", "service")
+NUMERIC_COLUMNS = ("logtype", "dst_port")
+COLUMNS = NUMERIC_COLUMNS + DICTIONARY_COLUMNS
+MISSING = -1
+NO_TIME = np.iinfo(np.int64).min
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def to_micros(value: datetime) -> int:
+    """Naive datetime (as parsed from the log) to microseconds since the epoch."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+def _as_int(value):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return MISSING
+    return number if 0 <= number <= 0x7FFFFFFF else MISSING
+
+
+def _as_text(value):
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+class SegmentBuilder:
+    """Accumulates events for one segment, dictionary-encoding the text columns as it goes."""
+
+    def __init__(self):
+        self.columns = {name: [] for name in COLUMNS}
+        self.dictionaries = {name: {} for name in DICTIONARY_COLUMNS}
+        self.times = []
+
+    def __len__(self):
+        return len(self.times)
+
+    def add_event(self, evt: dict):
+        columns = self.columns
+        columns["logtype"].append(_as_int(evt.get("logtype")))
+        dst_port = evt.get("dst_port")
+        columns["dst_port"].append(MISSING if dst_port in (None, "-1") else _as_int(dst_port))
+        for name in DICTIONARY_COLUMNS:
+            value = _as_text(evt.get(name))
+            if value is None:
+                columns[name].append(MISSING)
+            else:
+                dictionary = self.dictionaries[name]
+                columns[name].append(dictionary.setdefault(value, len(dictionary)))
+        ts = event_timestamp(evt)
+        self.times.append(NO_TIME if ts is None else to_micros(ts))
+
+    def write(self, directory: Path) -> dict:
+        """Write the columns and indexes to ``directory``; returns the segment's manifest entry."""
+        directory.mkdir(parents=True)
+        for name in COLUMNS:
+            np.save(directory / f"{name}.npy", np.asarray(self.columns[name], dtype=np.int32))
+        for name in DICTIONARY_COLUMNS:
+            np.save(directory / f"{name}.dict.npy", np.asarray(list(self.dictionaries[name]), dtype=np.str_))
+
+        times = np.asarray(self.times, dtype=np.int64)
+        np.save(directory / "time.npy", times)
+        order = np.argsort(times, kind="stable")
+        np.save(directory / "time_order.npy", order.astype(np.int64))
+        np.save(directory / "time_sorted.npy", times[order])
+
+        logtypes = np.asarray(self.columns["logtype"], dtype=np.int32)
+        values = np.unique(logtypes)
+        np.save(directory / "logtype_values.npy", values)
+        np.save(directory / "logtype_bitmaps.npy", np.packbits(logtypes[None, :] == values[:, None], axis=1))
+
+        timed = times[times != NO_TIME]
+        return {
+            "rows": len(times),
+            "bytes": _directory_bytes(directory),
+            "min_time": int(timed.min()) if timed.size else None,
+            "max_time": int(timed.max()) if timed.size else None,
+        }
+
+
+def _directory_bytes(directory: Path) -> int:
+    try:
+        return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+    except OSError:
+        return 0
+
+
+class Segment:
+    """Read-only view of a compacted segment; columns are memory-mapped on first use."""
+
+    def __init__(self, directory: Path, entry: dict):
+        self.directory = Path(directory)
+        self.rows = int(entry["rows"])
+        self.min_time = entry.get("min_time")
+        self.max_time = entry.get("max_time")
+        self._arrays = {}
+
+    def array(self, name):
+        array = self._arrays.get(name)
+        if array is None:
+            array = self._arrays[name] = np.load(self.directory / f"{name}.npy", mmap_mode="r")
+        return array
+
+    def overlaps(self, since, until) -> bool:
+        if self.min_time is None:
+            return since is None and until is None
+        return (since is None or self.max_time >= since) and (until is None or self.min_time < until)
+
+    def window(self, since, until):
+        """Row numbers with since <= time < until (all rows when unbounded)."""
+        if since is None and until is None:
+            return None
+        ordered = self.array("time_sorted")
+        # Rows without a time sort first and are excluded by any lower bound.
+        lo = int(np.searchsorted(ordered, NO_TIME + 1 if since is None else since, side="left"))
+        hi = len(ordered) if until is None else int(np.searchsorted(ordered, until, side="left"))
+        return self.array("time_order")[lo:hi]
+
+    def logtype_mask(self, logtype):
+        values = self.array("logtype_values")
+        index = np.flatnonzero(values == int(logtype))
+        if not index.size:
+            return np.zeros(self.rows, dtype=bool)
+        return np.unpackbits(self.array("logtype_bitmaps")[index[0]], count=self.rows).astype(bool)
+
+    def select(self, since=None, until=None, logtype=None):
+        """Row selection for the filters: None (every row), or an index array."""
+        rows = self.window(since, until)
+        if logtype is None:
+            return rows
+        matching = self.logtype_mask(logtype)
+        return np.flatnonzero(matching) if rows is None else rows[matching[rows]]
+
+    def column(self, name, rows=None):
+        values = self.array(name)
+        return values if rows is None else values[rows]
+
+
+class EventArchive:
+    """
+    Segments older than ``retention_days`` (by their newest event), and the oldest segments beyond ``max_bytes`` in
+    total, are deleted after each compaction; None (or 0) keeps them.
+    """
+
+    def __init__(self, path=ARCHIVE_PATH, retention_days=None, max_bytes=None):
+        self.path = Path(path)
+        self.retention_days = retention_days
+        self.max_bytes = max_bytes
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.path / MANIFEST_NAME
+
+    def load_manifest(self) -> dict:
+        try:
+            manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+            if manifest.get("version") == ARCHIVE_VERSION:
+                return manifest
+            logger.info(f"[event_archive] Archive format changed, starting a new archive in {self.path}.")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"[event_archive] Ignoring unreadable manifest {self.manifest_path}: {e}")
+        return {"version": ARCHIVE_VERSION, "source": None, "segments": [], "next_segment": 1}
+
+    def _save_manifest(self, manifest: dict):
+        tmp_path = self.manifest_path.with_name(MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _resume_offset(self, source: dict, source_path: Path) -> int:
+        if not source or source.get("path") != str(source_path):
+            return 0
+        st = source_path.stat()
+        offset = int(source["offset"])
+        if (st.st_dev, st.st_ino) != (source["device"], source["inode"]) or st.st_size < offset:
+            return 0
+        if _head_digest(source_path, int(source["head_length"])) != source["head_digest"]:
+            return 0
+        return offset
+
+    def compact(self, source_path: Path, min_bytes=0, segment_max_bytes=SEGMENT_MAX_BYTES, bytes_per_run=None) -> int:
+        """
+        Move the complete lines appended to ``source_path`` since the last compaction into new segments. Nothing is
+        done while fewer than ``min_bytes`` are pending; at most about ``bytes_per_run`` bytes are archived per call
+        (None for all), the rest is left to the next one. Returns the number of events archived.
+        """
+        source_path = Path(source_path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        # The daemon's compactor and 'reports top' may compact at the same time, from different processes.
+        with _file_lock(self.path / "compaction"):
+            manifest = self.load_manifest()
+            offset = self._resume_offset(manifest["source"], source_path)
+            if manifest["source"] and offset == 0 and manifest["source"].get("offset"):
+                logger.info("[event_archive] Log was rotated or replaced, compacting the new log from its start.")
+            size = source_path.stat().st_size
+            if size - offset < max(min_bytes, 1):
+                return 0
+
+            archived = 0
+            with open(source_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                end = mm.rfind(b"\n", offset, size) + 1
+                if bytes_per_run and end - offset > bytes_per_run:
+                    end = mm.rfind(b"\n", offset, offset + int(bytes_per_run)) + 1 or end
+                while offset < end:
+                    stop = min(end, offset + segment_max_bytes)
+                    if stop < end:
+                        stop = mm.rfind(b"\n", offset, stop) + 1 or mm.find(b"\n", stop, end) + 1
+                    archived += self._write_segment(manifest, mm, offset, stop)
+                    offset = stop
+                    st = source_path.stat()
+                    head_length = min(HEAD_BYTES, offset)
+                    manifest["source"] = {
+                        "path": str(source_path), "device": st.st_dev, "inode": st.st_ino, "offset": offset,
+                        "head_length": head_length, "head_digest": _head_digest(source_path, head_length),
+                    }
+                    self._save_manifest(manifest)
+            self._prune(manifest)
+            return archived
+
+    def prune(self) -> int:
+        """Apply the retention settings now. Returns the number of segments deleted."""
+        if not self.manifest_path.exists():
+            return 0
+        with _file_lock(self.path / "compaction"):
+            return self._prune(self.load_manifest())
+
+    def _prune(self, manifest: dict) -> int:
+        segments = manifest["segments"]
+        expired = set()
+        if self.retention_days:
+            cutoff = to_micros(datetime.now() - timedelta(days=float(self.retention_days)))
+            expired.update(entry["name"] for entry in segments
+                           if entry.get("max_time") is not None and entry["max_time"] < cutoff)
+        if self.max_bytes:
+            total = 0
+            # Newest first: the oldest segments are the ones beyond the size limit.
+            for entry in reversed(segments):
+                if entry["name"] in expired:
+                    continue
+                if "bytes" not in entry:
+                    entry["bytes"] = _directory_bytes(self.path / entry["name"])
+                total += entry["bytes"]
+                if total > int(self.max_bytes):
+                    expired.add(entry["name"])
+        if not expired:
+            return 0
+        manifest["segments"] = [entry for entry in segments if entry["name"] not in expired]
+        self._save_manifest(manifest)
+        for name in expired:
+            shutil.rmtree(self.path / name, ignore_errors=True)
+        logger.info(f"[event_archive] Deleted {len(expired)} segment(s) past the archive retention.")
+        return len(expired)
+
+    def _write_segment(self, manifest: dict, mm, start: int, end: int) -> int:
+        builder = SegmentBuilder()
+        find = mm.find
+        pos = start
+        while pos < end:
+            newline = find(b"\n", pos, end)
+            stop = end if newline == -1 else newline + 1
+            evt = parse_event(mm[pos:stop])
+            if evt is not None:
+                builder.add_event(evt)
+            pos = stop
+        if not len(builder):
+            return 0
+        name = f"seg-{manifest['next_segment']:06d}"
+        tmp_dir = self.path / (name + ".tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        entry = builder.write(tmp_dir)
+        # Left over by a compaction killed before it saved the manifest.
+        shutil.rmtree(self.path / name, ignore_errors=True)
+        os.replace(tmp_dir, self.path / name)
+        entry["name"] = name
+        manifest["segments"].append(entry)
+        manifest["next_segment"] += 1
+        return entry["rows"]
+
+    def segments(self, since=None, until=None) -> list:
+        """Segments that may hold events in [since, until) (datetimes or None)."""
+        since, until = self._bounds(since, until)
+        manifest = self.load_manifest()
+        segments = [Segment(self.path / entry["name"], entry) for entry in manifest["segments"]]
+        return [segment for segment in segments if segment.overlaps(since, until)]
+
+    @staticmethod
+    def _bounds(since, until):
+        return (None if since is None else to_micros(since)), (None if until is None else to_micros(until))
+
+    def count(self, since=None, until=None, logtype=None) -> int:
+        total = 0
+        for segment in self.segments(since, until):
+            rows = segment.select(*self._bounds(since, until), logtype=logtype)
+            total += segment.rows if rows is None else len(rows)
+        return total
+
+    def top(self, column: str, limit=10, since=None, until=None, logtype=None) -> list:
+        """[(value, count)] most frequent values of ``column`` among the events in [since, until)."""
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown archive column '{column}', expected one of {', '.join(COLUMNS)}")
+        bounds = self._bounds(since, until)
+        totals = Counter()
+        for segment in self.segments(since, until):
+            codes = np.asarray(segment.column(column, segment.select(*bounds, logtype=logtype)))
+            codes = codes[codes != MISSING]
+            if not codes.size:
+                continue
+            if column in DICTIONARY_COLUMNS:
+                counts = np.bincount(codes)
+                present = np.flatnonzero(counts)
+                dictionary = segment.array(f"{column}.dict")
+                totals.update(dict(zip(dictionary[present].tolist(), counts[present].tolist())))
+            else:
+                values, counts = np.unique(codes, return_counts=True)
+                totals.update(dict(zip(values.tolist(), counts.tolist())))
+        return totals.most_common(limit)
+
+    def histogram(self, bucket_seconds=3600, since=None, until=None, logtype=None) -> list:
+        """[(bucket start datetime, count)] of the events in [since, until), oldest first."""
+        width = int(bucket_seconds) * 1_000_000
+        bounds = self._bounds(since, until)
+        totals = Counter()
+        for segment in self.segments(since, until):
+            times = np.asarray(segment.column("time", segment.select(*bounds, logtype=logtype)))
+            times = times[times != NO_TIME]
+            if not times.size:
+                continue
+            buckets, counts = np.unique(times // width, return_counts=True)
+            totals.update(dict(zip(buckets.tolist(), counts.tolist())))
+        return [(from_micros(bucket * width), count) for bucket, count in sorted(totals.items())]
+
+
+def _compact_once(result, archive: EventArchive, source_path: Path, min_bytes: int, bytes_per_run):
+    """One compactor run (in a spawned process): compact what is pending, or apply the retention when idle."""
+    try:
+        archived = 0
+        if source_path.exists():
+            archived = archive.compact(source_path, min_bytes=min_bytes, bytes_per_run=bytes_per_run)
+        if not archived:
+            # Segments also expire while the honeypot is quiet.
+            archive.prune()
+        result.send((archived, None))
+    except Exception as e:
+        result.send((0, str(e)))
+    finally:
+        result.close()
+
+
+class ArchiveCompactor:
+    """
+    Compacts the honeypot log into the archive every ``interval`` seconds. The daemon thread only waits: decoding the
+    log runs in a spawned process, so it does not compete for the GIL with the honeypot's reactor. A run archives at most
+    ``bytes_per_run`` bytes, so a large existing log is caught up over several runs.
+    """
+
+    def __init__(self, archive: EventArchive, source_path: Path, interval=DEFAULT_COMPACT_INTERVAL,
+                 min_bytes=DEFAULT_MIN_BYTES, bytes_per_run=DEFAULT_BYTES_PER_RUN):
+        self.archive = archive
+        self.source_path = Path(source_path)
+        self.interval = max(float(interval), 1.0)
+        self.min_bytes = int(min_bytes)
+        self.bytes_per_run = int(bytes_per_run) if bytes_per_run else None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="deceptgold-archive", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def run_once(self) -> int:
+        """Run one compaction in a spawned process. Returns the number of events archived."""
+        # spawn: the honeypot has threads running, and forking them is unsafe. The process is daemonic, so exiting
+        # the honeypot does not wait for it; a compaction cut short is redone by the next run.
+        ctx = multiprocessing.get_context("spawn")
+        receiver, sender = ctx.Pipe(duplex=False)
+        process = ctx.Process(target=_compact_once, name="deceptgold-archive",
+                              args=(sender, self.archive, self.source_path, self.min_bytes, self.bytes_per_run),
+                              daemon=True)
+        process.start()
+        sender.close()
+        try:
+            archived, error = receiver.recv()
+        except EOFError:
+            archived, error = 0, "compaction process exited unexpectedly"
+        finally:
+            receiver.close()
+            process.join()
+        if error:
+            raise RuntimeError(error)
+        return archived
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.error(f"[ArchiveCompactor] Erro: {e}")
+
+
+def archive_from_config() -> EventArchive:
+    """The archive of the 'archive' config section (path, retention_days, max_bytes)."""
+    from deceptgold.configuration.config_manager import get_config
+
+    return EventArchive(
+        get_config('archive', 'path', str(ARCHIVE_PATH)),
+        retention_days=float(get_config('archive', 'retention_days', DEFAULT_RETENTION_DAYS) or 0),
+        max_bytes=int(get_config('archive', 'max_bytes', DEFAULT_MAX_BYTES) or 0),
+    )
+
+
+@shared_instance(stop="stop")
+def _shared_compactor(source_path):
+    from deceptgold.configuration.config_manager import get_config
+
+    return ArchiveCompactor(
+        archive_from_config(),
+        source_path,
+        interval=float(get_config('archive', 'interval', DEFAULT_COMPACT_INTERVAL)),
+        min_bytes=int(get_config('archive', 'min_bytes', DEFAULT_MIN_BYTES)),
+        bytes_per_run=int(get_config('archive', 'bytes_per_run', DEFAULT_BYTES_PER_RUN) or 0),
+    ).start()
+
+
+def start_archive_compactor_from_config(source_path: Path):
+    """Start periodic compaction as configured in the 'archive' config section (enabled by default)."""
+    from deceptgold.configuration.config_manager import get_config
+
+    if str(get_config('archive', 'enabled', True)).lower() not in ('1', 'true', 'yes'):
+        return None
+    return _shared_compactor(Path(source_path))
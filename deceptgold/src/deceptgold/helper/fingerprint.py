@@ -1,6 +1,8 @@
 import hashlib
+import json
 import platform
 import subprocess
+import threading
 import uuid
 import re
 import os
@@ -8,6 +10,15 @@ import shutil
 import requests
 import getpass
 
+from pathlib import Path
+
+
+FINGERPRINT_CACHE_PATH = Path.home() / ".deceptgold" / "fingerprint.json"
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+_fingerprint = None
+_fingerprint_lock = threading.Lock()
+
 
 def get_cmd_windows_wmic():
     try:
@@ -176,12 +187,81 @@ def get_mac():
         return ""
 
 
-def get_machine_fingerprint():
+def compute_machine_fingerprint():
+    """Uncached fingerprint. Probing the disk serial may fork lsblk/powershell, so prefer get_machine_fingerprint."""
     raw_string = f"{get_disk_serial()}-{get_mac()}".encode("utf-8")
     fingerprint = hashlib.sha256(raw_string).hexdigest()
     return fingerprint
 
 
+def get_boot_id():
+    try:
+        if os.path.isfile(BOOT_ID_PATH):
+            with open(BOOT_ID_PATH, "r") as f:
+                return f.read().strip()
+    except Exception:
+        pass
+    try:
+        import psutil
+        return str(int(psutil.boot_time()))
+    except Exception:
+        return ""
+
+
+def _mac_digest(mac):
+    return hashlib.sha256(f"mac-{mac}".encode("utf-8")).hexdigest()
+
+
+def _load_cached_fingerprint(cache_path):
+    try:
+        with open(cache_path, "r") as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+
+def _store_cached_fingerprint(cache_path, data):
+    try:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        pass
+
+
+def get_machine_fingerprint(refresh=False, cache_path=None):
+    """
+    Process-wide machine fingerprint. The value is computed at most once per process and persisted under
+    ~/.deceptgold. The persisted value is reused while the MAC address and the boot id are unchanged, so a disk or
+    network card swap is picked up on the next boot.
+    """
+    global _fingerprint
+    if _fingerprint is not None and not refresh:
+        return _fingerprint
+
+    with _fingerprint_lock:
+        if _fingerprint is not None and not refresh:
+            return _fingerprint
+
+        cache_path = cache_path or FINGERPRINT_CACHE_PATH
+        mac_digest = _mac_digest(get_mac())
+        boot_id = get_boot_id()
+
+        cached = {} if refresh else _load_cached_fingerprint(cache_path)
+        fingerprint = cached.get("fingerprint")
+        if not (fingerprint and boot_id and cached.get("boot_id") == boot_id and cached.get("mac") == mac_digest):
+            fingerprint = compute_machine_fingerprint()
+            _store_cached_fingerprint(cache_path, {"fingerprint": fingerprint, "mac": mac_digest, "boot_id": boot_id})
+
+        _fingerprint = fingerprint
+        return _fingerprint
+
+
 def get_ip_public():
     urls = [
         "https://api.ipify.org",
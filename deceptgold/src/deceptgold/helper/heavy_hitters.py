@@ -0,0 +1,119 @@
+"""
+Counters for report dimensions: exact, or Space-Saving with a fixed number of tracked keys.
+
+Space-Saving (Metwally et al.) keeps ``capacity`` counters. A new key replaces the key with the smallest count m and
+starts at m + 1, so every reported count overestimates the true one by at most its ``error`` (<= m <= N / capacity
+for N counted items), and every key occurring more than N / capacity times is guaranteed to be tracked. Summaries of
+disjoint streams merge with the same guarantee (Agarwal et al., "Mergeable summaries").
+"""
+
+import heapq
+from collections import Counter
+
+DEFAULT_CAPACITY = 1000
+
+
+class ExactCounter(Counter):
+    """Counter with the SpaceSaving interface (never has an error)."""
+
+    def add(self, key, count=1):
+        self[key] += count
+
+    def merge(self, other):
+        self.update(other)
+        return self
+
+    def error_bound(self) -> int:
+        return 0
+
+    def to_state(self) -> dict:
+        return {"counts": dict(self)}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        return cls(state.get("counts") or {})
+
+
+class SpaceSaving:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = max(int(capacity), 1)
+        self.counts = {}
+        self.errors = {}
+        self.total = 0
+        # (count, key) entries, one per tracked key. Counts only grow, so an entry is a lower bound of the key's
+        # count; stale entries are refreshed lazily when the minimum is needed.
+        self._heap = []
+
+    def add(self, key, count=1):
+        self.total += count
+        counts = self.counts
+        if key in counts:
+            counts[key] += count
+            return
+        if len(counts) < self.capacity:
+            counts[key] = count
+            self.errors[key] = 0
+            heapq.heappush(self._heap, (count, key))
+            return
+        floor, victim = self._pop_min()
+        del counts[victim]
+        del self.errors[victim]
+        counts[key] = floor + count
+        self.errors[key] = floor
+        heapq.heappush(self._heap, (floor + count, key))
+
+    def _pop_min(self):
+        heap = self._heap
+        while True:
+            count, key = heap[0]
+            current = self.counts[key]
+            if current == count:
+                heapq.heappop(heap)
+                return count, key
+            heapq.heapreplace(heap, (current, key))
+
+    def _min_count(self) -> int:
+        if len(self.counts) < self.capacity:
+            return 0
+        count, key = self._pop_min()
+        heapq.heappush(self._heap, (count, key))
+        return count
+
+    def error_bound(self) -> int:
+        """Largest possible overestimate of any reported count (0 while fewer than capacity keys were seen)."""
+        return self._min_count()
+
+    def most_common(self, n=None):
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if n is None else items[:n]
+
+    def __len__(self):
+        return len(self.counts)
+
+    def merge(self, other):
+        """Fold in the summary of a disjoint stream. Keys missing on one side get that side's minimum count."""
+        floor_self, floor_other = self._min_count(), other._min_count()
+        merged = {}
+        for key in set(self.counts) | set(other.counts):
+            merged[key] = (self.counts.get(key, floor_self) + other.counts.get(key, floor_other),
+                           self.errors.get(key, floor_self) + other.errors.get(key, floor_other))
+        kept = heapq.nlargest(self.capacity, merged.items(), key=lambda item: item[1][0])
+        self.counts = {key: count for key, (count, _) in kept}
+        self.errors = {key: error for key, (_, error) in kept}
+        self.total += other.total
+        self._heap = [(count, key) for key, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def to_state(self) -> dict:
+        return {"capacity": self.capacity, "total": self.total, "counts": self.counts, "errors": self.errors}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        summary = cls(state.get("capacity", DEFAULT_CAPACITY))
+        summary.total = int(state.get("total", 0))
+        summary.counts = dict(state.get("counts") or {})
+        summary.errors = {key: int(state.get("errors", {}).get(key, 0)) for key in summary.counts}
+        summary._heap = [(count, key) for key, count in summary.counts.items()]
+        heapq.heapify(summary._heap)
+        return summary
@@ -0,0 +1,240 @@
+"""
+Live event stream for the dashboard (Server-Sent Events).
+
+One LiveAggregator per dashboard process follows the honeypot log (see log_follower) and turns what was appended
+into numbered deltas: the running totals and the new incidents. Deltas are kept in a short ring shared by every
+viewer, so the log is read and aggregated once however many browsers are connected; each connection only waits for
+deltas newer than the last one it sent. A viewer that connects, fell behind the ring (or reconnects too late with
+Last-Event-ID) receives a snapshot of the same state instead: the totals and the most recent incidents.
+
+Unique sources are counted in a table of at most ``max_sources`` entries, least recently seen first out; a source
+seen again after it was evicted is counted again.
+"""
+
+import html
+import json
+import logging
+import threading
+from collections import Counter, OrderedDict, deque
+
+from deceptgold.helper.log_aggregate import event_timestamp, parse_event
+from deceptgold.helper.log_follower import READ_SIZE, LogFollower
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+HISTORY_SIZE = 512
+KEEPALIVE_SECONDS = 15.0
+MAX_INCIDENTS_PER_DELTA = 50
+RECENT_INCIDENTS = 100
+MAX_SOURCES = 100_000
+RETRY_MS = 3000
+
+LOGTYPE_SEVERITY = {1001: "info", 3000: "low", 3001: "medium", 4000: "medium", 4002: "medium", 5000: "medium"}
+SEVERITY_ALIASES = {"critical": "high", "high": "high", "medium": "medium", "low": "low", "info": "info"}
+
+
+def event_severity(evt: dict) -> str:
+    severity = SEVERITY_ALIASES.get(str(evt.get("severity") or "").lower())
+    if severity:
+        return severity
+    try:
+        return LOGTYPE_SEVERITY.get(int(evt.get("logtype")), "low")
+    except (TypeError, ValueError):
+        return "low"
+
+
+def build_incident(evt: dict, severity: str) -> dict:
+    """Incident in the shape the dashboard renders (values are HTML-escaped)."""
+    ts = event_timestamp(evt)
+    logdata = evt.get("logdata")
+    logdata = logdata if isinstance(logdata, dict) else {}
+    username = evt.get("username") or logdata.get("USERNAME")
+    password = evt.get("password") or logdata.get("PASSWORD")
+    credentials = f" | Credentials: {username}/{password}" if username or password else ""
+    return {
+        "timestamp": ts.isoformat() if ts else None,
+        "severity": severity,
+        "type": html.escape(str(evt.get("service") or f"logtype {evt.get('logtype')}")),
+        "attack": html.escape(str(evt.get("attack_type") or evt.get("logtype") or "event")),
+        "srcHost": html.escape(str(evt.get("src_host") or "unknown")),
+        "credentials": html.escape(credentials),
+    }
+
+
+class LiveAggregator:
+    def __init__(self, source_path, history=HISTORY_SIZE, use_inotify=True, max_sources=MAX_SOURCES):
+        self.source_path = source_path
+        self.use_inotify = use_inotify
+        self.max_sources = max(int(max_sources), 1)
+        self.seq = 0
+        self.totals = {"totalEvents": 0, "uniqueIPs": 0}
+        self.severity_counts = Counter()
+        self.logtype_counts = Counter()
+        self.ready = threading.Event()
+        self._sources = OrderedDict()
+        self._incidents = deque(maxlen=RECENT_INCIDENTS)
+        self._history = deque(maxlen=max(int(history), 1))
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stopped = False
+        self._pending = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="deceptgold-live-stream", daemon=True)
+            self._thread.start()
+        return self
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _new_pending(self):
+        # Only the last events of a batch can become incidents, so only those are kept (the initial pass is one batch).
+        return {"totalEvents": 0, "uniqueIPs": 0, "severityCounts": Counter(), "logtypeCounts": Counter(),
+                "events": deque(maxlen=RECENT_INCIDENTS)}
+
+    def _add(self, evt: dict):
+        pending = self._pending
+        severity = event_severity(evt)
+        pending["totalEvents"] += 1
+        pending["severityCounts"][severity] += 1
+        if evt.get("logtype") is not None:
+            pending["logtypeCounts"][str(evt.get("logtype"))] += 1
+        src_host = evt.get("src_host")
+        if src_host:
+            sources = self._sources
+            if src_host in sources:
+                sources.move_to_end(src_host)
+            else:
+                sources[src_host] = None
+                pending["uniqueIPs"] += 1
+                if len(sources) > self.max_sources:
+                    sources.popitem(last=False)
+        pending["events"].append((evt, severity))
+
+    def _state(self) -> dict:
+        return {**self.totals, "severityCounts": dict(self.severity_counts),
+                "logtypeCounts": dict(self.logtype_counts)}
+
+    def _publish(self):
+        pending, self._pending = self._pending, self._new_pending()
+        if not pending["totalEvents"]:
+            return
+        incidents = [build_incident(evt, severity) for evt, severity in pending["events"]]
+        with self._cond:
+            self.totals["totalEvents"] += pending["totalEvents"]
+            self.totals["uniqueIPs"] += pending["uniqueIPs"]
+            self.severity_counts.update(pending["severityCounts"])
+            self.logtype_counts.update(pending["logtypeCounts"])
+            self._incidents.extend(incidents)
+            if self.ready.is_set():
+                self.seq += 1
+                self._history.append((self.seq, {**self._state(), "incidents": incidents[-MAX_INCIDENTS_PER_DELTA:]}))
+                self._cond.notify_all()
+
+    def _run(self):
+        self._pending = self._new_pending()
+        try:
+            # The existing log is aggregated once, silently; only what is appended afterwards becomes deltas.
+            with LogFollower(self.source_path, start="start", use_inotify=self.use_inotify) as follower:
+                while not self._stopped:
+                    for line, _ in follower.poll_entries(READ_SIZE):
+                        evt = parse_event(line)
+                        if evt is not None:
+                            self._add(evt)
+                    if not follower.caught_up:
+                        continue
+                    self._publish()
+                    self.ready.set()
+                    follower.wait(timeout=1.0)
+        except Exception as e:
+            logger.error(f"[LiveAggregator] Erro: {e}")
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {"seq": self.seq, **self._state(), "incidents": list(self._incidents)}
+
+    def deltas_after(self, seq: int, timeout=None):
+        """
+        Deltas newer than ``seq``, waiting up to ``timeout`` seconds for one. None when ``seq`` is older than the
+        ring (the caller should send a snapshot).
+        """
+        with self._cond:
+            if seq >= self.seq and not self._stopped:
+                self._cond.wait_for(lambda: self.seq > seq or self._stopped, timeout)
+            if seq >= self.seq:
+                return []
+            if not self._history or self._history[0][0] > seq + 1:
+                return None
+            return [(number, delta) for number, delta in self._history if number > seq]
+
+
+def _send(wfile, event, data, event_id=None):
+    message = f"event: {event}\n"
+    if event_id is not None:
+        message += f"id: {event_id}\n"
+    message += f"data: {json.dumps(data, separators=(',', ':'))}\n\n"
+    wfile.write(message.encode("utf-8"))
+    wfile.flush()
+
+
+def serve_event_stream(handler, aggregator: LiveAggregator, keepalive=KEEPALIVE_SECONDS):
+    """
+    Stream the aggregator to one BaseHTTPRequestHandler connection until the client goes away: a snapshot first
+    (unless Last-Event-ID can be resumed from the ring), then one 'delta' event per published delta. Both carry the
+    running totals, so the page never adds them to counts from another source.
+    """
+    handler.send_response(200)
+    handler.send_header("Content-Type", "text/event-stream")
+    handler.send_header("Cache-Control", "no-store")
+    handler.send_header("Connection", "keep-alive")
+    handler.send_header("X-Accel-Buffering", "no")
+    handler.end_headers()
+    aggregator.ready.wait(timeout=keepalive)
+
+    wfile = handler.wfile
+    try:
+        wfile.write(f"retry: {RETRY_MS}\n\n".encode("utf-8"))
+        last = handler.headers.get("Last-Event-ID")
+        seq = int(last) if last and last.isdigit() else None
+        # An id from another dashboard process (seq ahead of ours) or older than the ring cannot be resumed.
+        if seq is None or seq > aggregator.seq or aggregator.deltas_after(seq, timeout=0) is None:
+            snapshot = aggregator.snapshot()
+            seq = snapshot["seq"]
+            _send(wfile, "snapshot", snapshot, seq)
+        while True:
+            deltas = aggregator.deltas_after(seq, timeout=keepalive)
+            if deltas is None:
+                snapshot = aggregator.snapshot()
+                seq = snapshot["seq"]
+                _send(wfile, "snapshot", snapshot, seq)
+            elif not deltas:
+                wfile.write(b": keepalive\n\n")
+                wfile.flush()
+            for number, delta in deltas or ():
+                _send(wfile, "delta", delta, number)
+                seq = number
+            if aggregator.stopped:
+                return
+    except (BrokenPipeError, ConnectionResetError):
+        pass
+
+
+@shared_instance(stop="stop")
+def _shared_aggregator(source_path):
+    return LiveAggregator(source_path).start()
+
+
+def get_live_aggregator(source_path=None) -> LiveAggregator:
+    """The process-wide aggregator, following the honeypot log (started on first use)."""
+    if source_path is None:
+        from deceptgold.helper.helper import get_temp_log_path, NAME_FILE_LOG
+        source_path = get_temp_log_path(NAME_FILE_LOG)
+    return _shared_aggregator(source_path)
@@ -0,0 +1,494 @@
+"""
+Incremental aggregation of the honeypot JSONL log for reports.
+
+The aggregate (counters, time range, reservoir sample) is checkpointed together with the byte offset, device/inode
+and a digest of the head of the log. The next run resumes from that offset and only parses the appended tail; a
+rotated, replaced or truncated log is detected and aggregated again from the start.
+
+Large ranges can be split into newline-aligned chunks aggregated by a process pool; the partial aggregates merge
+exactly (counters, time bounds) and the reservoir samples merge into a sample that is still uniform.
+
+In approximate mode the unbounded dimensions (sources, cities, usernames, paths, user agents) are counted with
+Space-Saving summaries of a fixed size, so memory no longer grows with the log; the result then reports the error
+bound of each of those dimensions.
+"""
+
+import hashlib
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+from deceptgold.helper.heavy_hitters import ExactCounter, SpaceSaving
+from deceptgold.helper.timestamps import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+STATE_VERSION = 2
+REPORT_STATE_PATH = Path.home() / ".deceptgold" / "report_state.json"
+HEAD_BYTES = 4096
+SAMPLE_LIMIT = 40
+MAX_SAMPLE_CHARS = 1500
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+CHUNKS_PER_WORKER = 4
+
+COUNTERS = ("logtypes", "sources", "countries", "cities", "city_country", "dst_ports", "services", "usernames",
+            "paths", "useragents")
+# Dimensions whose number of distinct values grows with internet-wide scanning.
+UNBOUNDED_COUNTERS = ("sources", "cities", "city_country", "usernames", "paths", "useragents")
+
+
+def event_timestamp(evt: dict):
+    return (
+        parse_timestamp(evt.get("local_time_adjusted"))
+        or parse_timestamp(evt.get("local_time"))
+        or parse_timestamp(evt.get("utc_time"))
+    )
+
+
+def extract_geo(evt: dict) -> dict:
+    def _pick(*values):
+        for value in values:
+            if value is None:
+                continue
+            text = str(value).strip()
+            if text:
+                return text
+        return None
+
+    details = evt.get("details")
+    details = details if isinstance(details, dict) else {}
+    logdata = evt.get("logdata")
+    logdata = logdata if isinstance(logdata, dict) else {}
+
+    country = _pick(
+        evt.get("country"),
+        evt.get("country_name"),
+        evt.get("geo_country"),
+        details.get("country"),
+        details.get("country_name"),
+        details.get("geo_country"),
+        logdata.get("country"),
+        logdata.get("country_name"),
+        logdata.get("geo_country"),
+    )
+    city = _pick(
+        evt.get("city"),
+        evt.get("geo_city"),
+        details.get("city"),
+        details.get("geo_city"),
+        logdata.get("city"),
+        logdata.get("geo_city"),
+    )
+    return {"country": country, "city": city}
+
+
+def build_sample(evt: dict, geo: dict) -> dict:
+    sample = {
+        "timestamp": evt.get("timestamp")
+        or evt.get("local_time_adjusted")
+        or evt.get("utc_time")
+        or evt.get("local_time"),
+        "logtype": evt.get("logtype"),
+        "service": evt.get("service"),
+        "src_host": evt.get("src_host"),
+        "src_port": evt.get("src_port"),
+        "dst_host": evt.get("dst_host"),
+        "dst_port": evt.get("dst_port"),
+        "severity": evt.get("severity"),
+        "attack_type": evt.get("attack_type"),
+        "public_ip": evt.get("public_ip"),
+        "country": geo.get("country"),
+        "city": geo.get("city"),
+        "logdata": evt.get("logdata"),
+        "details": evt.get("details"),
+    }
+
+    try:
+        encoded = json.dumps(sample, ensure_ascii=False)
+        if len(encoded) > MAX_SAMPLE_CHARS:
+            sample = {
+                "timestamp": sample.get("timestamp"),
+                "logtype": sample.get("logtype"),
+                "service": sample.get("service"),
+                "src_host": sample.get("src_host"),
+                "public_ip": sample.get("public_ip"),
+                "country": sample.get("country"),
+                "city": sample.get("city"),
+                "dst_port": sample.get("dst_port"),
+                "attack_type": sample.get("attack_type"),
+                "logdata": sample.get("logdata"),
+            }
+    except Exception:
+        sample = {
+            "timestamp": evt.get("timestamp"),
+            "logtype": evt.get("logtype"),
+            "service": evt.get("service"),
+            "src_host": evt.get("src_host"),
+            "public_ip": evt.get("public_ip"),
+            "country": geo.get("country"),
+            "city": geo.get("city"),
+            "dst_port": evt.get("dst_port"),
+            "attack_type": evt.get("attack_type"),
+        }
+    return sample
+
+
+def parse_event(line):
+    if isinstance(line, bytes):
+        line = line.decode("utf-8", errors="ignore")
+    line = (line or "").strip()
+    if not line:
+        return None
+    try:
+        evt = json.loads(line)
+    except Exception:
+        return None
+    return evt if isinstance(evt, dict) else None
+
+
+class LogAggregate:
+    """
+    Running totals of a honeypot log. ``samples`` is a uniform reservoir over every event added. With
+    ``approximate`` set to a capacity, UNBOUNDED_COUNTERS are Space-Saving summaries of that size.
+    """
+
+    def __init__(self, sample_limit=SAMPLE_LIMIT, approximate=None):
+        self.sample_limit = sample_limit
+        self.approximate = int(approximate) if approximate else None
+        self.total = 0
+        self.counters = {name: self._new_counter(name) for name in COUNTERS}
+        self.first_ts = None
+        self.last_ts = None
+        self.samples = []
+        self.seen_events = 0
+
+    def _new_counter(self, name):
+        if self.approximate and name in UNBOUNDED_COUNTERS:
+            return SpaceSaving(self.approximate)
+        return ExactCounter()
+
+    def _bump(self, name, value):
+        if value is None:
+            return
+        s = str(value).strip()
+        if not s:
+            return
+        self.counters[name].add(s)
+
+    def add_event(self, evt: dict):
+        self.total += 1
+
+        self._bump("logtypes", evt.get("logtype"))
+        self._bump("sources", evt.get("src_host"))
+
+        dst_port = evt.get("dst_port")
+        if dst_port not in (None, -1, "-1"):
+            self._bump("dst_ports", dst_port)
+        self._bump("services", evt.get("service"))
+
+        geo = extract_geo(evt)
+        country = geo.get("country")
+        city = geo.get("city")
+        if country:
+            self._bump("countries", country)
+        if city:
+            self._bump("cities", city)
+        if city and country:
+            self._bump("city_country", f"{city}, {country}")
+
+        logdata = evt.get("logdata")
+        if isinstance(logdata, dict):
+            self._bump("usernames", logdata.get("USERNAME"))
+            self._bump("paths", logdata.get("PATH"))
+            ua = logdata.get("USERAGENT")
+            if ua:
+                self.counters["useragents"].add(str(ua)[:200])
+
+        ts = event_timestamp(evt)
+        if ts is not None:
+            if self.first_ts is None or ts < self.first_ts:
+                self.first_ts = ts
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+
+        self._add_sample(build_sample(evt, geo))
+
+    def _add_sample(self, sample):
+        self.seen_events += 1
+        if len(self.samples) < self.sample_limit:
+            self.samples.append(sample)
+            return
+        j = random.randrange(self.seen_events)
+        if j < self.sample_limit:
+            self.samples[j] = sample
+
+    def merge(self, other):
+        """Fold another aggregate (of a disjoint part of the log) into this one."""
+        self.total += other.total
+        for name, counter in other.counters.items():
+            self.counters[name].merge(counter)
+        if other.first_ts is not None and (self.first_ts is None or other.first_ts < self.first_ts):
+            self.first_ts = other.first_ts
+        if other.last_ts is not None and (self.last_ts is None or other.last_ts > self.last_ts):
+            self.last_ts = other.last_ts
+        self.samples = merge_reservoirs(self.samples, self.seen_events, other.samples, other.seen_events,
+                                        self.sample_limit)
+        self.seen_events += other.seen_events
+        return self
+
+    def to_state(self) -> dict:
+        return {
+            "total": self.total,
+            "counters": {name: counter.to_state() for name, counter in self.counters.items()},
+            "first_ts": self.first_ts.isoformat() if self.first_ts else None,
+            "last_ts": self.last_ts.isoformat() if self.last_ts else None,
+            "samples": self.samples,
+            "seen_events": self.seen_events,
+            "sample_limit": self.sample_limit,
+            "approximate": self.approximate,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict):
+        aggregate = cls(sample_limit=int(state.get("sample_limit", SAMPLE_LIMIT)), approximate=state.get("approximate"))
+        aggregate.total = int(state["total"])
+        for name, values in state["counters"].items():
+            aggregate.counters[name] = type(aggregate.counters[name]).from_state(values)
+        aggregate.first_ts = datetime.fromisoformat(state["first_ts"]) if state.get("first_ts") else None
+        aggregate.last_ts = datetime.fromisoformat(state["last_ts"]) if state.get("last_ts") else None
+        aggregate.samples = list(state.get("samples") or [])
+        aggregate.seen_events = int(state.get("seen_events", 0))
+        return aggregate
+
+    def result(self) -> dict:
+        def _as_items(name: str, limit: int):
+            return [{"value": k, "count": v} for (k, v) in self.counters[name].most_common(limit)]
+
+        result = {
+            "total_events": self.total,
+            "time_range": {
+                "first": self.first_ts.isoformat() if self.first_ts else None,
+                "last": self.last_ts.isoformat() if self.last_ts else None,
+            },
+            "top_logtypes": _as_items("logtypes", 15),
+            "top_sources": _as_items("sources", 30),
+            "top_countries": _as_items("countries", 20),
+            "top_cities": _as_items("cities", 25),
+            "top_city_country": _as_items("city_country", 25),
+            "top_dst_ports": _as_items("dst_ports", 15),
+            "top_services": _as_items("services", 15),
+            "top_usernames": _as_items("usernames", 20),
+            "top_paths": _as_items("paths", 20),
+            "top_useragents": _as_items("useragents", 10),
+            "event_samples": list(self.samples),
+        }
+        if self.approximate:
+            # Reported counts may exceed the true ones by at most the bound (true count >= count - bound).
+            result["count_error_bounds"] = {
+                f"top_{name}": {"capacity": self.approximate, "error_bound": self.counters[name].error_bound(),
+                                "max_relative_error": round(1 / self.approximate, 6)}
+                for name in UNBOUNDED_COUNTERS
+            }
+        return result
+
+
+def merge_reservoirs(samples_a, seen_a, samples_b, seen_b, limit):
+    """
+    Uniform sample of ``limit`` events from two disjoint streams, given a uniform reservoir of each. Every pick comes
+    from stream A with probability (events of A not yet picked) / (events not yet picked), i.e. sampling without
+    replacement from the union.
+    """
+    pool_a, pool_b = list(samples_a), list(samples_b)
+    random.shuffle(pool_a)
+    random.shuffle(pool_b)
+    merged = []
+    while len(merged) < limit and seen_a + seen_b > 0:
+        if random.randrange(seen_a + seen_b) < seen_a:
+            merged.append(pool_a.pop())
+            seen_a -= 1
+        else:
+            merged.append(pool_b.pop())
+            seen_b -= 1
+    return merged
+
+
+def split_ranges(path: Path, start: int, end: int, parts: int) -> list:
+    """Split [start, end) into up to ``parts`` ranges that begin right after a newline."""
+    if end <= start:
+        return []
+    bounds = [start]
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for i in range(1, parts):
+            pos = max(start + (end - start) * i // parts, bounds[-1])
+            newline = mm.find(b"\n", pos, end)
+            if newline == -1:
+                break
+            if newline + 1 < end and newline + 1 > bounds[-1]:
+                bounds.append(newline + 1)
+    bounds.append(end)
+    return list(zip(bounds, bounds[1:]))
+
+
+def last_line_end(path: Path, start: int, end: int) -> int:
+    """Offset just past the last newline in [start, end), or ``start`` when the range holds no complete line."""
+    if end <= start:
+        return start
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm.rfind(b"\n", start, end) + 1 or start
+
+
+def aggregate_range(path, start: int, end: int, approximate=None) -> LogAggregate:
+    """Aggregate the lines in [start, end) of the log (a process pool worker)."""
+    aggregate = LogAggregate(approximate=approximate)
+    if end <= start:
+        return aggregate
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        find = mm.find
+        pos = start
+        while pos < end:
+            newline = find(b"\n", pos, end)
+            stop = end if newline == -1 else newline + 1
+            evt = parse_event(mm[pos:stop])
+            if evt is not None:
+                aggregate.add_event(evt)
+            pos = stop
+    return aggregate
+
+
+def aggregate_parallel(path: Path, start: int, end: int, workers: int, progress=None, approximate=None) -> LogAggregate:
+    ranges = split_ranges(path, start, end, workers * CHUNKS_PER_WORKER)
+    aggregate = LogAggregate(approximate=approximate)
+    done = 0
+    # spawn: the caller may have threads running, and forking them is unsafe.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        futures = {pool.submit(aggregate_range, str(path), a, b, approximate): b - a for a, b in ranges}
+        for future in as_completed(futures):
+            aggregate.merge(future.result())
+            done += futures[future]
+            if progress is not None:
+                progress(done, end - start, aggregate.total)
+    return aggregate
+
+
+def _head_digest(path: Path, length: int) -> str:
+    with path.open("rb") as f:
+        return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+def load_checkpoint(state_path: Path, source_path: Path, approximate=None):
+    """
+    (aggregate, offset) to resume from, or (None, 0) when there is no checkpoint valid for the current log and
+    counting mode.
+    """
+    try:
+        state = json.loads(Path(state_path).read_text(encoding="utf-8"))
+        if state.get("version") != STATE_VERSION or state.get("path") != str(source_path):
+            return None, 0
+        if state["aggregate"].get("approximate") != (int(approximate) if approximate else None):
+            return None, 0
+        st = source_path.stat()
+        offset = int(state["offset"])
+        if (st.st_dev, st.st_ino) != (state["device"], state["inode"]) or st.st_size < offset:
+            logger.info("[log_aggregate] Log was rotated or truncated, aggregating it again.")
+            return None, 0
+        if _head_digest(source_path, int(state["head_length"])) != state["head_digest"]:
+            logger.info("[log_aggregate] Log was replaced, aggregating it again.")
+            return None, 0
+        return LogAggregate.from_state(state["aggregate"]), offset
+    except FileNotFoundError:
+        return None, 0
+    except Exception as e:
+        logger.warning(f"[log_aggregate] Ignoring unreadable checkpoint {state_path}: {e}")
+        return None, 0
+
+
+def save_checkpoint(state_path: Path, source_path: Path, aggregate: LogAggregate, offset: int):
+    try:
+        state_path = Path(state_path)
+        st = source_path.stat()
+        head_length = min(HEAD_BYTES, offset)
+        state = {
+            "version": STATE_VERSION,
+            "path": str(source_path),
+            "device": st.st_dev,
+            "inode": st.st_ino,
+            "offset": offset,
+            "head_length": head_length,
+            "head_digest": _head_digest(source_path, head_length),
+            "aggregate": aggregate.to_state(),
+        }
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = state_path.with_name(state_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, state_path)
+    except Exception as e:
+        logger.warning(f"[log_aggregate] Unable to save checkpoint {state_path}: {e}")
+
+
+def aggregate_log(source_path: Path, state_path=REPORT_STATE_PATH, incremental=True, max_events=None,
+                  progress=None, workers=1, approximate=None) -> LogAggregate:
+    """
+    Aggregate the log, resuming from the checkpoint in ``state_path`` when it still matches the file. Only complete
+    lines are consumed, so a line being written is picked up by the next run. ``progress(bytes_done, bytes_total,
+    events)`` is called periodically. A ``max_events`` limit reads from the start and does not checkpoint.
+
+    With ``workers`` > 1, a pending range of at least PARALLEL_MIN_BYTES is aggregated by a process pool.
+    ``approximate`` is the Space-Saving capacity for the unbounded dimensions (None counts exactly).
+    """
+    source_path = Path(source_path)
+    use_checkpoint = state_path is not None and max_events is None
+
+    aggregate, offset = (None, 0)
+    if use_checkpoint and incremental:
+        aggregate, offset = load_checkpoint(state_path, source_path, approximate)
+    if aggregate is None:
+        aggregate, offset = LogAggregate(approximate=approximate), 0
+
+    total_bytes = source_path.stat().st_size
+    tail = None
+    if workers > 1 and max_events is None and total_bytes - offset >= PARALLEL_MIN_BYTES:
+        end = last_line_end(source_path, offset, total_bytes)
+        aggregate.merge(aggregate_parallel(source_path, offset, end, workers, progress, approximate))
+        offset = end
+        with source_path.open("rb") as f:
+            f.seek(end)
+            tail = f.read(total_bytes - end)
+    else:
+        offset, tail = _aggregate_sequential(source_path, aggregate, offset, total_bytes, max_events, progress)
+
+    if use_checkpoint:
+        save_checkpoint(state_path, source_path, aggregate, offset)
+    # An unterminated last line still counts for this run, but stays outside the checkpoint.
+    evt = parse_event(tail) if tail else None
+    if evt is not None:
+        aggregate.add_event(evt)
+    return aggregate
+
+
+def _aggregate_sequential(source_path, aggregate, offset, total_bytes, max_events, progress):
+    """Consume complete lines from ``offset``. Returns the new offset and the unterminated last line, if any."""
+    start = offset
+    tail = None
+    with source_path.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            if max_events is not None and aggregate.total >= max_events:
+                break
+            if not line.endswith(b"\n"):
+                tail = line
+                break
+            offset += len(line)
+            evt = parse_event(line)
+            if evt is not None:
+                aggregate.add_event(evt)
+                if progress is not None and aggregate.total % 1000 == 0:
+                    progress(offset - start, total_bytes - start, aggregate.total)
+    return offset, tail
@@ -0,0 +1,324 @@
+"""
+Event-driven tail of the honeypot JSONL log.
+
+The log's directory is watched with inotify (stat polling where inotify is unavailable), so an idle follower sleeps
+in select() instead of waking up every few hundred milliseconds. When the log changes, everything appended is read
+in large chunks and split into lines in memory. The follower tracks the inode and byte offset of the file it reads:
+after a rotation it finishes the old file before opening the new one at its start, and a truncated log is read
+again from the beginning, so no event is lost or repeated.
+
+A consumer can persist its position with a FollowerCursor (inode, offset and a digest of the last line consumed)
+and resume from it after a restart, including from the rotated file when the log was rotated in the meantime.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from deceptgold.helper import inotify
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 1024 * 1024
+POLL_INTERVAL = 0.2
+# With inotify, a safety re-check in case an event was missed (e.g. a filesystem that does not report writes).
+WATCH_RECHECK_INTERVAL = 5.0
+WATCH_MASK = (inotify.IN_MODIFY | inotify.IN_CLOSE_WRITE | inotify.IN_CREATE | inotify.IN_MOVED_TO
+              | inotify.IN_MOVED_FROM | inotify.IN_DELETE | inotify.IN_ATTRIB)
+CURSOR_DIR = Path.home() / ".deceptgold" / "cursors"
+START_MODES = ("start", "end", "checkpoint")
+
+
+def line_digest(line: str) -> str:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class LogFollower:
+    """
+    Yields the complete lines appended to ``path``. ``start`` is "end" (after the last complete line), "start", or a
+    cursor dict (see FollowerCursor) to resume from. ``position`` is (device, inode, offset) just past the last line
+    returned.
+    """
+
+    def __init__(self, path, start="end", poll_interval=POLL_INTERVAL, read_size=READ_SIZE, use_inotify=True):
+        self.path = Path(path)
+        self.start = start
+        self.poll_interval = poll_interval
+        self.read_size = read_size
+        self.inode = None
+        self.offset = 0
+        self.caught_up = False
+        self._fd = None
+        self._read_offset = 0
+        self._buffer = b""
+        self._notifier = inotify.open_inotify() if use_inotify else None
+        if self._notifier is not None:
+            try:
+                self._notifier.add_watch(self.path.parent, WATCH_MASK)
+            except OSError as e:
+                logger.warning(f"[LogFollower] Erro: unable to watch {self.path.parent}, polling instead: {e}")
+                self._notifier.close()
+                self._notifier = None
+
+    @property
+    def event_driven(self) -> bool:
+        return self._notifier is not None
+
+    @property
+    def position(self):
+        return None if self.inode is None else (self.inode[0], self.inode[1], self.offset)
+
+    def _open(self, path, st, offset):
+        self._fd = os.open(path, os.O_RDONLY)
+        self.inode = (st.st_dev, st.st_ino)
+        self.offset = self._read_offset = offset
+        self._buffer = b""
+
+    def _last_line_end(self, size) -> int:
+        """Where to start from the end: after the last complete line, so a line being written is not cut."""
+        with open(self.path, "rb") as f:
+            start = max(size - self.read_size, 0)
+            f.seek(start)
+            return start + f.read(size - start).rfind(b"\n") + 1 if size else 0
+
+    def _resume(self, cursor: dict, st):
+        """Open the file and offset of ``cursor``, or fall back to the start of the current log."""
+        inode = (cursor.get("device"), cursor.get("inode"))
+        offset = int(cursor.get("offset") or 0)
+        path = self.path if (st.st_dev, st.st_ino) == inode else self._find_rotated(inode)
+        if path is not None:
+            if _line_before(path, offset) == cursor.get("digest"):
+                self._open(path, os.stat(path), offset)
+                if path != self.path:
+                    logger.info(f"[LogFollower] Log was rotated, finishing {path} first.")
+                return
+            logger.info("[LogFollower] Log content changed since the checkpoint, reading it from the start.")
+        else:
+            logger.info("[LogFollower] Checkpointed log is gone, reading the current log from the start.")
+        self._open(self.path, st, 0)
+
+    def _find_rotated(self, inode):
+        try:
+            for entry in os.scandir(self.path.parent):
+                if entry.name.startswith(self.path.name) and entry.name != self.path.name:
+                    st = entry.stat(follow_symlinks=False)
+                    if (st.st_dev, st.st_ino) == inode:
+                        return Path(entry.path)
+        except OSError:
+            pass
+        return None
+
+    def _close_file(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _drain(self, max_bytes=None):
+        """
+        Read the open file up to its end (or about ``max_bytes``). Returns ([(line, offset after it)], at end of
+        file).
+        """
+        entries = []
+        budget = max_bytes
+        while budget is None or budget > 0:
+            chunk = os.pread(self._fd, self.read_size, self._read_offset)
+            if not chunk:
+                return entries, True
+            self._read_offset += len(chunk)
+            if budget is not None:
+                budget -= len(chunk)
+            data = self._buffer + chunk
+            cut = data.rfind(b"\n") + 1
+            self._buffer = data[cut:]
+            if not cut:
+                continue
+            offset = self.offset
+            for raw in data[:cut - 1].split(b"\n"):
+                offset += len(raw) + 1
+                line = raw.decode("utf-8", errors="ignore").strip()
+                if line:
+                    entries.append((line, offset))
+            self.offset = offset
+        return entries, False
+
+    def poll_entries(self, max_bytes=None) -> list:
+        """
+        [(line, (device, inode, offset after the line))] available now, following rotation and truncation. With
+        ``max_bytes``, a large backlog is returned in batches; ``caught_up`` tells whether the end was reached.
+        """
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None
+
+        if self._fd is None:
+            if st is None:
+                # A log created from now on only holds new events.
+                if self.start == "end":
+                    self.start = "start"
+                self.caught_up = True
+                return []
+            if isinstance(self.start, dict):
+                self._resume(self.start, st)
+            else:
+                self._open(self.path, st, self._last_line_end(st.st_size) if self.start == "end" else 0)
+            self.start = "start"
+
+        inode = self.inode
+        entries, at_end = self._drain(max_bytes)
+        result = [(line, (inode[0], inode[1], offset)) for line, offset in entries]
+        self.caught_up = at_end
+        if not at_end or st is None:
+            return result
+        if (st.st_dev, st.st_ino) != self.inode:
+            # Rotated: the old file is finished (its unterminated last line included), continue with the new one.
+            tail = self._buffer.decode("utf-8", errors="ignore").strip()
+            if tail:
+                result.append((tail, (inode[0], inode[1], self._read_offset)))
+            self._close_file()
+            self._open(self.path, st, 0)
+            result.extend(self.poll_entries(max_bytes))
+        elif st.st_size < self._read_offset:
+            logger.info(f"[LogFollower] {self.path} was truncated, reading it from the start.")
+            self.offset = self._read_offset = 0
+            self._buffer = b""
+            result.extend(self.poll_entries(max_bytes))
+        return result
+
+    def poll(self, max_bytes=None) -> list:
+        """Lines available now."""
+        return [line for line, _ in self.poll_entries(max_bytes)]
+
+    def wait(self, timeout=None):
+        """Block until the log may have changed, or ``timeout`` seconds (default: the polling/re-check interval)."""
+        if self._notifier is None:
+            time.sleep(self.poll_interval if timeout is None else min(timeout, self.poll_interval))
+            return
+        deadline = time.monotonic() + (WATCH_RECHECK_INTERVAL if timeout is None else timeout)
+        name = self.path.name
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = self._notifier.read_events(timeout=remaining)
+            # Ignore other files of the directory (e.g. the rest of /tmp).
+            if any(event_name == name or mask & inotify.IN_Q_OVERFLOW for _, mask, _, event_name in events):
+                return
+
+    def entries(self, batch_bytes=READ_SIZE, on_idle=None):
+        """
+        Endless (line, position) stream. A backlog is read in batches without waiting in between (catch-up); once
+        at the end of the log, ``on_idle()`` is called and the follower waits for changes.
+        """
+        while True:
+            yield from self.poll_entries(batch_bytes)
+            if self.caught_up:
+                if on_idle is not None:
+                    on_idle()
+                self.wait()
+
+    def __iter__(self):
+        for line, _ in self.entries():
+            yield line
+
+    def close(self):
+        self._close_file()
+        if self._notifier is not None:
+            self._notifier.close()
+            self._notifier = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _line_before(path, offset):
+    """Digest of the line ending at ``offset`` (None at offset 0 or when the file is shorter)."""
+    if offset <= 0:
+        return None
+    try:
+        with open(path, "rb") as f:
+            start = max(offset - READ_SIZE, 0)
+            f.seek(start)
+            data = f.read(offset - start)
+    except OSError:
+        return None
+    if len(data) != offset - start or not data.endswith(b"\n"):
+        return None
+    line = data[data.rfind(b"\n", 0, len(data) - 1) + 1:].decode("utf-8", errors="ignore").strip()
+    return line_digest(line)
+
+
+class FollowerCursor:
+    """
+    Durable position of one consumer of the log, in ~/.deceptgold/cursors/<consumer>.json. ``advance`` records the
+    position of each consumed line in memory; it is written to disk every ``commit_every`` lines or
+    ``commit_interval`` seconds, and by ``commit``.
+    """
+
+    def __init__(self, consumer, directory=CURSOR_DIR, commit_every=500, commit_interval=2.0):
+        self.path = Path(directory) / f"{consumer}.json"
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._pending = None
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def load(self):
+        """The saved cursor dict, or None."""
+        try:
+            cursor = json.loads(self.path.read_text(encoding="utf-8"))
+            return cursor if isinstance(cursor, dict) and "offset" in cursor else None
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"[FollowerCursor] Ignoring unreadable cursor {self.path}: {e}")
+            return None
+
+    def advance(self, line: str, position):
+        with self._lock:
+            self._pending = (line, position)
+            self._uncommitted += 1
+            if self._uncommitted >= self.commit_every or time.monotonic() - self._last_commit >= self.commit_interval:
+                self._commit_locked()
+
+    def commit(self):
+        with self._lock:
+            self._commit_locked()
+
+    def _commit_locked(self):
+        if self._pending is None:
+            return
+        line, (device, inode, offset) = self._pending
+        cursor = {"device": device, "inode": inode, "offset": offset, "digest": line_digest(line)}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cursor, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"[FollowerCursor] Erro: unable to save {self.path}: {e}")
+            return
+        self._pending = None
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+
+def open_follower(path, start="end", cursor=None, **kwargs) -> LogFollower:
+    """
+    LogFollower for a ``start`` mode: "start", "end", or "checkpoint" (the position saved in ``cursor``, or the end
+    of the log when there is none yet).
+    """
+    if start not in START_MODES:
+        raise ValueError(f"start must be one of {', '.join(START_MODES)}")
+    if start == "checkpoint":
+        start = (cursor.load() if cursor is not None else None) or "end"
+    return LogFollower(path, start=start, **kwargs)
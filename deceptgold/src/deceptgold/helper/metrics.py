@@ -0,0 +1,342 @@
+"""
+In-process metrics for the honeypot daemon.
+
+Counters and latency histograms are updated on the hot path (a lock and a dict update, no I/O). Values owned by
+other components (queue depths, rate limiter state, reward progress) are read by collectors at scrape time only.
+A small HTTP server on localhost exposes them in Prometheus text format on /metrics and as JSON on /metrics.json,
+which the dashboard serves on /api/metrics.
+"""
+
+import bisect
+import json
+import logging
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+DEFAULT_METRICS_PORT = 9464
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labelnames, labels):
+    if len(labels) == len(labelnames):
+        try:
+            return tuple([str(labels[name]) for name in labelnames])
+        except KeyError:
+            pass
+    raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = (f'{name}="{_escape(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels) if self.labelnames or labels else ()
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(_label_key(self.labelnames, labels) if labels or self.labelnames else (), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name + ("_total" if not self.name.endswith("_total") else ""), dict(zip(self.labelnames, key)),
+                 value) for key, value in items]
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels) if self.labelnames or labels else ()
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def snapshot(self, **labels):
+        """{'count', 'sum', 'buckets': {upper bound: cumulative count}} for one label set."""
+        key = _label_key(self.labelnames, labels) if self.labelnames or labels else ()
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                return {"count": 0, "sum": 0.0, "buckets": {}}
+            counts, total, count = list(state[0]), state[1], state[2]
+        cumulative, buckets = 0, {}
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        return {"count": count, "sum": total, "buckets": buckets}
+
+    def samples(self):
+        with self._lock:
+            keys = list(self._values)
+        samples = []
+        for key in keys:
+            labels = dict(zip(self.labelnames, key))
+            snapshot = self.snapshot(**labels)
+            for bound, count in snapshot["buckets"].items():
+                samples.append((self.name + "_bucket", dict(labels, le=_format_value(bound)), count))
+            samples.append((self.name + "_sum", labels, snapshot["sum"]))
+            samples.append((self.name + "_count", labels, snapshot["count"]))
+        return samples
+
+
+class _Timer:
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric '{name}' is already registered as a {metric.type}")
+            return metric
+
+    def counter(self, name, help, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, help, labelnames=labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help, labelnames=labelnames, buckets=buckets)
+
+    def register_collector(self, collector):
+        """
+        ``collector()`` is called at scrape time and yields (name, type, help, samples) with samples a list of
+        (labels dict, value). A collector that raises is skipped.
+        """
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+        return collector
+
+    def collect(self):
+        """Every metric family as (name, type, help, [(sample name, labels, value)])."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = [(metric.name, metric.type, metric.help, metric.samples()) for metric in metrics]
+        for collector in collectors:
+            try:
+                for name, kind, help, samples in collector():
+                    sample_name = name + "_total" if kind == "counter" and not name.endswith("_total") else name
+                    families.append((name, kind, help, [(sample_name, labels, value) for labels, value in samples]))
+            except Exception as e:
+                logger.debug(f"[metrics] Collector {collector} failed: {e}")
+        return families
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for name, kind, help, samples in self.collect():
+            # Like prometheus_client, a counter's HELP and TYPE name its _total samples.
+            if kind == "counter" and not name.endswith("_total"):
+                name += "_total"
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """JSON-friendly view: {family: [{'labels': {...}, 'value': v} | histogram summary]}."""
+        result = {}
+        for name, kind, help, samples in self.collect():
+            if kind != "histogram":
+                result[name] = [{"labels": labels, "value": value} for _, labels, value in samples]
+                continue
+            series = {}
+            for sample_name, labels, value in samples:
+                labels = dict(labels)
+                bound = labels.pop("le", None)
+                entry = series.setdefault(tuple(sorted(labels.items())), {"labels": labels, "buckets": {}})
+                if bound is not None:
+                    entry["buckets"][bound] = value
+                else:
+                    entry[sample_name[len(name) + 1:]] = value
+            for entry in series.values():
+                entry["p50"] = _quantile(entry, 0.5)
+                entry["p99"] = _quantile(entry, 0.99)
+            result[name] = list(series.values())
+        return result
+
+
+def _quantile(entry, q):
+    """Upper bound of the bucket holding the q-quantile (None when empty or beyond the last bucket)."""
+    count = entry.get("count", 0)
+    if not count:
+        return None
+    rank = q * count
+    for bound, cumulative in entry["buckets"].items():
+        if cumulative >= rank:
+            return None if bound == "+Inf" else float(bound)
+    return None
+
+
+def stats_collector(prefix, description, stats, counters=(), gauges=(), label=None):
+    """
+    Collector for a component's ``stats()`` dict: the ``counters`` and ``gauges`` keys become {prefix}_{key}
+    families. With ``label``, stats() returns {label value: stats dict} (e.g. one entry per notification channel).
+    """
+    def collect():
+        current = stats()
+        series = list(current.items()) if label else [(None, current)]
+        for keys, kind in ((counters, "counter"), (gauges, "gauge")):
+            for key in keys:
+                samples = [({label: name} if label else {}, values[key]) for name, values in series if key in values]
+                yield f"{prefix}_{key}", kind, f"{description}: {key.replace('_', ' ')}.", samples
+
+    return collect
+
+
+REGISTRY = MetricsRegistry()
+
+EVENTS_RECEIVED = REGISTRY.counter("deceptgold_events_received", "Honeypot log records received by the log handler.")
+EVENT_PROCESSING = REGISTRY.histogram(
+    "deceptgold_event_processing_seconds", "Time spent classifying, notifying and rewarding one event.", ("logtype",))
+NOTIFICATIONS = REGISTRY.counter("deceptgold_notifications", "Notifications requested, by mode.", ("mode",))
+NOTIFICATION_SEND = REGISTRY.histogram(
+    "deceptgold_notification_send_seconds", "Latency of one notification delivery attempt.", ("channel", "outcome"))
+REWARD_EVENTS = REGISTRY.counter("deceptgold_reward_events", "Events counted towards the next reward, by result.",
+                                 ("result",))
+REWARD_LATENCY = REGISTRY.histogram("deceptgold_reward_seconds", "Time spent accounting one event for rewards.")
+WEB3_ATTACKS = REGISTRY.counter("deceptgold_web3_attacks", "Attacks logged by the Web3 honeypots.",
+                                ("service", "attack_type", "severity"))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        elif path == "/metrics.json":
+            body = json.dumps(self.registry.snapshot()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@shared_instance()
+def _serve_metrics(host, port, registry):
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    try:
+        server = ThreadingHTTPServer((host, port), handler)
+    except OSError as e:
+        logger.warning(f"[metrics] Unable to serve metrics on {host}:{port}: {e}")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="deceptgold-metrics", daemon=True).start()
+    return server
+
+
+def start_metrics_server(host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT, registry=REGISTRY):
+    """Serve the registry on a daemon thread. Returns the server, or None when the port cannot be bound."""
+    return _serve_metrics(host, int(port), registry)
+
+
+def start_metrics_from_config():
+    """Start the metrics endpoint as configured in the 'metrics' config section (enabled by default)."""
+    from deceptgold.configuration.config_manager import get_config
+
+    if str(get_config('metrics', 'enabled', True)).lower() not in ('1', 'true', 'yes'):
+        return None
+    return start_metrics_server(get_config('metrics', 'host', DEFAULT_METRICS_HOST),
+                                int(get_config('metrics', 'port', DEFAULT_METRICS_PORT)))
+
+
+def read_metrics(host=DEFAULT_METRICS_HOST, port=DEFAULT_METRICS_PORT, timeout=1.0):
+    """JSON snapshot from a running daemon, or None when it is not reachable (used by the dashboard)."""
+    from urllib.request import urlopen
+
+    try:
+        with urlopen(f"http://{host}:{port}/metrics.json", timeout=timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+    except Exception:
+        return None
+
+
+def read_metrics_from_config(timeout=1.0):
+    """JSON snapshot from the daemon's endpoint of the 'metrics' config section, or None."""
+    from deceptgold.configuration.config_manager import get_config
+
+    host = get_config('metrics', 'host', DEFAULT_METRICS_HOST)
+    # A daemon listening on every interface is reached on localhost.
+    if host in ("0.0.0.0", "::", ""):
+        host = DEFAULT_METRICS_HOST
+    return read_metrics(host, int(get_config('metrics', 'port', DEFAULT_METRICS_PORT)), timeout=timeout)
@@ -0,0 +1,239 @@
+"""
+Batching stage for AI notifications.
+
+Events are collected over a short window and grouped by (attack_type, service); the sources of a group are only
+counted. Each flush sends one combined prompt per chunk of groups to the model and fans the parsed per-group analyses
+back out, so a scan from hundreds of addresses costs a handful of inferences instead of one per source.
+"""
+
+import logging
+import re
+import threading
+import time
+
+from deceptgold.helper.analysis_cache import event_signature, identifying_values, mentions_any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WINDOW_SECONDS = 10.0
+DEFAULT_GROUPS_PER_PROMPT = 8
+DEFAULT_MAX_GROUPS = 1000
+TOKENS_PER_GROUP = 60
+
+SEVERITY_ORDER = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+_ANSWER_LINE = re.compile(r"^\s*(?:#|group\s*)?(\d+)\s*[.):\-]\s*(.+)$", re.IGNORECASE)
+
+
+class EventGroup:
+    def __init__(self, event_data):
+        self.attack_type = event_data.get('attack_type', 'unknown')
+        self.service = event_data.get('service', 'unknown')
+        self.severity = event_data.get('severity', 'medium')
+        self.sample = event_data
+        self.sources = {}
+        self.events = 0
+        self.first_seen = time.time()
+
+    @property
+    def key(self):
+        return self.attack_type, self.service
+
+    def add(self, event_data):
+        self.events += 1
+        src_host = event_data.get('src_host', 'unknown')
+        self.sources[src_host] = self.sources.get(src_host, 0) + 1
+        severity = event_data.get('severity', 'medium')
+        if SEVERITY_ORDER.get(severity, 1) > SEVERITY_ORDER.get(self.severity, 1):
+            self.severity = severity
+
+    def top_sources(self, limit=5):
+        return sorted(self.sources, key=self.sources.get, reverse=True)[:limit]
+
+    def source_summary(self, limit=3) -> str:
+        top = self.top_sources(limit)
+        extra = len(self.sources) - len(top)
+        return ", ".join(top) + (f" (+{extra} more)" if extra > 0 else "")
+
+    def event_data(self) -> dict:
+        """Representative event for formatting: the first sample with the group-wide source list and severity."""
+        data = dict(self.sample)
+        data['src_host'] = self.source_summary()
+        data['severity'] = self.severity
+        data['event_count'] = self.events
+        data['source_count'] = len(self.sources)
+        data['sources'] = dict(self.sources)
+        return data
+
+
+def _magnitude(count: int) -> int:
+    """Order of magnitude of a count (1, 10, 100...), so a cached threat level is only reused at a similar volume."""
+    return 10 ** (len(str(max(int(count), 1))) - 1)
+
+
+def group_signature(group: EventGroup) -> str:
+    """Cache key of a group: its event signature, severity and volume (events and sources)."""
+    return (f"{event_signature(group.sample)}|{group.severity}|{_magnitude(group.events)}"
+            f"|{_magnitude(len(group.sources))}")
+
+
+def build_batch_prompt(groups) -> str:
+    lines = []
+    for index, group in enumerate(groups, 1):
+        logdata = group.sample.get('logdata')
+        detail = ""
+        if group.attack_type == "brute_force_login":
+            detail = f" | Credentials: {group.sample.get('username', 'unknown')}/{group.sample.get('password', 'unknown')}"
+        elif isinstance(logdata, dict) and logdata:
+            detail = f" | Sample data: {str(logdata)[:80]}"
+        lines.append(
+            f"{index}. Type: {group.attack_type} | Service: {group.service} | Severity: {group.severity} | "
+            f"Events: {group.events} | Sources ({len(group.sources)}): {', '.join(group.top_sources())}{detail}")
+
+    return f"""You are an expert cybersecurity threat analyst. Analyze each numbered group of honeypot attacks and provide actionable intelligence.
+
+ATTACK GROUPS:
+{chr(10).join(lines)}
+
+ANALYSIS REQUIREMENTS:
+1. Assess the threat level (LOW/MEDIUM/HIGH/CRITICAL) of each group
+2. Identify likely attacker motivation and techniques
+3. Provide specific actionable recommendations
+
+RESPONSE FORMAT (exactly one line per group, max 150 characters each):
+<group number>. [THREAT_LEVEL] Brief threat analysis - Action: specific_security_recommendation
+
+EXAMPLE:
+1. [CRITICAL] SSH brute force using common passwords - Action: Block IPs immediately and enable fail2ban
+
+Provide your analysis now:
+"""
+
+
+def parse_batch_response(text, count) -> list:
+    """Map a combined completion back to the groups. Groups the model skipped get None."""
+    analyses = [None] * count
+    for line in (text or "").splitlines():
+        match = _ANSWER_LINE.match(line)
+        if not match:
+            continue
+        index = int(match.group(1)) - 1
+        answer = match.group(2).strip()
+        if 0 <= index < count and analyses[index] is None and len(answer) > 10:
+            analyses[index] = answer if answer.startswith('[') else f"[MEDIUM] {answer}"
+    return analyses
+
+
+class AIBatcher:
+    """
+    ``analyze(prompt, max_tokens)`` returns the raw completion (or None); ``deliver(group, analysis)`` sends one
+    notification, with analysis None when the model gave no usable answer for that group. With an AnalysisCache,
+    groups whose signature, severity and volume were analysed before are delivered without a prompt; answers that
+    name a source or the credentials are not cached.
+    """
+
+    def __init__(self, analyze, deliver, window=DEFAULT_WINDOW_SECONDS, groups_per_prompt=DEFAULT_GROUPS_PER_PROMPT,
+                 max_groups=DEFAULT_MAX_GROUPS, cache=None, cache_namespace="notify"):
+        self.analyze = analyze
+        self.deliver = deliver
+        self.cache = cache
+        self.cache_namespace = cache_namespace
+        self.window = max(float(window), 0.0)
+        self.groups_per_prompt = max(int(groups_per_prompt), 1)
+        self.max_groups = max(int(max_groups), 1)
+
+        self._lock = threading.Condition()
+        self._groups = {}
+        self._window_started = None
+        self._thread = None
+        self._stopped = False
+        self.stats = {'events': 0, 'groups': 0, 'prompts': 0, 'dropped': 0, 'cached': 0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="deceptgold-ai-batcher", daemon=True)
+                self._thread.start()
+        return self
+
+    def add(self, event_data) -> bool:
+        with self._lock:
+            self.stats['events'] += 1
+            key = (event_data.get('attack_type', 'unknown'), event_data.get('service', 'unknown'))
+            group = self._groups.get(key)
+            if group is None:
+                if len(self._groups) >= self.max_groups:
+                    self.stats['dropped'] += 1
+                    return False
+                group = self._groups[key] = EventGroup(event_data)
+            group.add(event_data)
+            if self._window_started is None:
+                self._window_started = time.monotonic()
+                self._lock.notify()
+        return True
+
+    def _take(self):
+        with self._lock:
+            groups = list(self._groups.values())
+            self._groups = {}
+            self._window_started = None
+        return groups
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._stopped and self._window_started is None:
+                    self._lock.wait()
+                if self._stopped:
+                    return
+                remaining = self._window_started + self.window - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+            self.flush()
+
+    def flush(self) -> int:
+        """Analyze and deliver everything collected so far. Returns the number of groups delivered."""
+        groups = self._take()
+        pending = []
+        for group in groups:
+            analysis = self.cache.get(self.cache_namespace, group_signature(group)) if self.cache else None
+            if analysis is None:
+                pending.append(group)
+            else:
+                self.stats['cached'] += 1
+                self._deliver(group, analysis)
+
+        for start in range(0, len(pending), self.groups_per_prompt):
+            chunk = pending[start:start + self.groups_per_prompt]
+            analyses = [None] * len(chunk)
+            try:
+                text = self.analyze(build_batch_prompt(chunk), TOKENS_PER_GROUP * len(chunk))
+                self.stats['prompts'] += 1
+                analyses = parse_batch_response(text, len(chunk))
+            except Exception as error:
+                logger.error(f"[ai_batcher] Batch analysis failed: {error}")
+
+            for group, analysis in zip(chunk, analyses):
+                if analysis is not None and self.cache is not None and not mentions_any(
+                        analysis, identifying_values(group.sample) | (set(group.sources) - {'unknown'})):
+                    self.cache.put(self.cache_namespace, group_signature(group), analysis)
+                self._deliver(group, analysis)
+        self.stats['groups'] += len(groups)
+        return len(groups)
+
+    def _deliver(self, group, analysis):
+        try:
+            self.deliver(group, analysis)
+        except Exception as error:
+            logger.error(f"[ai_batcher] Error delivering notification: {error}")
+
+    def stop(self):
+        """Stop the window thread and deliver what is still pending."""
+        with self._lock:
+            self._stopped = True
+            self._lock.notify()
+        if self._thread is not None:
+            self._thread.join(2)
+        self.flush()
@@ -4,12 +4,21 @@ from deceptgold.configuration.config_manager import get_config, update_config
 from deceptgold.helper.fingerprint import get_machine_fingerprint
 
 
-def send_message_webhook_discord(message_send, fingerprint=None):
+def webhook_discord_request(message_send, fingerprint=None):
+    """Return (url, request kwargs) for the discord webhook, or None when it is not configured."""
     if not fingerprint:
         fingerprint = get_machine_fingerprint()
     endpoint_webhook_discord = get_config(module_name_honeypot='webhook', key='discord', passwd=fingerprint, default='')
-    if endpoint_webhook_discord:
-        httpx.post(url=endpoint_webhook_discord, json={"content": {"deceptgold": {"success": True, "msg": message_send}}})
+    if not endpoint_webhook_discord:
+        return None
+    return endpoint_webhook_discord, {"json": {"content": {"deceptgold": {"success": True, "msg": message_send}}}}
+
+
+def send_message_webhook_discord(message_send, fingerprint=None):
+    request = webhook_discord_request(message_send, fingerprint)
+    if request:
+        url, kwargs = request
+        httpx.post(url=url, **kwargs)
 
 
 def configure_webhook_discord(endpoint):
@@ -0,0 +1,250 @@
+"""
+Concurrent notification fan-out.
+
+One shared ``httpx.AsyncClient`` (keep-alive connection pool) runs on a private event loop thread. Every channel has
+its own bounded queue, consumer task, timeout and retry policy with exponential backoff, so a slow or failing
+endpoint only delays its own messages: never the other channels, and never the caller, which only enqueues.
+"""
+
+import asyncio
+import logging
+import random
+import threading
+import time
+
+from deceptgold.helper.metrics import NOTIFICATION_SEND, stats_collector
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_TIMEOUT = 10.0
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 60.0
+
+RETRY_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Channel:
+    """
+    A notification destination. ``build(message, fingerprint, parse_mode)`` returns (url, request kwargs), or None
+    when the channel is not configured.
+    """
+
+    def __init__(self, name, build, timeout=DEFAULT_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES,
+                 queue_size=DEFAULT_QUEUE_SIZE, backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        self.name = name
+        self.build = build
+        self.timeout = float(timeout)
+        self.max_retries = max(int(max_retries), 0)
+        self.queue_size = max(int(queue_size), 1)
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+        self.queue = None
+        self.stats = {"queued": 0, "sent": 0, "retried": 0, "failed": 0, "dropped": 0}
+
+    def prepare(self, message, fingerprint=None, parse_mode=None, event=None):
+        """Turn a notification into the queued request. ``event`` is the structured event data, when known."""
+        return self.build(message, fingerprint, parse_mode)
+
+    def backoff(self, attempt, retry_after=None):
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def enqueue(self, request):
+        """Called on the loop thread. A full queue drops its oldest message to keep the newest events."""
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.stats["dropped"] += 1
+        self.queue.put_nowait(request)
+        self.stats["queued"] += 1
+
+    async def timed_send(self, client, request):
+        """send() with its latency recorded per channel and outcome."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            await self.send(client, request)
+            outcome = "sent"
+        except RetryableError:
+            outcome = "retryable"
+            raise
+        finally:
+            NOTIFICATION_SEND.observe(time.perf_counter() - started, channel=self.name, outcome=outcome)
+
+    async def send(self, client, request):
+        url, kwargs = request
+        response = await client.post(url, timeout=self.timeout, **kwargs)
+        if response.status_code in RETRY_STATUS:
+            raise RetryableError(f"HTTP {response.status_code}", parse_retry_after(response))
+        if response.status_code >= 400:
+            raise ValueError(f"HTTP {response.status_code}")
+
+    async def run(self, client):
+        import httpx
+
+        while True:
+            request = await self.queue.get()
+            try:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        await self.timed_send(client, request)
+                        self.stats["sent"] += 1
+                        break
+                    except (RetryableError, httpx.TransportError) as error:
+                        if attempt >= self.max_retries:
+                            raise
+                        self.stats["retried"] += 1
+                        await asyncio.sleep(self.backoff(attempt, getattr(error, "retry_after", None)))
+            except Exception as error:
+                self.stats["failed"] += 1
+                logger.warning(f"[dispatcher] Error sending notification to {self.name}: {error}")
+            finally:
+                self.queue.task_done()
+
+
+class NotificationDispatcher:
+    def __init__(self, channels, max_connections=20):
+        self.channels = {channel.name: channel for channel in channels}
+        self.max_connections = max_connections
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._tasks = []
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run_loop, name="deceptgold-notify", daemon=True)
+                self._thread.start()
+        self._started.wait(5)
+        return self
+
+    def _run_loop(self):
+        try:
+            import httpx
+
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            self._client = httpx.AsyncClient(limits=limits)
+            for channel in self.channels.values():
+                channel.queue = asyncio.Queue(maxsize=channel.queue_size)
+                self._tasks.append(self._loop.create_task(channel.run(self._client)))
+        except Exception as error:
+            logger.error(f"[dispatcher] Unable to start the notification loop: {error}")
+            self._started.set()
+            return
+        # start() returns once the loop is actually running, so dispatch() can rely on is_running().
+        self._loop.call_soon(self._started.set)
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(asyncio.gather(*self._tasks, return_exceptions=True))
+            self._loop.run_until_complete(self._client.aclose())
+            self._loop.close()
+
+    def dispatch(self, message, fingerprint=None, parse_mode=None, event=None) -> list:
+        """Queue a message on every configured channel without waiting. Returns the channel names used."""
+        if self._thread is None:
+            self.start()
+        loop = self._loop
+        if loop is None or not loop.is_running():
+            logger.warning("[dispatcher] Notification loop is not running; notification dropped.")
+            return []
+        used = []
+        for channel in self.channels.values():
+            try:
+                request = channel.prepare(message, fingerprint, parse_mode, event)
+            except Exception as error:
+                logger.warning(f"[dispatcher] Error preparing notification for {channel.name}: {error}")
+                continue
+            if request:
+                try:
+                    loop.call_soon_threadsafe(channel.enqueue, request)
+                except RuntimeError:
+                    logger.warning("[dispatcher] Notification loop closed; notification dropped.")
+                    break
+                used.append(channel.name)
+        return used
+
+    def flush(self, timeout=5.0) -> bool:
+        """Wait until every channel queue is drained (or the timeout expires)."""
+        if self._loop is None or not self._loop.is_running():
+            return True
+
+        async def drain():
+            await asyncio.gather(*(channel.queue.join() for channel in self.channels.values()))
+
+        future = asyncio.run_coroutine_threadsafe(drain(), self._loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+
+    def stop(self, timeout=5.0):
+        if self._loop is None or not self._loop.is_running():
+            return
+        self.flush(timeout)
+        for task in self._tasks:
+            self._loop.call_soon_threadsafe(task.cancel)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        return {name: dict(channel.stats, depth=channel.queue.qsize() if channel.queue else 0)
+                for name, channel in self.channels.items()}
+
+
+def build_default_channels():
+    from deceptgold.configuration.config_manager import get_config
+    from deceptgold.helper.notify.telegram import telegram_request
+    from deceptgold.helper.notify.telegram_channel import TelegramChannel
+    from deceptgold.helper.notify.webhook import custom_webhook_request
+    from deceptgold.helper.notify.slack import webhook_slack_request
+    from deceptgold.helper.notify.discord import webhook_discord_request
+
+    options = dict(
+        timeout=float(get_config('notify', 'timeout', DEFAULT_TIMEOUT)),
+        max_retries=int(get_config('notify', 'max_retries', DEFAULT_MAX_RETRIES)),
+        queue_size=int(get_config('notify', 'queue_size', DEFAULT_QUEUE_SIZE)),
+    )
+    return [
+        TelegramChannel(
+            lambda message, fingerprint, parse_mode: telegram_request(message, fingerprint, parse_mode=parse_mode),
+            chat_rate=float(get_config('telegram', 'chat_rate', 1.0)),
+            global_rate=float(get_config('telegram', 'global_rate', 30.0)),
+            **options),
+        Channel("custom", lambda message, fingerprint, parse_mode: custom_webhook_request(message, fingerprint), **options),
+        Channel("slack", lambda message, fingerprint, parse_mode: webhook_slack_request(message, fingerprint), **options),
+        Channel("discord", lambda message, fingerprint, parse_mode: webhook_discord_request(message, fingerprint), **options),
+    ]
+
+
+@shared_instance(stop="stop", collector=lambda dispatcher: stats_collector(
+    "deceptgold_notify", "Notification channel", dispatcher.stats, label="channel",
+    counters=("queued", "sent", "retried", "failed", "dropped", "coalesced", "digests", "throttled"),
+    gauges=("depth",)))
+def get_notification_dispatcher() -> NotificationDispatcher:
+    return NotificationDispatcher(build_default_channels()).start()
@@ -0,0 +1,332 @@
+"""
+Long-lived local LLM inference worker for AI notifications.
+
+The GGUF model is loaded once in a dedicated child process (llama-cpp-python, or the llama.cpp CLI when the library
+is missing) and then serves prompts from a job queue, so each notification costs one forward pass instead of a model
+load. Jobs return concurrent.futures.Future objects; the number of in-flight jobs is bounded and every job has a
+timeout. A worker that stops answering is restarted on the next submission, and a model that failed to load is
+loaded again by a later submission, with an exponential backoff between attempts.
+"""
+
+import itertools
+import logging
+import multiprocessing
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_TIMEOUT = 30.0
+DEFAULT_MAX_PENDING = 8
+DEFAULT_LOAD_TIMEOUT = 120.0
+DEFAULT_CONTEXT_SIZE = 2048
+DEFAULT_LOAD_RETRY = 5.0
+MAX_LOAD_RETRY = 300.0
+
+LLAMA_BINARY_NAMES = ('llama-cli', 'llama', 'main')
+
+GENERATION_PARAMS = {
+    'max_tokens': 50,  # Short response for notifications
+    'temperature': 0.3,  # Low temperature for consistent analysis
+    'top_p': 0.9,
+    'stop': ["\\n\\n", "ANALYSIS:", "EXAMPLE:"],
+}
+
+_READY = "__ready__"
+_STOP = None
+
+
+class InferenceUnavailable(Exception):
+    pass
+
+
+def find_llama_binary():
+    for binary in LLAMA_BINARY_NAMES:
+        path = shutil.which(binary)
+        if path:
+            return path
+    return None
+
+
+def normalize_analysis(text):
+    """Keep the first '[LEVEL] ...' line of a completion, or tag the first meaningful line as MEDIUM."""
+    if not text:
+        return None
+    lines = [line.strip() for line in text.strip().split('\n') if line.strip()]
+    for line in lines:
+        if line.startswith('['):
+            return line
+    for line in lines:
+        if len(line) > 10:
+            return f"[MEDIUM] {line}"
+    return None
+
+
+def _load_backend(model_path, n_ctx, n_threads):
+    """Return a callable prompt -> completion text. Runs inside the worker process."""
+    try:
+        from llama_cpp import Llama
+
+        llm = Llama(model_path=str(model_path), n_ctx=n_ctx, n_threads=n_threads, verbose=False)
+
+        def generate(prompt, timeout, max_tokens):
+            response = llm(prompt, echo=False, **dict(GENERATION_PARAMS, max_tokens=max_tokens))
+            if response and response.get('choices'):
+                return response['choices'][0]['text']
+            return None
+
+        return generate
+    except ImportError:
+        pass
+
+    binary = find_llama_binary()
+    if not binary:
+        raise InferenceUnavailable("Neither llama-cpp-python nor a llama.cpp binary is available")
+
+    def generate(prompt, timeout, max_tokens):
+        cmd = [binary, '-m', str(model_path), '-p', prompt, '-n', str(max_tokens),
+               '-t', str(n_threads), '--temp', str(GENERATION_PARAMS['temperature']),
+               '--top-p', str(GENERATION_PARAMS['top_p']), '--no-display-prompt']
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        return result.stdout if result.returncode == 0 else None
+
+    return generate
+
+
+def _worker_main(model_path, n_ctx, n_threads, jobs, results):
+    try:
+        generate = _load_backend(model_path, n_ctx, n_threads)
+    except Exception as error:
+        results.put((_READY, False, str(error)))
+        return
+    results.put((_READY, True, None))
+
+    while True:
+        job = jobs.get()
+        if job is _STOP:
+            return
+        job_id, prompt, timeout, max_tokens = job
+        try:
+            results.put((job_id, True, generate(prompt, timeout, max_tokens)))
+        except Exception as error:
+            results.put((job_id, False, str(error)))
+
+
+class InferenceWorker:
+    def __init__(self, model_path, max_pending=DEFAULT_MAX_PENDING, job_timeout=DEFAULT_JOB_TIMEOUT,
+                 load_timeout=DEFAULT_LOAD_TIMEOUT, n_ctx=512, n_threads=2, target=_worker_main,
+                 load_retry=DEFAULT_LOAD_RETRY):
+        self.model_path = str(model_path)
+        self.max_pending = max(int(max_pending), 1)
+        self.job_timeout = float(job_timeout)
+        self.load_timeout = float(load_timeout)
+        self.load_retry = float(load_retry)
+        self.n_ctx = n_ctx
+        self.n_threads = n_threads
+        self._target = target
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._process = None
+        self._jobs = None
+        self._results = None
+        self._collector = None
+        self._ready = threading.Event()
+        self._load_error = None
+        self._load_failures = 0
+        self._retry_at = 0.0
+        self._stopped = False
+        self._last_progress = time.monotonic()
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'timeouts': 0, 'rejected': 0, 'restarts': 0}
+
+    def start(self):
+        with self._lock:
+            self._start_locked()
+        return self
+
+    def _start_locked(self):
+        if self._process is not None and self._process.is_alive():
+            return
+        if self._process is not None:
+            self.stats['restarts'] += 1
+        self._ready.clear()
+        self._load_error = None
+        self._jobs = self._ctx.Queue()
+        self._results = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=self._target, name="deceptgold-inference", daemon=True,
+            args=(self.model_path, self.n_ctx, self.n_threads, self._jobs, self._results))
+        self._process.start()
+        self._collector = threading.Thread(target=self._collect, args=(self._process, self._results),
+                                           name="deceptgold-inference-results", daemon=True)
+        self._collector.start()
+
+    def _collect(self, process, results):
+        while True:
+            try:
+                job_id, ok, payload = results.get(timeout=0.5)
+            except queue.Empty:
+                if not process.is_alive():
+                    self._fail_pending(process, "Inference worker exited")
+                    return
+                self._expire_jobs()
+                continue
+            except (EOFError, OSError):
+                return
+
+            if job_id == _READY:
+                with self._lock:
+                    self._last_progress = time.monotonic()
+                    self._load_error = None if ok else payload
+                    if ok:
+                        self._load_failures = 0
+                    else:
+                        self._load_failures += 1
+                        backoff = min(self.load_retry * 2 ** (self._load_failures - 1), MAX_LOAD_RETRY)
+                        self._retry_at = time.monotonic() + backoff
+                self._ready.set()
+                if not ok:
+                    logger.warning(f"[inference_worker] Model could not be loaded, retrying in {backoff:.0f}s: "
+                                   f"{payload}")
+                    self._fail_pending(process, payload)
+                    return
+                continue
+
+            with self._lock:
+                self._last_progress = time.monotonic()
+                entry = self._pending.pop(job_id, None)
+                if entry is not None:
+                    self.stats['completed' if ok else 'failed'] += 1
+            if entry is not None:
+                self._slots.release()
+                future, _ = entry
+                if ok:
+                    future.set_result(payload)
+                else:
+                    future.set_exception(RuntimeError(payload))
+            self._expire_jobs()
+
+    def _expire_jobs(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [job_id for job_id, (_, deadline) in self._pending.items() if deadline < now]
+            entries = [self._pending.pop(job_id) for job_id in expired]
+            self.stats['timeouts'] += len(entries)
+            # A job expired and the worker has not answered anything for a whole timeout: the model is stuck.
+            stuck = bool(expired) and now - self._last_progress > self.job_timeout
+        for future, _ in entries:
+            self._slots.release()
+            future.set_exception(FutureTimeout("Inference job timed out"))
+        if stuck:
+            logger.warning("[inference_worker] Worker is not answering, restarting it.")
+            self._kill()
+
+    def _fail_pending(self, process, reason):
+        with self._lock:
+            if process is not self._process:
+                return
+            entries = list(self._pending.values())
+            self._pending.clear()
+            self.stats['failed'] += len(entries)
+        for future, _ in entries:
+            self._slots.release()
+            future.set_exception(RuntimeError(reason))
+
+    def _kill(self):
+        process = self._process
+        if process is not None and process.is_alive():
+            process.terminate()
+
+    def submit(self, prompt, timeout=None, max_tokens=None) -> Future:
+        """Queue a prompt. The future resolves to the raw completion, or fails on timeout, overload or model error."""
+        future = Future()
+        if self._stopped:
+            future.set_exception(InferenceUnavailable("Inference worker stopped"))
+            return future
+        with self._lock:
+            load_error = self._load_error if time.monotonic() < self._retry_at else None
+        if load_error:
+            future.set_exception(InferenceUnavailable(load_error))
+            return future
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.stats['rejected'] += 1
+            future.set_exception(InferenceUnavailable("Too many pending inference jobs"))
+            return future
+
+        timeout = self.job_timeout if timeout is None else float(timeout)
+        with self._lock:
+            self._start_locked()
+            job_id = next(self._ids)
+            if not self._pending:
+                self._last_progress = time.monotonic()
+            # The first job also waits for the model load.
+            load_grace = 0 if self._ready.is_set() else self.load_timeout
+            self._pending[job_id] = (future, time.monotonic() + timeout + load_grace)
+            self._jobs.put((job_id, prompt, timeout, max_tokens or GENERATION_PARAMS['max_tokens']))
+            self.stats['submitted'] += 1
+        return future
+
+    def infer(self, prompt, timeout=None, max_tokens=None, normalize=True):
+        """
+        Blocking helper: the analysis line (or the raw completion with normalize=False), or None when the worker
+        could not answer in time.
+        """
+        future = self.submit(prompt, timeout, max_tokens)
+        wait = (self.job_timeout if timeout is None else float(timeout))
+        if not self._ready.is_set():
+            wait += self.load_timeout
+        try:
+            text = future.result(timeout=wait)
+            return normalize_analysis(text) if normalize else text
+        except Exception as error:
+            logger.debug(f"[inference_worker] {error}")
+            return None
+
+    def stop(self, timeout=2.0):
+        self._stopped = True
+        with self._lock:
+            process, jobs = self._process, self._jobs
+        if process is None:
+            return
+        try:
+            jobs.put(_STOP)
+            process.join(timeout)
+        except Exception:
+            pass
+        if process.is_alive():
+            process.terminate()
+        self._fail_pending(process, "Inference worker stopped")
+
+
+def _worker_collector(worker):
+    from deceptgold.helper.metrics import stats_collector
+
+    return stats_collector("deceptgold_inference", "AI inference worker", lambda: worker.stats,
+                           counters=("submitted", "completed", "failed", "timeouts", "rejected", "restarts"))
+
+
+@shared_instance(stop="stop", collector=_worker_collector)
+def _shared_worker(model_path) -> InferenceWorker:
+    from deceptgold.configuration.config_manager import get_config
+
+    return InferenceWorker(
+        model_path,
+        max_pending=int(get_config('ai_settings', 'max_pending_jobs', DEFAULT_MAX_PENDING)),
+        job_timeout=float(get_config('ai_settings', 'inference_timeout', DEFAULT_JOB_TIMEOUT)),
+        n_ctx=int(get_config('ai_settings', 'context_size', DEFAULT_CONTEXT_SIZE)),
+    ).start()
+
+
+def get_inference_worker(model_path) -> InferenceWorker:
+    """Shared worker for a model file, created (and its model loaded) on first use."""
+    return _shared_worker(str(model_path))
@@ -1,77 +1,73 @@
-from deceptgold.helper.notify.telegram import send_message_telegram
 from deceptgold.configuration.opecanary import get_config_value
 from deceptgold.helper.fingerprint import get_machine_fingerprint
-from deceptgold.helper.notify.webhook import send_message_custom_webhook
-from deceptgold.helper.notify.slack import send_message_webhook_slack
-from deceptgold.helper.notify.discord import send_message_webhook_discord
+from deceptgold.helper.notify.dispatcher import get_notification_dispatcher
 from deceptgold.configuration.config_manager import get_config
-import time
-from collections import defaultdict
-
-# Global variables for event aggregation and debouncing
-_last_notification_time = defaultdict(float)
-_event_counters = defaultdict(int)
-_DEBOUNCE_SECONDS = 30  # Don't send similar notifications within 30 seconds
+from deceptgold.helper.metrics import NOTIFICATIONS
+from deceptgold.helper.shared import shared_instance
 
 
 def check_send_notify(message, event_data=None):
-    fingerprint = get_machine_fingerprint()
     mode = get_config('webhook', 'notify_mode', 'default')
     
     if mode == 'ai':
         if not _check_ai_model_available():
             mode = 'default'
+    NOTIFICATIONS.inc(mode=mode)
     
-    # Apply debouncing for AI notifications to reduce spam
+    # AI notifications are analysed in batches: the batcher groups events over a short window and delivers one
+    # notification per group (see _deliver_ai_group).
     if mode == 'ai' and event_data:
-        # Create a key for debouncing based on attack type and source
-        attack_type = event_data.get('attack_type', 'unknown')
-        src_host = event_data.get('src_host', 'unknown')
-        debounce_key = f"{attack_type}_{src_host}"
-        
-        current_time = time.time()
-        last_time = _last_notification_time[debounce_key]
-        
-        # Skip if we sent a similar notification recently
-        if current_time - last_time < _DEBOUNCE_SECONDS:
-            _event_counters[debounce_key] += 1
-            return  # Skip this notification
-        
-        # Generate intelligent AI notification
-        message = _generate_ai_notification(event_data)
-        
-        # Include event count if there were aggregated events
-        if _event_counters[debounce_key] > 0:
-            count = _event_counters[debounce_key] + 1
-            message += f" (x{count} events)"
-            _event_counters[debounce_key] = 0
-        
-        # Update last notification time
-        _last_notification_time[debounce_key] = current_time
-    
+        get_ai_batcher().add(event_data)
+        return
+
+    # Use markdown formatting for AI notifications to match statistics format
+    _send_notification(message, parse_mode="Markdown" if mode == 'ai' else None, event_data=event_data)
+
+
+def _send_notification(message, parse_mode=None, event_data=None):
+    """Queue the message on every configured channel; delivery and retries happen on the dispatcher thread."""
+    fingerprint = get_machine_fingerprint()
     message = f"{get_config_value('device', 'node_id')} - {message}"
+    get_notification_dispatcher().dispatch(message, fingerprint, parse_mode, event=event_data)
 
-    try:
-        # Use markdown formatting for AI notifications to match statistics format
-        parse_mode = "Markdown" if mode == 'ai' else None
-        send_message_telegram(message, fingerprint, parse_mode=parse_mode)
-    except Exception as e:
-        raise Exception(f"Error in send message telegram: {e}")
 
-    try:
-        send_message_custom_webhook(message, fingerprint)
-    except Exception as e:
-        raise Exception(f"Error in send message custom webhook: {e}")
+@shared_instance(stop="stop")
+def get_ai_batcher():
+    from deceptgold.helper.notify.ai_batcher import AIBatcher, DEFAULT_WINDOW_SECONDS, DEFAULT_GROUPS_PER_PROMPT
+    from deceptgold.helper.analysis_cache import get_analysis_cache
 
-    try:
-        send_message_webhook_slack(message, fingerprint)
-    except Exception as e:
-        raise Exception(f"Error in send message slack webhook: {e}")
+    return AIBatcher(
+        _analyze_ai_batch,
+        _deliver_ai_group,
+        window=float(get_config('ai_settings', 'batch_window', DEFAULT_WINDOW_SECONDS)),
+        groups_per_prompt=int(get_config('ai_settings', 'batch_groups', DEFAULT_GROUPS_PER_PROMPT)),
+        cache=get_analysis_cache(),
+    ).start()
 
-    try:
-        send_message_webhook_discord(message, fingerprint)
-    except Exception as e:
-        raise Exception(f"Error in send message discord webhook: {e}")
+
+def _analyze_ai_batch(prompt, max_tokens):
+    """Run one combined prompt on the user's downloaded AI model. Returns the raw completion or None."""
+    from deceptgold.helper.ai_model import get_default_model_target_path
+    from deceptgold.helper.notify.inference_worker import get_inference_worker
+
+    model_path = get_default_model_target_path()
+    if not model_path.exists():
+        return None
+    return get_inference_worker(model_path).infer(prompt, max_tokens=max_tokens, normalize=False)
+
+
+def _deliver_ai_group(group, ai_analysis):
+    event_data = group.event_data()
+    if not ai_analysis:
+        # Fallback to intelligent rule-based analysis only if model fails
+        ai_analysis = _generate_rule_based_analysis(group.attack_type, event_data['src_host'], group.service,
+                                                    group.severity, event_data)
+
+    # Format the notification in an elegant, standardized way
+    message = _format_threat_notification(ai_analysis, event_data)
+    if group.events > 1:
+        message += f" (x{group.events} events)"
+    _send_notification(message, parse_mode="Markdown", event_data=event_data)
 
 
 def _check_ai_model_available():
@@ -82,24 +78,6 @@ def _check_ai_model_available():
         return False
 
 
-def _generate_ai_notification(event_data):
-    attack_type = event_data.get('attack_type', 'unknown')
-    severity = event_data.get('severity', 'medium')
-    src_host = event_data.get('src_host', 'unknown')
-    service = event_data.get('service', 'unknown')
-    logtype = event_data.get('logtype', 0)
-    
-    try:
-        # Use the user's downloaded AI model for real threat intelligence
-        ai_analysis = _run_ai_model_inference(attack_type, src_host, service, severity, logtype, event_data)
-    except Exception as e:
-        # Fallback to intelligent rule-based analysis only if model fails
-        ai_analysis = _generate_rule_based_analysis(attack_type, src_host, service, severity, event_data)
-    
-    # Format the notification in an elegant, standardized way
-    return _format_threat_notification(ai_analysis, event_data)
-
-
 def _format_threat_notification(ai_analysis, event_data):
     """Format threat analysis into an elegant, standardized notification"""
     from deceptgold.configuration.opecanary import get_config_value
@@ -139,188 +117,6 @@ def _format_threat_notification(ai_analysis, event_data):
     return "\n".join(message_lines)
 
 
-def _run_ai_model_inference(attack_type, src_host, service, severity, logtype, event_data):
-    """Run inference using the user's downloaded AI model"""
-    from deceptgold.helper.ai_model import get_default_model_target_path
-    from pathlib import Path
-    import subprocess
-    import tempfile
-    import os
-    
-    model_path = get_default_model_target_path()
-    if not model_path.exists():
-        raise Exception("AI model not found")
-    
-    # Create detailed prompt for the AI model
-    additional_context = ""
-    if attack_type == "brute_force_login" and event_data:
-        username = event_data.get('username', 'unknown')
-        password = event_data.get('password', 'unknown')
-        additional_context = f"\\nCredentials attempted: {username}/{password}"
-    elif event_data.get('logdata'):
-        logdata = event_data.get('logdata', {})
-        if isinstance(logdata, dict) and logdata:
-            additional_context = f"\\nAdditional data: {str(logdata)[:100]}"
-    
-    prompt = f"""You are an expert cybersecurity threat analyst. Analyze this honeypot attack and provide actionable intelligence.
-
-ATTACK DETAILS:
-- Type: {attack_type}
-- Source IP: {src_host}
-- Target Service: {service}
-- Severity Level: {severity}
-- Log Type Code: {logtype}{additional_context}
-
-ANALYSIS REQUIREMENTS:
-1. Assess the threat level (LOW/MEDIUM/HIGH/CRITICAL)
-2. Identify likely attacker motivation and techniques
-3. Provide specific actionable recommendations
-
-RESPONSE FORMAT:
-[THREAT_LEVEL] Brief threat analysis - Action: specific_security_recommendation
-
-EXAMPLES:
-[CRITICAL] SSH brute force using common passwords - Action: Block IP immediately and enable fail2ban
-[HIGH] SQL injection attempt detected - Action: Patch database and implement WAF rules
-[MEDIUM] Web3 wallet reconnaissance - Action: Monitor for cryptocurrency theft patterns
-
-Provide your analysis now (max 150 characters):"""
-
-    # Create temporary files for input/output
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as prompt_file:
-        prompt_file.write(prompt)
-        prompt_path = prompt_file.name
-    
-    try:
-        # Try to use llama-cpp-python if available
-        try:
-            result = _run_llama_cpp_inference(model_path, prompt)
-            if result and len(result.strip()) > 10:
-                return result.strip()
-        except Exception:
-            pass
-        
-        # Fallback: Try using llama.cpp binary if available
-        try:
-            result = _run_llama_cpp_binary(model_path, prompt_path)
-            if result and len(result.strip()) > 10:
-                return result.strip()
-        except Exception:
-            pass
-        
-        # If no LLM inference works, raise exception to use fallback
-        raise Exception("LLM inference failed")
-        
-    finally:
-        # Clean up temporary files
-        try:
-            os.unlink(prompt_path)
-        except:
-            pass
-
-
-def _run_llama_cpp_inference(model_path, prompt):
-    """Try to run inference using llama-cpp-python library"""
-    try:
-        from llama_cpp import Llama
-        
-        # Load model with conservative settings for notifications
-        llm = Llama(
-            model_path=str(model_path),
-            n_ctx=512,  # Small context for fast inference
-            n_threads=2,  # Limited threads to not block system
-            verbose=False
-        )
-        
-        # Generate response with strict limits
-        response = llm(
-            prompt,
-            max_tokens=50,  # Short response for notifications
-            temperature=0.3,  # Low temperature for consistent analysis
-            top_p=0.9,
-            stop=["\\n\\n", "ANALYSIS:", "EXAMPLE:"],
-            echo=False
-        )
-        
-        if response and 'choices' in response and len(response['choices']) > 0:
-            text = response['choices'][0]['text'].strip()
-            # Clean up the response
-            if text.startswith('['):
-                return text
-            else:
-                return f"[MEDIUM] {text}"
-        
-        return None
-        
-    except ImportError:
-        # llama-cpp-python not installed
-        return None
-    except Exception as e:
-        # Model loading or inference failed
-        return None
-
-
-def _run_llama_cpp_binary(model_path, prompt_path):
-    """Try to run inference using llama.cpp binary"""
-    try:
-        import subprocess
-        
-        # Try common llama.cpp binary locations
-        binary_names = ['llama-cli', 'llama', 'main']
-        llama_binary = None
-        
-        for binary in binary_names:
-            try:
-                result = subprocess.run(['which', binary], capture_output=True, text=True)
-                if result.returncode == 0:
-                    llama_binary = binary
-                    break
-            except:
-                continue
-        
-        if not llama_binary:
-            return None
-        
-        # Run inference with strict parameters
-        cmd = [
-            llama_binary,
-            '-m', str(model_path),
-            '-f', prompt_path,
-            '-n', '50',  # Max 50 tokens
-            '-t', '2',   # 2 threads
-            '--temp', '0.3',  # Low temperature
-            '--top-p', '0.9',
-            '--no-display-prompt'
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=10  # 10 second timeout
-        )
-        
-        if result.returncode == 0 and result.stdout.strip():
-            text = result.stdout.strip()
-            # Clean up the response
-            lines = text.split('\\n')
-            for line in lines:
-                line = line.strip()
-                if line and line.startswith('['):
-                    return line
-            
-            # If no formatted line found, format the first meaningful line
-            for line in lines:
-                line = line.strip()
-                if line and len(line) > 10:
-                    return f"[MEDIUM] {line}"
-        
-        return None
-        
-    except Exception:
-        return None
-
-
 def _generate_rule_based_analysis(attack_type, src_host, service, severity, event_data=None):
     """Generate intelligent threat analysis using rule-based logic"""
     
@@ -42,15 +42,16 @@ def search_chat_id_by_token(token_local, fingerprint):
     except Exception as e:
         print(f"Error: {e}")
 
-def send_message_telegram(message_send, fingerprint=None, chat_id=None, parse_mode=None):
+def telegram_request(message_send, fingerprint=None, chat_id=None, parse_mode=None):
+    """Return (url, request kwargs) for a sendMessage call, or None when Telegram is not configured."""
     if not BOT_TOKEN:
-        return
+        return None
     if not fingerprint:
         fingerprint = get_machine_fingerprint()
     if not chat_id:
         chat_id = get_config(module_name_honeypot='webhook', key='telegram', passwd=fingerprint, default=None)
     if not chat_id:
-        return
+        return None
     url = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
     payload = {
         "chat_id": int(chat_id),
@@ -58,7 +59,15 @@ def send_message_telegram(message_send, fingerprint=None, chat_id=None, parse_mo
     }
     if parse_mode:
         payload["parse_mode"] = parse_mode
-    r = requests.post(url, data=payload)
+    return url, {"data": payload}
+
+
+def send_message_telegram(message_send, fingerprint=None, chat_id=None, parse_mode=None):
+    request = telegram_request(message_send, fingerprint, chat_id, parse_mode)
+    if not request:
+        return
+    url, kwargs = request
+    r = requests.post(url, **kwargs)
     if not r.ok:
         print("Error sending notification to telegram.")
 
@@ -0,0 +1,228 @@
+"""
+Rate-limit-aware Telegram channel for the notification dispatcher.
+
+The Bot API allows roughly 30 messages per second per bot and one per second per chat, and answers 429 with a
+``retry_after`` when exceeded. Messages wait in a per-chat backlog governed by token buckets; when a chat has more
+than one message ready at its next slot, they are coalesced into a single digest (counts per attack type, top
+sources) so nothing is lost while staying inside the limits.
+"""
+
+import asyncio
+import logging
+import time
+from collections import Counter, deque
+
+from deceptgold.helper.notify.dispatcher import Channel, RetryableError, parse_retry_after
+from deceptgold.helper.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MAX_TEXT = 4096
+DIGEST_TOP_SOURCES = 5
+DIGEST_MAX_MESSAGES = 10
+DEFAULT_MAX_BACKLOG = 500
+FOLDED_SOURCES = 100
+
+
+class PendingMessage:
+    """
+    A notification waiting for its chat's next slot. ``summary`` is set on messages that stand for an already folded
+    backlog; ``tasks`` is the number of dispatcher queue items the message still accounts for.
+    """
+    __slots__ = ("url", "kwargs", "event", "queued_at", "attempts", "summary", "tasks")
+
+    def __init__(self, url, kwargs, event, summary=None, tasks=1, queued_at=None):
+        self.url = url
+        self.kwargs = kwargs
+        self.event = event
+        self.summary = summary
+        self.tasks = tasks
+        self.queued_at = time.time() if queued_at is None else queued_at
+        self.attempts = 0
+
+    @property
+    def chat_id(self):
+        return self.kwargs["data"]["chat_id"]
+
+    @property
+    def text(self):
+        return self.kwargs["data"]["text"]
+
+
+def summarize(messages) -> dict:
+    summary = {"notifications": 0, "attack_types": Counter(), "sources": Counter(), "messages": [],
+               "since": min(m.queued_at for m in messages)}
+    for message in messages:
+        if message.summary:
+            summary["notifications"] += message.summary["notifications"]
+            summary["attack_types"].update(message.summary["attack_types"])
+            summary["sources"].update(message.summary["sources"])
+            summary["messages"].extend(message.summary["messages"])
+            continue
+        summary["notifications"] += 1
+        event = message.event
+        if not event:
+            summary["messages"].append(message.text)
+            continue
+        count = int(event.get('event_count') or 1)
+        summary["attack_types"][event.get('attack_type', 'unknown')] += count
+        summary["sources"].update(event.get('sources') or {event.get('src_host', 'unknown'): count})
+    return summary
+
+
+def build_digest(messages) -> str:
+    """Summarise a backlog of notifications for one chat."""
+    summary = summarize(messages)
+    attack_types, sources, other = summary["attack_types"], summary["sources"], summary["messages"]
+
+    elapsed = max(int(time.time() - summary["since"]), 1)
+    lines = [f"Deceptgold digest: {summary['notifications']} notifications in the last {elapsed}s (rate limited)"]
+    if attack_types:
+        lines.append("")
+        lines.append(f"Events by attack type ({sum(attack_types.values())} total):")
+        lines.extend(f"- {attack_type}: {count}" for attack_type, count in attack_types.most_common())
+        lines.append("")
+        lines.append(f"Top sources ({len(sources)} distinct):")
+        lines.extend(f"- {src_host}: {count}" for src_host, count in sources.most_common(DIGEST_TOP_SOURCES))
+    if other:
+        lines.append("")
+        lines.append("Messages:")
+        lines.extend(f"- {text}" for text in other[:DIGEST_MAX_MESSAGES])
+        if len(other) > DIGEST_MAX_MESSAGES:
+            lines.append(f"- ... and {len(other) - DIGEST_MAX_MESSAGES} more")
+
+    text = "\n".join(lines)
+    return text if len(text) <= TELEGRAM_MAX_TEXT else text[:TELEGRAM_MAX_TEXT - 3] + "..."
+
+
+class TelegramChannel(Channel):
+    def __init__(self, build, chat_rate=1.0, chat_burst=1, global_rate=30.0, max_backlog=DEFAULT_MAX_BACKLOG,
+                 clock=time.monotonic, **kwargs):
+        super().__init__("telegram", build, **kwargs)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_backlog = max(int(max_backlog), 2)
+        self.clock = clock
+        self._global = TokenBucket(global_rate, capacity=global_rate, clock=clock)
+        self._chats = {}
+        self._backlog = {}
+        self.stats.update({"coalesced": 0, "digests": 0, "throttled": 0})
+
+    def prepare(self, message, fingerprint=None, parse_mode=None, event=None):
+        request = self.build(message, fingerprint, parse_mode)
+        if not request:
+            return None
+        url, kwargs = request
+        return PendingMessage(url, kwargs, event)
+
+    def _bucket(self, chat_id) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            bucket = self._chats[chat_id] = TokenBucket(self.chat_rate, capacity=self.chat_burst, clock=self.clock)
+        return bucket
+
+    def _next_wakeup(self):
+        waits = [max(self._bucket(chat_id).delay(), self._global.delay())
+                 for chat_id, backlog in self._backlog.items() if backlog]
+        return min(waits) if waits else None
+
+    async def _collect(self):
+        """Move queued messages into the per-chat backlogs, waiting at most until the next chat can send."""
+        wait = self._next_wakeup()
+        if wait is None:
+            pending = [await self.queue.get()]
+        elif wait > 0:
+            try:
+                pending = [await asyncio.wait_for(self.queue.get(), wait)]
+            except asyncio.TimeoutError:
+                pending = []
+        else:
+            pending = []
+        while not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for message in pending:
+            backlog = self._backlog.setdefault(message.chat_id, deque())
+            backlog.append(message)
+            if len(backlog) > self.max_backlog:
+                self._fold(backlog)
+
+    def _fold(self, backlog):
+        """Replace a long backlog by one summary message so memory stays bounded while the chat is throttled."""
+        messages = list(backlog)
+        summary = summarize(messages)
+        summary["sources"] = Counter(dict(summary["sources"].most_common(FOLDED_SOURCES)))
+        summary["messages"] = summary["messages"][:DIGEST_MAX_MESSAGES]
+        folded = PendingMessage(messages[0].url, messages[0].kwargs, None, summary=summary,
+                                tasks=sum(m.tasks for m in messages), queued_at=summary["since"])
+        folded.attempts = max(m.attempts for m in messages)
+        backlog.clear()
+        backlog.append(folded)
+
+    def _done(self, messages):
+        for message in messages:
+            for _ in range(message.tasks):
+                self.queue.task_done()
+            message.tasks = 0
+
+    async def _send_chat(self, client, chat_id, backlog):
+        bucket = self._bucket(chat_id)
+        if bucket.delay() > 0 or not self._global.try_acquire():
+            return
+        bucket.try_acquire()
+
+        messages = list(backlog)
+        backlog.clear()
+        if len(messages) == 1 and not messages[0].summary:
+            url, kwargs = messages[0].url, messages[0].kwargs
+        else:
+            data = {"chat_id": chat_id, "text": build_digest(messages)}
+            url, kwargs = messages[0].url, {"data": data}
+
+        try:
+            await self.timed_send(client, (url, kwargs))
+        except Exception as error:
+            import httpx
+
+            retry_after = getattr(error, "retry_after", None)
+            if isinstance(error, RetryableError) and retry_after is not None:
+                self.stats["throttled"] += 1
+            attempts = max(m.attempts for m in messages) + 1
+            if not isinstance(error, (RetryableError, httpx.TransportError)) or attempts > self.max_retries:
+                self.stats["failed"] += 1
+                logger.warning(f"[telegram] Error sending notification to telegram: {error}")
+                self._done(messages)
+                return
+            for message in messages:
+                message.attempts = attempts
+            self.stats["retried"] += 1
+            bucket.block_for(self.backoff(attempts - 1, retry_after))
+            backlog.extendleft(reversed(messages))
+            return
+
+        self.stats["sent"] += 1
+        if len(messages) > 1:
+            self.stats["digests"] += 1
+            self.stats["coalesced"] += len(messages)
+        self._done(messages)
+
+    async def send(self, client, request):
+        url, kwargs = request
+        response = await client.post(url, timeout=self.timeout, **kwargs)
+        if response.status_code == 429:
+            retry_after = None
+            try:
+                retry_after = float(response.json().get("parameters", {}).get("retry_after"))
+            except Exception:
+                retry_after = parse_retry_after(response)
+            raise RetryableError("HTTP 429", retry_after)
+        if response.status_code >= 500:
+            raise RetryableError(f"HTTP {response.status_code}", parse_retry_after(response))
+        if response.status_code >= 400:
+            raise ValueError(f"HTTP {response.status_code}")
+
+    async def run(self, client):
+        while True:
+            await self._collect()
+            for chat_id, backlog in list(self._backlog.items()):
+                if backlog:
+                    await self._send_chat(client, chat_id, backlog)
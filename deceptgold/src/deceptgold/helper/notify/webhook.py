@@ -4,12 +4,21 @@ from deceptgold.configuration.config_manager import get_config, update_config
 from deceptgold.helper.fingerprint import get_machine_fingerprint
 
 
-def send_message_custom_webhook(message_send, fingerprint=None):
+def custom_webhook_request(message_send, fingerprint=None):
+    """Return (url, request kwargs) for the custom webhook, or None when it is not configured."""
     if not fingerprint:
         fingerprint = get_machine_fingerprint()
     endpoint_webhook = get_config(module_name_honeypot='webhook', key='custom', passwd=fingerprint, default='')
-    if endpoint_webhook:
-        httpx.post(url=endpoint_webhook, json={"deceptgold": {"success": True, "msg": message_send}})
+    if not endpoint_webhook:
+        return None
+    return endpoint_webhook, {"json": {"deceptgold": {"success": True, "msg": message_send}}}
+
+
+def send_message_custom_webhook(message_send, fingerprint=None):
+    request = custom_webhook_request(message_send, fingerprint)
+    if request:
+        url, kwargs = request
+        httpx.post(url=url, **kwargs)
 
 
 def configure_custom_webhook(endpoint):
@@ -0,0 +1,139 @@
+"""
+Bounded in-process event pipeline for the honeypot log handler.
+
+The log handler runs on the Twisted reactor thread, so it must never block on
+parsing, notifications or reward accounting. It only enqueues the raw record
+and a dedicated worker thread drains the queue.
+"""
+
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_BLOCK = "block"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK)
+
+DEFAULT_QUEUE_SIZE = 10_000
+DEFAULT_BLOCK_TIMEOUT = 0.05
+
+_STOP = object()
+
+
+class EventPipeline:
+    """
+    Single-consumer queue between the log handler and the event worker.
+
+    Overflow policies when the queue is full:
+        drop_newest  Discard the incoming record (default, never blocks the reactor).
+        drop_oldest  Discard the oldest queued record to make room for the new one.
+        block        Wait up to ``block_timeout`` seconds, then discard the incoming record.
+    """
+
+    def __init__(self, handler, maxsize: int = DEFAULT_QUEUE_SIZE, overflow: str = OVERFLOW_DROP_NEWEST,
+                 block_timeout: float = DEFAULT_BLOCK_TIMEOUT, name: str = "deceptgold-events"):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Use one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.handler = handler
+        self.maxsize = max(int(maxsize), 1)
+        self.overflow = overflow
+        self.block_timeout = max(float(block_timeout), 0.0)
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=self.maxsize)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._queued = 0
+        self._dropped = 0
+        self._processed = 0
+        self._failed = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, raw) -> bool:
+        """Enqueue a raw record. Returns False when the record was dropped."""
+        if self._thread is None:
+            self.start()
+
+        try:
+            if self.overflow == OVERFLOW_BLOCK:
+                self._queue.put(raw, timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait(raw)
+        except queue.Full:
+            if self.overflow != OVERFLOW_DROP_OLDEST or not self._make_room(raw):
+                self._count_drop()
+                return False
+
+        with self._lock:
+            self._queued += 1
+        return True
+
+    def _make_room(self, raw) -> bool:
+        try:
+            self._queue.get_nowait()
+            self._queue.task_done()
+            self._count_drop()
+        except queue.Empty:
+            pass
+        try:
+            self._queue.put_nowait(raw)
+            return True
+        except queue.Full:
+            return False
+
+    def _count_drop(self):
+        with self._lock:
+            self._dropped += 1
+
+    def _run(self):
+        while True:
+            raw = self._queue.get()
+            try:
+                if raw is _STOP:
+                    return
+                try:
+                    self.handler(raw)
+                    with self._lock:
+                        self._processed += 1
+                except Exception as error:
+                    with self._lock:
+                        self._failed += 1
+                    logger.error(f"[event_pipeline] Error processing event: {error}")
+            finally:
+                self._queue.task_done()
+
+    def stop(self, timeout: float = 2.0):
+        """Stop the worker after draining what is already queued (bounded by ``timeout``)."""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        thread.join(timeout)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "queued": self._queued,
+                "dropped": self._dropped,
+                "processed": self._processed,
+                "failed": self._failed,
+                "depth": self._queue.qsize(),
+                "maxsize": self.maxsize,
+                "overflow": self.overflow,
+            }
@@ -0,0 +1,141 @@
+"""
+Opt-in request profiling for the honeypot listeners.
+
+Off by default: the wrapped request handlers only read one attribute. When enabled (config 'profiling.enabled', or
+SIGUSR1 / 'service profile toggle' on a running daemon), tracemalloc is started and one request out of ``sample_every`` records its wall
+time, CPU time and Python heap delta into an in-memory ring buffer. SIGUSR2 (or 'service profile dump') writes the
+buffer and the current top allocations to PROFILE_DUMP_PATH.
+"""
+
+import json
+import logging
+import signal
+import threading
+import time
+import tracemalloc
+from collections import deque
+
+from deceptgold.helper.helper import get_temp_log_path
+from deceptgold.helper.shared import shared_instance
+
+logger = logging.getLogger(__name__)
+
+NAME_FILE_PROFILE = '.deceptgold_profile.json'
+PROFILE_DUMP_PATH = get_temp_log_path(NAME_FILE_PROFILE)
+
+DEFAULT_SAMPLE_EVERY = 100
+DEFAULT_CAPACITY = 1000
+DEFAULT_TOP_ALLOCATIONS = 10
+
+
+class RequestProfiler:
+    def __init__(self, sample_every=DEFAULT_SAMPLE_EVERY, capacity=DEFAULT_CAPACITY,
+                 top_allocations=DEFAULT_TOP_ALLOCATIONS):
+        self.sample_every = max(int(sample_every), 1)
+        self.top_allocations = max(int(top_allocations), 1)
+        self.enabled = False
+        self.samples = deque(maxlen=max(int(capacity), 1))
+        self.requests = 0
+        self._started_tracing = False
+        self._lock = threading.Lock()
+
+    def enable(self):
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            self.enabled = True
+
+    def disable(self):
+        with self._lock:
+            self.enabled = False
+            # Leave tracemalloc alone when someone else started it.
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def toggle(self) -> bool:
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    def begin(self, context):
+        """Start measuring a request. Returns a token for end(), or None when the request is not sampled."""
+        self.requests += 1
+        if not self.enabled or self.requests % self.sample_every:
+            return None
+        heap = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        return context, time.time(), time.perf_counter(), time.process_time(), heap
+
+    def end(self, token):
+        context, started_at, wall, cpu, heap = token
+        sample = {
+            "context": context,
+            "time": started_at,
+            "wall_ms": round((time.perf_counter() - wall) * 1000, 3),
+            "cpu_ms": round((time.process_time() - cpu) * 1000, 3),
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            sample["heap_delta_kb"] = round((current - heap) / 1024, 1)
+            sample["heap_peak_kb"] = round(peak / 1024, 1)
+        self.samples.append(sample)
+
+    def report(self) -> dict:
+        samples = list(self.samples)
+        report = {
+            "enabled": self.enabled,
+            "sample_every": self.sample_every,
+            "requests": self.requests,
+            "samples": samples,
+            "top_allocations": [],
+        }
+        if samples:
+            wall = sorted(sample["wall_ms"] for sample in samples)
+            report["wall_ms"] = {"p50": wall[len(wall) // 2], "p99": wall[min(int(len(wall) * 0.99), len(wall) - 1)],
+                                 "max": wall[-1]}
+        if tracemalloc.is_tracing():
+            for stat in tracemalloc.take_snapshot().statistics('lineno')[:self.top_allocations]:
+                report["top_allocations"].append(
+                    {"where": str(stat.traceback), "count": stat.count, "size_kb": round(stat.size / 1024, 1)})
+        return report
+
+    def dump(self, path=PROFILE_DUMP_PATH) -> str:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+@shared_instance()
+def get_request_profiler() -> RequestProfiler:
+    """Process-wide profiler, configured from the 'profiling' config section."""
+    from deceptgold.configuration.config_manager import get_config
+
+    profiler = RequestProfiler(
+        sample_every=int(get_config('profiling', 'sample_every', DEFAULT_SAMPLE_EVERY)),
+        capacity=int(get_config('profiling', 'capacity', DEFAULT_CAPACITY)),
+    )
+    if str(get_config('profiling', 'enabled', False)).lower() in ('1', 'true', 'yes'):
+        profiler.enable()
+    return profiler
+
+
+def install_signal_handlers(profiler: RequestProfiler) -> bool:
+    """SIGUSR1 toggles profiling, SIGUSR2 dumps it. Not available on Windows or outside the main thread."""
+    if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def on_toggle(signum, frame):
+        logger.warning(f"[profiling] Request profiling {'enabled' if profiler.toggle() else 'disabled'}.")
+
+    def on_dump(signum, frame):
+        try:
+            logger.warning(f"[profiling] Profile written to {profiler.dump()}")
+        except Exception as e:
+            logger.error(f"[profiling] Erro: {e}")
+
+    signal.signal(signal.SIGUSR1, on_toggle)
+    signal.signal(signal.SIGUSR2, on_dump)
+    return True
@@ -0,0 +1,170 @@
+"""
+Rate limiting primitives shared by outbound notifications and inbound honeypot traffic.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from deceptgold.helper.shared import shared_instance
+
+
+class TokenBucket:
+    """
+    Classic token bucket: ``rate`` tokens per second, holding at most ``capacity``. Not thread safe; callers own the
+    synchronisation (the notification dispatcher only touches its buckets from the event loop thread).
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock=time.monotonic):
+        self.rate = float(rate)
+        self.capacity = max(float(capacity), 1.0)
+        self.clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._blocked_until = 0.0
+
+    def _refill(self, now):
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def delay(self, tokens: float = 1.0) -> float:
+        """Seconds until ``tokens`` can be taken (0 when available now)."""
+        now = self.clock()
+        self._refill(now)
+        wait = max(self._blocked_until - now, 0.0)
+        missing = tokens - self._tokens
+        if missing > 0:
+            wait = max(wait, missing / self.rate if self.rate > 0 else float("inf"))
+        return wait
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        if self.delay(tokens) > 0:
+            return False
+        self._tokens -= tokens
+        return True
+
+    def block_for(self, seconds: float):
+        """Refuse every request for ``seconds`` (e.g. a server-provided retry_after) and empty the bucket."""
+        now = self.clock()
+        self._refill(now)
+        self._blocked_until = max(self._blocked_until, now + max(float(seconds), 0.0))
+        self._tokens = 0.0
+
+
+DEFAULT_SOURCE_RATE = 32
+DEFAULT_SOURCE_WINDOW = 1.0
+DEFAULT_MAX_SOURCES = 100_000
+DEFAULT_SOURCE_TTL = 300.0
+_EVICTIONS_PER_CALL = 8
+
+
+def source_key(ip: str, ipv4_prefix: int = 32, ipv6_prefix: int = 128) -> str:
+    """Aggregation key of a source address: the address itself, or its /ipv4_prefix or /ipv6_prefix network."""
+    if ip.startswith("::ffff:") and "." in ip:
+        ip = ip[7:]
+    if ":" not in ip:
+        if ipv4_prefix >= 32:
+            return ip
+        if ipv4_prefix == 24:
+            return ip.rsplit(".", 1)[0] + ".0/24"
+    elif ipv6_prefix >= 128:
+        return ip
+    try:
+        import ipaddress
+        prefix = ipv6_prefix if ":" in ip else ipv4_prefix
+        return str(ipaddress.ip_network(f"{ip}/{prefix}", strict=False))
+    except ValueError:
+        return ip
+
+
+class SourceRateLimiter:
+    """
+    Per-source connection limiter: ``rate`` connections per ``window`` seconds (token bucket, burst = rate).
+
+    State is two floats per tracked source in an LRU-ordered dict. Sources idle for longer than ``ttl`` are evicted
+    as new connections arrive, and at most ``max_sources`` are tracked: beyond that the least recently seen one is
+    dropped (a forgotten source simply starts with a full bucket again).
+    """
+
+    def __init__(self, rate=DEFAULT_SOURCE_RATE, window=DEFAULT_SOURCE_WINDOW, max_sources=DEFAULT_MAX_SOURCES,
+                 ttl=DEFAULT_SOURCE_TTL, ipv4_prefix=32, ipv6_prefix=128, clock=time.monotonic):
+        self.capacity = float(rate)
+        self.refill = float(rate) / float(window)
+        self.max_sources = max(int(max_sources), 1)
+        self.ttl = float(ttl)
+        self.ipv4_prefix = int(ipv4_prefix)
+        self.ipv6_prefix = int(ipv6_prefix)
+        self.clock = clock
+        self._sources = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+        self.evicted = 0
+
+    def allow(self, ip: str) -> bool:
+        key = source_key(ip, self.ipv4_prefix, self.ipv6_prefix)
+        now = self.clock()
+        with self._lock:
+            state = self._sources.get(key)
+            if state is None:
+                self._evict(now)
+                state = self._sources[key] = [self.capacity, now]
+            else:
+                self._sources.move_to_end(key)
+                state[0] = min(self.capacity, state[0] + (now - state[1]) * self.refill)
+                state[1] = now
+
+            if state[0] < 1.0:
+                self.rejected += 1
+                return False
+            state[0] -= 1.0
+            self.allowed += 1
+            return True
+
+    def _evict(self, now):
+        sources = self._sources
+        # Expired entries sit at the LRU end; drop a few per call to keep the cost amortised.
+        for _ in range(_EVICTIONS_PER_CALL):
+            if not sources:
+                break
+            key, state = next(iter(sources.items()))
+            if now - state[1] <= self.ttl:
+                break
+            del sources[key]
+            self.evicted += 1
+        while len(sources) >= self.max_sources:
+            sources.popitem(last=False)
+            self.evicted += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "rejected": self.rejected,
+                "evicted": self.evicted,
+                "tracked": len(self._sources),
+                "max_sources": self.max_sources,
+            }
+
+
+def _limiter_collector(limiter):
+    from deceptgold.helper.metrics import stats_collector
+
+    return stats_collector("deceptgold_ratelimit", "Listener rate limiter", limiter.stats,
+                           counters=("allowed", "rejected", "evicted"), gauges=("tracked", "max_sources"))
+
+
+@shared_instance(collector=_limiter_collector)
+def get_source_rate_limiter() -> SourceRateLimiter:
+    """Process-wide limiter for the honeypot listeners, configured from the 'ratelimit' config section."""
+    from deceptgold.configuration.config_manager import get_config
+
+    return SourceRateLimiter(
+        rate=float(get_config('ratelimit', 'rate', DEFAULT_SOURCE_RATE)),
+        window=float(get_config('ratelimit', 'window', DEFAULT_SOURCE_WINDOW)),
+        max_sources=int(get_config('ratelimit', 'max_sources', DEFAULT_MAX_SOURCES)),
+        ttl=float(get_config('ratelimit', 'ttl', DEFAULT_SOURCE_TTL)),
+        ipv4_prefix=int(get_config('ratelimit', 'ipv4_prefix', 32)),
+        ipv6_prefix=int(get_config('ratelimit', 'ipv6_prefix', 128)),
+    )
@@ -0,0 +1,45 @@
+"""
+Process-wide instances of the daemon's long-lived components (event pipeline, notification dispatcher, caches...).
+
+``shared_instance`` turns a build function into a getter that builds the component on first use, once even when
+several threads ask for it at the same time, and registers its shutdown and metrics collector in one place.
+"""
+
+import atexit
+import functools
+import threading
+
+
+def shared_instance(stop=None, collector=None):
+    """
+    Decorator for ``build(*args)``: the decorated function returns one instance per distinct arguments, built on the
+    first call. ``stop`` names a method of the instance registered with atexit; ``collector(instance)`` returns a
+    metrics collector for it. A build that returns None (e.g. the feature is disabled in the config) is not kept, so a
+    later call builds again. ``cache_clear()`` forgets the instances (for tests).
+    """
+    def decorator(build):
+        instances = {}
+        lock = threading.Lock()
+
+        @functools.wraps(build)
+        def get(*args):
+            instance = instances.get(args)
+            if instance is None:
+                with lock:
+                    instance = instances.get(args)
+                    if instance is None:
+                        instance = build(*args)
+                        if instance is None:
+                            return None
+                        if stop is not None:
+                            atexit.register(getattr(instance, stop))
+                        if collector is not None:
+                            from deceptgold.helper.metrics import REGISTRY
+                            REGISTRY.register_collector(collector(instance))
+                        instances[args] = instance
+            return instance
+
+        get.cache_clear = instances.clear
+        return get
+
+    return decorator
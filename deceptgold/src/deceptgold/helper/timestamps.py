@@ -0,0 +1,55 @@
+"""
+Timestamp parsing for the honeypot log.
+
+opencanary writes 'YYYY-MM-DD HH:MM:SS[.ffffff]' (Web3 honeypots the 'T' separated variant). Strings with exactly
+that layout are handed to datetime.fromisoformat, which is implemented in C; anything else falls back to strptime
+over KNOWN_FORMATS, starting with the format that matched last. Results are the same as the strptime loop: naive
+datetimes, and None for unknown layouts (including timezone suffixes).
+"""
+
+from datetime import datetime
+
+KNOWN_FORMATS = (
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S",
+)
+
+
+class TimestampParser:
+    def __init__(self, formats=KNOWN_FORMATS):
+        self.formats = list(formats)
+
+    def parse(self, value):
+        if not value or type(value) is not str:
+            return None
+        size = len(value)
+        # 19 chars without fraction, or '.' plus 1 to 6 digits.
+        if (size == 19 or 21 <= size <= 26 and value[19] == ".") and value[10] in " T" and value[4] == "-" \
+                and value[7] == "-" and value[13] == ":" and value[16] == ":":
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                pass
+        return self._parse_slow(value)
+
+    def _parse_slow(self, value):
+        for index, fmt in enumerate(self.formats):
+            try:
+                parsed = datetime.strptime(value, fmt)
+            except ValueError:
+                continue
+            if index:
+                # Remember the log's format: it is tried first from now on.
+                self.formats.insert(0, self.formats.pop(index))
+            return parsed
+        return None
+
+
+_parser = TimestampParser()
+
+
+def parse_timestamp(value):
+    """Parse with the process-wide parser."""
+    return _parser.parse(value)
@@ -11,6 +11,8 @@ from collections import defaultdict
 from twisted.internet import protocol, reactor
 from twisted.application import internet
 
+from deceptgold.helper.metrics import WEB3_ATTACKS
+
 class Web3Protocol(protocol.Protocol):
     def __init__(self, factory):
         self.factory = factory
@@ -142,7 +144,8 @@ class Web3HoneypotBase:
             log_entry["public_ip"] = self._cached_public_ip
         
         self.attack_log.append(log_entry)
-        
+        WEB3_ATTACKS.inc(service=self.service_name, attack_type=attack_type, severity=severity)
+
         if self.logger:
             self.logger.log(log_entry)
         
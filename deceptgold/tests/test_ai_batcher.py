@@ -0,0 +1,117 @@
+import threading
+
+from deceptgold.helper.notify.ai_batcher import AIBatcher, build_batch_prompt, parse_batch_response, EventGroup
+
+
+def _scan_event(i, attack_type="port_scan", service="network_services", severity="medium"):
+    return {"attack_type": attack_type, "service": service, "severity": severity, "src_host": f"10.0.{i // 256}.{i % 256}"}
+
+
+def test_parse_batch_response_maps_numbered_lines():
+    text = "Sure!\n2. [HIGH] SSH brute force - Action: block\n1) port scan sweep from many hosts\n7. [LOW] ignored"
+    assert parse_batch_response(text, 3) == [
+        "[MEDIUM] port scan sweep from many hosts",
+        "[HIGH] SSH brute force - Action: block",
+        None,
+    ]
+
+
+def test_scan_from_many_sources_costs_one_prompt():
+    prompts = []
+    delivered = []
+
+    def analyze(prompt, max_tokens):
+        prompts.append(prompt)
+        return "1. [HIGH] Distributed port scan - Action: block ranges\n2. [CRITICAL] SSH brute force - Action: fail2ban"
+
+    batcher = AIBatcher(analyze, lambda group, analysis: delivered.append((group, analysis)), window=60)
+    for i in range(500):
+        batcher.add(_scan_event(i))
+    for i in range(20):
+        batcher.add(_scan_event(i, "ssh_brute_force", "ssh_service", "high"))
+
+    assert batcher.flush() == 2
+    assert len(prompts) == 1
+    assert "Sources (500)" in prompts[0]
+
+    scan, ssh = delivered
+    assert scan[0].events == 500 and len(scan[0].sources) == 500
+    assert scan[1].startswith("[HIGH] Distributed port scan")
+    assert ssh[1].startswith("[CRITICAL]")
+    assert "(+497 more)" in scan[0].event_data()["src_host"]
+
+
+def test_groups_are_chunked_and_missing_answers_fall_back():
+    prompts = []
+    delivered = []
+
+    def analyze(prompt, max_tokens):
+        prompts.append(max_tokens)
+        return "1. [LOW] first group only - Action: monitor"
+
+    batcher = AIBatcher(analyze, lambda group, analysis: delivered.append(analysis), groups_per_prompt=2)
+    for i in range(5):
+        batcher.add(_scan_event(0, attack_type=f"type_{i}"))
+    batcher.flush()
+
+    assert len(prompts) == 3
+    assert delivered.count(None) == 2
+    assert len(delivered) == 5
+
+
+def test_window_flushes_in_background():
+    delivered = threading.Event()
+    batcher = AIBatcher(lambda prompt, max_tokens: None, lambda group, analysis: delivered.set(), window=0.1).start()
+    batcher.add(_scan_event(1))
+    assert delivered.wait(5)
+    batcher.stop()
+
+
+def test_group_tracks_highest_severity():
+    group = EventGroup(_scan_event(1, severity="low"))
+    group.add(_scan_event(1, severity="low"))
+    group.add(_scan_event(2, severity="high"))
+    assert group.severity == "high"
+    assert "Severity: high" in build_batch_prompt([group])
+
+
+def test_cached_groups_are_delivered_without_a_prompt(tmp_path):
+    from deceptgold.helper.analysis_cache import AnalysisCache
+
+    prompts = []
+    delivered = []
+
+    def analyze(prompt, max_tokens):
+        prompts.append(prompt)
+        return "1. [HIGH] Distributed port scan - Action: block ranges"
+
+    cache = AnalysisCache(tmp_path / "cache.sqlite3")
+    batcher = AIBatcher(analyze, lambda group, analysis: delivered.append(analysis), cache=cache)
+    for _ in range(2):
+        batcher.add(_scan_event(1))
+        batcher.flush()
+
+    assert len(prompts) == 1
+    assert delivered == ["[HIGH] Distributed port scan - Action: block ranges"] * 2
+    assert batcher.stats["cached"] == 1 and cache.stats["hits"] == 1
+    cache.close()
+
+
+def test_cached_threat_level_depends_on_severity_and_never_names_a_source(tmp_path):
+    from deceptgold.helper.analysis_cache import AnalysisCache
+
+    answers = iter(["1. [MEDIUM] Port scan from 10.0.0.1 - Action: block it", "1. [LOW] Port scan - Action: watch",
+                    "1. [CRITICAL] Port scan - Action: block ranges"])
+    delivered = []
+    cache = AnalysisCache(tmp_path / "cache.sqlite3")
+    batcher = AIBatcher(lambda prompt, max_tokens: next(answers), lambda group, analysis: delivered.append(analysis),
+                        cache=cache)
+    for event in (_scan_event(1), _scan_event(2), _scan_event(3, severity="critical"), _scan_event(4)):
+        batcher.add(event)
+        batcher.flush()
+
+    # The first answer names its source: not reused for 10.0.0.2, which is analysed again and then cached.
+    assert delivered == ["[MEDIUM] Port scan from 10.0.0.1 - Action: block it", "[LOW] Port scan - Action: watch",
+                         "[CRITICAL] Port scan - Action: block ranges", "[LOW] Port scan - Action: watch"]
+    assert batcher.stats["cached"] == 1
+    cache.close()
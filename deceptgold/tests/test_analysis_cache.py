@@ -0,0 +1,65 @@
+from deceptgold.helper import analysis_cache
+from deceptgold.helper.analysis_cache import AnalysisCache, event_signature
+
+
+def _ssh(src, username, password):
+    return {"logtype": 4002, "src_host": src, "dst_port": 22,
+            "logdata": {"USERNAME": username, "PASSWORD": password}}
+
+
+def test_signature_ignores_the_source_and_classifies_credentials():
+    assert event_signature(_ssh("203.0.113.1", "admin", "password")) == \
+        event_signature(_ssh("198.51.100.7", "root", "123456"))
+    assert event_signature(_ssh("203.0.113.1", "admin", "admin")) != \
+        event_signature(_ssh("203.0.113.1", "admin", "Xk9#pw-long"))
+    web3 = {"attack_type": "brute_force_login", "service": "wallet", "username": "bob", "password": "bob"}
+    assert event_signature(web3).endswith("|other|same_as_user")
+
+
+def test_memory_and_disk_tiers_expire_after_the_ttl(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(analysis_cache.time, "time", lambda: now[0])
+    path = tmp_path / "cache.sqlite3"
+    cache = AnalysisCache(path, ttl=60, memory_size=1)
+    cache.put("ai", "sig-a", {"summary": "scan"})
+    cache.put("ai", "sig-b", {"summary": "brute force"})
+    assert cache.get("ai", "sig-b") == {"summary": "brute force"}
+    # sig-a was evicted from memory, and is read back from SQLite.
+    assert cache.get("ai", "sig-a") == {"summary": "scan"}
+    assert cache.stats["memory_hits"] == 1 and cache.stats["disk_hits"] == 1
+    assert cache.get("notify", "sig-a") is None
+    cache.close()
+
+    reopened = AnalysisCache(path, ttl=60)
+    assert reopened.get("ai", "sig-a") == {"summary": "scan"}
+    assert dict(reopened.top_signatures())["ai:sig-a"] == 2
+    now[0] += 61
+    assert reopened.get("ai", "sig-a") is None
+    assert reopened.stats["misses"] == 1
+    assert reopened.entries() == 0
+    reopened.close()
+
+
+def test_a_cache_hit_does_not_carry_over_the_first_source(tmp_path):
+    from deceptgold.commands.ai import _llm_handler_factory
+    from deceptgold.helper.analysis_cache import analysis_for_event
+
+    first, second = _ssh("203.0.113.1", "admin", "password"), _ssh("198.51.100.7", "admin", "password")
+
+    def llm(prompt, **kwargs):
+        text = '{"summary": "SSH brute force", "iocs": ["203.0.113.1"], "recommended_actions": ["block"]}'
+        return {"choices": [{"text": text}]}
+
+    cache = AnalysisCache(tmp_path / "cache.sqlite3")
+    analyze = _llm_handler_factory(llm, "model.gguf", cache)()
+    assert analyze({"event": first})["iocs"] == ["203.0.113.1"]
+
+    cached = cache.get("ai:model.gguf", event_signature(second))
+    assert cached == {"summary": "SSH brute force", "recommended_actions": ["block"]}
+    assert analysis_for_event(cached, second)["iocs"] == ["198.51.100.7", "admin:password"]
+
+    # An analysis quoting the source cannot be reused for another source.
+    quoting = lambda prompt, **kwargs: {"choices": [{"text": '{"summary": "brute force from 203.0.113.1"}'}]}
+    cache = AnalysisCache(tmp_path / "other.sqlite3")
+    _llm_handler_factory(quoting, "model.gguf", cache)()({"event": first})
+    assert cache.get("ai:model.gguf", event_signature(second)) is None
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from deceptgold.helper.analysis_queue import AnalysisQueue, event_priority
+
+
+def _event(logtype=3001, severity=None, category="http_login_attempt", risk="medium", n=0):
+    evt = {"logtype": logtype, "n": n}
+    if severity:
+        evt["severity"] = severity
+    return {"event": evt, "ai": {"category": category, "risk": risk}}
+
+
+def _collector():
+    emitted = []
+    return emitted, lambda item, result, shed: emitted.append((item["event"]["n"], result, shed))
+
+
+def test_priority_puts_critical_first_and_service_info_last():
+    assert event_priority(_event(severity="critical")) < event_priority(_event(severity="high"))
+    assert event_priority(_event(risk="medium")) < event_priority(_event(risk="low"))
+    assert event_priority(_event(logtype=1001, risk="low")) > event_priority(_event(risk="low"))
+
+
+def test_workers_drain_by_priority_and_report_progress_in_order():
+    emitted, emit = _collector()
+    progress = []
+    queue = AnalysisQueue(lambda: (lambda item: "ok"), emit, shed_rules=(), on_progress=progress.append)
+    queue.submit(_event(logtype=1001, risk="low", n=1), token=1)
+    queue.skip(token=2)
+    queue.submit(_event(risk="low", n=3), token=3)
+    queue.submit(_event(severity="critical", n=4), token=4)
+    queue.start()
+    assert queue.join(timeout=5)
+    queue.stop()
+
+    assert [n for n, _, _ in emitted] == [4, 3, 1]
+    assert all(result == "ok" for _, result, _ in emitted)
+    # Token 4 completed first, but the cursor may only move once 1 to 3 are done as well.
+    assert progress[-1] == 4 and progress == sorted(progress)
+
+
+def test_full_queue_samples_probes_and_evicts_the_least_urgent():
+    emitted, emit = _collector()
+    rules = ({"category": "http_probe", "sample": 0.5},)
+    queue = AnalysisQueue(lambda: (lambda item: "ok"), emit, max_size=2, shed_rules=rules, shed_at=0.5)
+    queue.submit(_event(risk="low", n=1))
+    for n in (2, 3, 4, 5):
+        queue.submit(_event(logtype=3000, category="http_probe", risk="low", n=n))
+    assert [(n, shed) for n, _, shed in emitted] == [(3, "sampled"), (4, "queue_full"), (5, "sampled")]
+
+    queue.submit(_event(severity="high", n=6))
+    assert emitted[-1][::2] == (2, "queue_full")
+    assert queue.stats["shed"] == 4 and queue.stats["evicted"] == 1
+    assert queue.snapshot()["depth"] == 2
+
+
+def test_slow_analysis_does_not_block_the_producer():
+    release = threading.Event()
+    emitted, emit = _collector()
+    queue = AnalysisQueue(lambda: (lambda item: release.wait(5)), emit, max_size=100, workers=2,
+                          shed_rules=()).start()
+    for n in range(20):
+        queue.submit(_event(n=n))
+    assert queue.snapshot()["lag_seconds"] >= 0
+    assert queue.depth() >= 18
+    release.set()
+    assert queue.join(timeout=5)
+    queue.stop()
+    assert len(emitted) == 20
+
+
+def test_backlog_larger_than_the_queue_is_fully_analysed():
+    emitted, emit = _collector()
+    progress = []
+    queue = AnalysisQueue(lambda: (lambda item: time.sleep(0.001) or "ok"), emit, max_size=8,
+                          on_progress=progress.append).start()
+    for n in range(200):
+        queue.submit(_event(logtype=3000, category="http_probe", risk="low", n=n), token=n, block=True)
+    assert queue.join(timeout=10)
+    queue.stop()
+
+    assert sorted(n for n, _, _ in emitted) == list(range(200))
+    assert all(result == "ok" and shed is None for _, result, shed in emitted)
+    assert queue.stats["shed"] == 0 and queue.stats["blocked"] > 0
+    assert progress[-1] == 199
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+
+from deceptgold.helper.blockchain.client import BlockchainClient, get_blockchain_client
+
+
+def test_client_is_memoised_and_not_connected_on_creation():
+    client = get_blockchain_client()
+    assert client is get_blockchain_client()
+    assert client.w3 is None or client.connected
+
+
+def test_health_check_reports_unreachable_rpc_without_raising():
+    client = BlockchainClient(rpc_url="http://127.0.0.1:9", timeout=1)
+    status = client.health_check()
+
+    assert status["connected"] is False
+    assert status["error"]
+    assert status["latency_ms"] is not None
+    assert not client.connected
+
+
+def test_importing_reward_module_does_not_touch_web3():
+    code = "import sys, deceptgold.helper.blockchain.token; print('web3' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,49 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+from deceptgold.__main__ import COMMANDS, needs_startup_checks
+from deceptgold.helper.descripton import COMMAND_HELP
+
+HEAVY_MODULES = {"web3", "opencanary", "twisted", "httpx", "llama_cpp"}
+
+
+def _imported_top_level_modules(argv):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "deceptgold", *argv],
+                            capture_output=True, text=True, stdin=subprocess.DEVNULL, timeout=60)
+    return {m.group(1).split(".")[0] for m in re.finditer(r"^import time:.*\|\s*(\S+)$", result.stderr, re.M)}
+
+
+@pytest.mark.parametrize("argv", [["--help"], ["--version"], ["user", "--help"], ["service", "--help"]])
+def test_cli_startup_does_not_import_heavy_dependencies(argv):
+    imported = _imported_top_level_modules(argv)
+    assert "deceptgold" in imported
+    assert not HEAVY_MODULES & imported
+
+
+@pytest.mark.parametrize("argv, expected", [
+    ([], True),
+    (["--help"], False),
+    (["service", "status"], False),
+    (["dashboard", "status"], False),
+    (["service", "list"], False),
+    (["service", "start", "--help"], False),
+    (["service", "start"], True),
+    (["ai", "install"], True),
+])
+def test_startup_checks_are_skipped_for_read_only_commands(argv, expected):
+    assert needs_startup_checks(argv) is expected
+
+
+def test_lazy_commands_cover_every_help_entry():
+    assert [name for name, _ in COMMANDS] == list(COMMAND_HELP)
+
+
+@pytest.mark.parametrize("name, import_path", COMMANDS)
+def test_lazy_command_help_matches_its_sub_app(name, import_path):
+    module_name, attr = import_path.split(":")
+    sub_app = getattr(pytest.importorskip(module_name), attr)
+    assert name in sub_app.name
+    assert sub_app.help == COMMAND_HELP[name]
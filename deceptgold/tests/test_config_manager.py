@@ -18,4 +18,91 @@ def test_set_config_not_exists_str(tmp_path):
 
 def test_set_config_not_exists_bool(tmp_path):
     config_file = tmp_path / ".deceptgold.conf"
-    assert get_config(module_name_honeypot="test_config_manager", key="not_key", default=False, file_config=config_file) == False
\ No newline at end of file
+    assert get_config(module_name_honeypot="test_config_manager", key="not_key", default=False, file_config=config_file) == False
+
+def test_get_config_is_served_from_memory(tmp_path, monkeypatch):
+    import deceptgold.configuration.config_manager as config_manager
+
+    config_file = tmp_path / ".deceptgold.conf"
+    update_config("key_test", "value_test", module_name="cache_test", config_file=config_file)
+
+    loads = []
+    original_load = config_manager.json.load
+    monkeypatch.setattr(config_manager.json, "load", lambda f: loads.append(f) or original_load(f))
+    for _ in range(50):
+        assert get_config("cache_test", "key_test", file_config=config_file) == "value_test"
+    assert len(loads) <= 1
+
+
+def test_get_config_reloads_after_external_change(tmp_path):
+    import json
+    import os
+    import time
+
+    config_file = tmp_path / ".deceptgold.conf"
+    update_config("key_test", "old", module_name="cache_test", config_file=config_file)
+    assert get_config("cache_test", "key_test", file_config=config_file) == "old"
+
+    tmp_file = tmp_path / "external.tmp"
+    tmp_file.write_text(json.dumps({"cache_test": {"key_test": "new-value"}}))
+    os.replace(tmp_file, config_file)
+
+    deadline = time.time() + 5
+    while get_config("cache_test", "key_test", file_config=config_file) != "new-value" and time.time() < deadline:
+        time.sleep(0.01)
+    assert get_config("cache_test", "key_test", file_config=config_file) == "new-value"
+
+
+def test_get_config_decodes_protected_values(tmp_path):
+    config_file = tmp_path / ".deceptgold.conf"
+    update_config("secret", "chat-1234", module_name="webhook", passwd="fingerprint", config_file=config_file)
+    assert get_config("webhook", "secret", passwd="fingerprint", file_config=config_file) == "chat-1234"
+    assert get_config("webhook", "secret", passwd="fingerprint", file_config=config_file) == "chat-1234"
+    assert get_config("webhook", "secret", file_config=config_file) != "chat-1234"
+
+
+def test_update_config_writes_atomically(tmp_path):
+    import json
+
+    config_file = tmp_path / ".deceptgold.conf"
+    update_config("a", "1", module_name="atomic", config_file=config_file)
+    update_config("b", "2", module_name="atomic", config_file=config_file)
+
+    assert json.loads(config_file.read_text()) == {"atomic": {"a": "1", "b": "2"}}
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".deceptgold.conf", ".deceptgold.conf.lock"]
+
+
+def test_update_config_batch_writes_once(tmp_path, monkeypatch):
+    import deceptgold.configuration.config_manager as config_manager
+
+    config_file = tmp_path / ".deceptgold.conf"
+    writes = []
+    original_write = config_manager._atomic_write_json
+    monkeypatch.setattr(config_manager, "_atomic_write_json", lambda path, data: writes.append(path) or original_write(path, data))
+
+    with config_manager.config_batch():
+        for i in range(10):
+            update_config(f"key_{i}", str(i), module_name="batch", config_file=config_file)
+
+    assert len(writes) == 1
+    assert get_config("batch", "key_9", file_config=config_file) == "9"
+
+
+def test_update_config_preserves_concurrent_writers(tmp_path):
+    import threading
+
+    config_file = tmp_path / ".deceptgold.conf"
+
+    def writer(n):
+        for i in range(20):
+            update_config(f"w{n}_{i}", str(i), module_name="concurrent", config_file=config_file)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    import json
+    data = json.loads(config_file.read_text())
+    assert len(data["concurrent"]) == 80
@@ -0,0 +1,63 @@
+from deceptgold.helper.blockchain.dedup_store import MAGIC, RECORD, DigestStore
+
+
+def test_store_deduplicates_and_persists(tmp_path):
+    path = tmp_path / "digests.bin"
+    store = DigestStore(path, flush_every=3)
+    assert store.created
+    assert store.add(1)
+    assert not store.add(1)
+    assert store.add(2)
+    assert store.add(-1)
+    store.close()
+
+    assert path.stat().st_size == len(MAGIC) + 3 * RECORD.size
+
+    reopened = DigestStore(path)
+    assert not reopened.created
+    assert len(reopened) == 3
+    assert 1 in reopened and 2 in reopened and (2 ** 64 - 1) in reopened
+    assert not reopened.add(2)
+    reopened.close()
+
+
+def test_store_truncates_torn_record(tmp_path):
+    path = tmp_path / "digests.bin"
+    store = DigestStore(path)
+    store.add(7)
+    store.add(8)
+    store.close()
+    with open(path, "ab") as f:
+        f.write(b"\x01\x02\x03")
+
+    reopened = DigestStore(path)
+    assert len(reopened) == 2
+    assert path.stat().st_size == len(MAGIC) + 2 * RECORD.size
+    reopened.add(9)
+    reopened.close()
+    assert len(DigestStore(path)) == 3
+
+
+def test_store_clear_resets_file(tmp_path):
+    path = tmp_path / "digests.bin"
+    store = DigestStore(path)
+    for i in range(5):
+        store.add(i)
+    store.clear()
+    assert len(store) == 0
+    store.add(42)
+    store.close()
+
+    reopened = DigestStore(path)
+    assert len(reopened) == 1 and 42 in reopened
+
+
+def test_store_moves_unrecognized_file_aside(tmp_path):
+    path = tmp_path / "digests.bin"
+    path.write_text("{1, 2, 3}")
+
+    store = DigestStore(path)
+    assert store.created
+    assert len(store) == 0
+    assert (tmp_path / "digests.bin.corrupt").read_text() == "{1, 2, 3}"
+    store.close()
@@ -0,0 +1,32 @@
+import json
+import subprocess
+import sys
+
+from deceptgold.helper.blockchain.token import reward_skip_reason
+from deceptgold.helper.digest import event_digest
+
+
+def test_event_digest_accepts_str_and_bytes():
+    raw = '{"logtype": 2000, "src_host": "1.2.3.4"}'
+    assert event_digest(raw) == event_digest(raw.encode())
+    assert event_digest(raw) != event_digest(raw + " ")
+    assert 0 <= event_digest(raw) < 2 ** 64
+
+
+def test_only_attack_events_count_towards_the_reward():
+    boot = repr({"logdata": "added service from class HTTP"})
+    assert reward_skip_reason('{"logtype": 4002, "logdata": {"USERNAME": "root"}}') is None
+    assert reward_skip_reason('{"logdata": {"msg": %s}}' % json.dumps(repr({"logdata": "ssh probe"}))) is None
+    assert reward_skip_reason('{"logdata": {"msg": %s}}' % json.dumps(boot)) == "boot_log"
+    assert reward_skip_reason('{"logdata": {"msg": "Warning: port 22 in use"}}') == "system_log"
+    assert reward_skip_reason('{"logtype": 1001}') == "invalid"
+    assert reward_skip_reason("Traceback (most recent call last):") == "invalid"
+
+
+def test_event_digest_is_stable_across_processes():
+    code = "from deceptgold.helper.digest import event_digest; print(event_digest('x'))"
+    outputs = {
+        subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        for _ in range(2)
+    }
+    assert outputs == {f"{event_digest('x')}\n"}
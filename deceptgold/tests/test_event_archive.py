@@ -0,0 +1,135 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+import pytest
+
+from deceptgold.helper.event_archive import ArchiveCompactor, EventArchive
+from deceptgold.helper.log_aggregate import aggregate_log
+
+
+def _event(i, src=None):
+    return json.dumps({
+        "logtype": 3001 if i % 2 else 4002,
+        "src_host": src or f"203.0.113.{i % 5}",
+        "dst_port": 80 if i % 2 else 22,
+        "service": "http" if i % 2 else "ssh",
+        "local_time": f"2025-01-01 {i // 60 % 24:02d}:{i % 60:02d}:00.000000",
+    }) + "\n"
+
+
+def _write(path, lines, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def test_top_sources_match_the_json_aggregation(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(600)], "w")
+    archive = EventArchive(tmp_path / "archive")
+    assert archive.compact(log, segment_max_bytes=8 * 1024) == 600
+    assert len(archive.segments()) > 1
+
+    expected = aggregate_log(log, None).result()
+    assert dict(archive.top("src_host", limit=10)) == {row["value"]: row["count"] for row in expected["top_sources"]}
+    assert dict(archive.top("logtype")) == {3001: 300, 4002: 300}
+    assert archive.top("service", logtype=4002) == [("ssh", 300)]
+    assert archive.count() == 600
+
+
+def test_time_window_uses_segment_bounds_and_sorted_index(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(120)], "w")
+    archive = EventArchive(tmp_path / "archive")
+    archive.compact(log)
+
+    since, until = datetime(2025, 1, 1, 0, 30), datetime(2025, 1, 1, 1, 0)
+    assert archive.count(since=since, until=until) == 30
+    assert archive.count(since=since, until=until, logtype=3001) == 15
+    assert archive.segments(since=datetime(2025, 1, 2)) == []
+    assert archive.histogram(3600) == [(datetime(2025, 1, 1, 0), 60), (datetime(2025, 1, 1, 1), 60)]
+
+
+def test_compaction_is_incremental_and_keeps_segments_across_rotation(tmp_path):
+    log = tmp_path / "events.log"
+    archive = EventArchive(tmp_path / "archive")
+    _write(log, [_event(i, "198.51.100.1") for i in range(10)], "w")
+    _write(log, ['{"logtype": 3001, "src_host": "198.51.100.9"'])
+    assert archive.compact(log) == 10
+    assert archive.compact(log) == 0
+
+    _write(log, [', "local_time": "2025-01-01 00:00:00"}\n'])
+    assert archive.compact(log) == 1
+
+    rotated = tmp_path / "events.log.1"
+    os.replace(log, rotated)
+    _write(log, [_event(i, "192.0.2.1") for i in range(4)], "w")
+    assert archive.compact(log) == 4
+    assert dict(archive.top("src_host")) == {"198.51.100.1": 10, "198.51.100.9": 1, "192.0.2.1": 4}
+
+
+def test_concurrent_compactions_archive_each_line_once(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(2000)], "w")
+    results, errors = [], []
+
+    def compact():
+        # Separate instances, like the daemon's compactor and 'reports top' in another process.
+        try:
+            results.append(EventArchive(tmp_path / "archive").compact(log, segment_max_bytes=16 * 1024))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=compact) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors and sorted(results) == [0, 0, 0, 2000]
+    assert EventArchive(tmp_path / "archive").count() == 2000
+
+
+def test_compactor_runs_catch_up_in_bounded_steps(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(300)], "w")
+    archive = EventArchive(tmp_path / "archive")
+    compactor = ArchiveCompactor(archive, log, min_bytes=0, bytes_per_run=log.stat().st_size // 2)
+
+    first = compactor.run_once()
+    assert 0 < first < 300
+    assert first + compactor.run_once() == 300
+    assert compactor.run_once() == 0
+    assert archive.count() == 300
+
+    with pytest.raises(RuntimeError):
+        ArchiveCompactor(archive, tmp_path, min_bytes=0).run_once()
+
+
+def test_retention_deletes_old_and_oversized_segments(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(600)], "w")
+    archive = EventArchive(tmp_path / "archive")
+    archive.compact(log, segment_max_bytes=8 * 1024)
+    segments = archive.segments()
+    assert len(segments) > 3
+
+    # All events are from 2025-01-01.
+    assert EventArchive(tmp_path / "archive", retention_days=36500).prune() == 0
+    keep = sum(entry["bytes"] for entry in archive.load_manifest()["segments"][-2:])
+    assert EventArchive(tmp_path / "archive", max_bytes=keep).prune() == len(segments) - 2
+    assert [segment.directory.name for segment in archive.segments()] == [s.directory.name for s in segments[-2:]]
+    assert EventArchive(tmp_path / "archive", retention_days=1).prune() == 2
+    assert archive.count() == 0 and sorted(p.name for p in (tmp_path / "archive").iterdir() if p.is_dir()) == []
+
+
+def test_reports_top_reads_the_configured_archive_path(tmp_path, monkeypatch):
+    from deceptgold.helper import event_archive
+
+    settings = {("archive", "path"): str(tmp_path / "custom"), ("archive", "retention_days"): "0"}
+    monkeypatch.setattr("deceptgold.configuration.config_manager.get_config",
+                        lambda section, key, default=None: settings.get((section, key), default))
+    archive = event_archive.archive_from_config()
+    assert archive.path == tmp_path / "custom"
+    assert not archive.retention_days and archive.max_bytes == event_archive.DEFAULT_MAX_BYTES
@@ -0,0 +1,113 @@
+import threading
+
+import pytest
+
+from deceptgold.helper.opencanary.event_pipeline import (
+    EventPipeline,
+    OVERFLOW_BLOCK,
+    OVERFLOW_DROP_NEWEST,
+    OVERFLOW_DROP_OLDEST,
+)
+
+
+def _blocked_pipeline(overflow, maxsize=2):
+    gate = threading.Event()
+    started = threading.Event()
+    seen = []
+
+    def handler(raw):
+        started.set()
+        gate.wait(5)
+        seen.append(raw)
+
+    pipeline = EventPipeline(handler, maxsize=maxsize, overflow=overflow, block_timeout=0.01).start()
+    pipeline.submit("first")
+    assert started.wait(5)
+    return pipeline, gate, seen
+
+
+def test_pipeline_processes_events_in_order():
+    seen = []
+    pipeline = EventPipeline(seen.append, maxsize=10).start()
+    for i in range(5):
+        assert pipeline.submit(str(i))
+    pipeline.stop()
+
+    assert seen == ["0", "1", "2", "3", "4"]
+    stats = pipeline.stats()
+    assert stats["queued"] == 5
+    assert stats["processed"] == 5
+    assert stats["dropped"] == 0
+
+
+def test_pipeline_drop_newest_when_full():
+    pipeline, gate, seen = _blocked_pipeline(OVERFLOW_DROP_NEWEST)
+    assert pipeline.submit("a")
+    assert pipeline.submit("b")
+    assert not pipeline.submit("c")
+    gate.set()
+    pipeline.stop()
+
+    assert seen == ["first", "a", "b"]
+    assert pipeline.stats()["dropped"] == 1
+
+
+def test_pipeline_drop_oldest_when_full():
+    pipeline, gate, seen = _blocked_pipeline(OVERFLOW_DROP_OLDEST)
+    pipeline.submit("a")
+    pipeline.submit("b")
+    assert pipeline.submit("c")
+    gate.set()
+    pipeline.stop()
+
+    assert seen == ["first", "b", "c"]
+    assert pipeline.stats()["dropped"] == 1
+
+
+def test_pipeline_block_policy_gives_up_after_timeout():
+    pipeline, gate, seen = _blocked_pipeline(OVERFLOW_BLOCK, maxsize=1)
+    assert pipeline.submit("a")
+    assert not pipeline.submit("b")
+    gate.set()
+    pipeline.stop()
+
+    assert seen == ["first", "a"]
+    assert pipeline.stats()["dropped"] == 1
+
+
+def test_pipeline_counts_handler_failures():
+    def handler(raw):
+        raise RuntimeError("boom")
+
+    pipeline = EventPipeline(handler).start()
+    pipeline.submit("x")
+    pipeline.stop()
+
+    stats = pipeline.stats()
+    assert stats["failed"] == 1
+    assert stats["processed"] == 0
+
+
+def test_pipeline_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        EventPipeline(print, overflow="explode")
+
+
+def test_process_record_failures_are_counted_by_the_pipeline(monkeypatch):
+    from deceptgold.helper.opencanary import proxy_logger
+
+    rewarded = []
+
+    def failing_notify(*args):
+        raise ConnectionError("webhook unreachable")
+
+    monkeypatch.setattr(proxy_logger, "check_send_notify", failing_notify)
+    monkeypatch.setattr(proxy_logger, "get_reward", rewarded.append)
+    pipeline = EventPipeline(proxy_logger.process_record).start()
+    pipeline.submit('{"logtype": 3001, "src_host": "203.0.113.1", "logdata": {}}')
+    pipeline.submit("not an event record")
+    pipeline.stop()
+
+    # The notification failed, the reward was still accounted; the non-JSON line is not a failure.
+    assert pipeline.stats()["failed"] == 1 and pipeline.stats()["processed"] == 1
+    assert len(rewarded) == 2
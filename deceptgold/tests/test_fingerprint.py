@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+import deceptgold.helper.fingerprint as fingerprint
+
+
+@pytest.fixture
+def probes(monkeypatch):
+    calls = {"disk": 0}
+    state = {"mac": "aabbccddeeff", "boot_id": "boot-1", "serial": "SERIAL1"}
+
+    def fake_disk_serial():
+        calls["disk"] += 1
+        return state["serial"]
+
+    monkeypatch.setattr(fingerprint, "_fingerprint", None)
+    monkeypatch.setattr(fingerprint, "get_disk_serial", fake_disk_serial)
+    monkeypatch.setattr(fingerprint, "get_mac", lambda: state["mac"])
+    monkeypatch.setattr(fingerprint, "get_boot_id", lambda: state["boot_id"])
+    return calls, state
+
+
+def test_fingerprint_is_computed_once_per_process(tmp_path, probes):
+    calls, _ = probes
+    cache_path = tmp_path / "fingerprint.json"
+
+    first = fingerprint.get_machine_fingerprint(cache_path=cache_path)
+    for _ in range(100):
+        assert fingerprint.get_machine_fingerprint(cache_path=cache_path) == first
+
+    assert calls["disk"] == 1
+    assert first == fingerprint.compute_machine_fingerprint()
+    assert json.loads(cache_path.read_text())["fingerprint"] == first
+
+
+def test_fingerprint_reused_from_disk_on_same_boot(tmp_path, probes, monkeypatch):
+    calls, _ = probes
+    cache_path = tmp_path / "fingerprint.json"
+    first = fingerprint.get_machine_fingerprint(cache_path=cache_path)
+
+    monkeypatch.setattr(fingerprint, "_fingerprint", None)
+    assert fingerprint.get_machine_fingerprint(cache_path=cache_path) == first
+    assert calls["disk"] == 1
+
+
+def test_fingerprint_invalidated_on_new_boot_or_mac(tmp_path, probes, monkeypatch):
+    calls, state = probes
+    cache_path = tmp_path / "fingerprint.json"
+    first = fingerprint.get_machine_fingerprint(cache_path=cache_path)
+
+    state["boot_id"] = "boot-2"
+    state["serial"] = "SERIAL2"
+    monkeypatch.setattr(fingerprint, "_fingerprint", None)
+    second = fingerprint.get_machine_fingerprint(cache_path=cache_path)
+    assert second != first
+    assert calls["disk"] == 2
+
+    state["mac"] = "001122334455"
+    monkeypatch.setattr(fingerprint, "_fingerprint", None)
+    third = fingerprint.get_machine_fingerprint(cache_path=cache_path)
+    assert third not in (first, second)
+    assert calls["disk"] == 3
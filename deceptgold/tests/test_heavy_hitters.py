@@ -0,0 +1,53 @@
+import random
+from collections import Counter
+
+from deceptgold.helper.heavy_hitters import ExactCounter, SpaceSaving
+
+
+def _zipf_stream(n, keys, seed):
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(keys)]
+    return [f"10.0.{k // 256}.{k % 256}" for k in rng.choices(range(keys), weights, k=n)]
+
+
+def test_space_saving_bounds_memory_and_error():
+    stream = _zipf_stream(50_000, 20_000, seed=1)
+    exact = Counter(stream)
+    summary = SpaceSaving(200)
+    for key in stream:
+        summary.add(key)
+
+    assert len(summary) == 200
+    bound = summary.error_bound()
+    assert bound <= len(stream) / 200
+    for key, count in summary.most_common():
+        assert count - summary.errors[key] <= exact[key] <= count
+    # Every key above N / capacity is tracked, and the top 10 come out in the exact order.
+    assert all(key in summary.counts for key, count in exact.items() if count > len(stream) / 200)
+    assert [key for key, _ in summary.most_common(10)] == [key for key, _ in exact.most_common(10)]
+
+
+def test_merged_summaries_keep_the_guarantees():
+    first, second = _zipf_stream(20_000, 5_000, seed=2), _zipf_stream(20_000, 5_000, seed=3)
+    exact = Counter(first + second)
+    left, right = SpaceSaving(100), SpaceSaving(100)
+    for key in first:
+        left.add(key)
+    for key in second:
+        right.add(key)
+
+    merged = SpaceSaving.from_state(left.to_state()).merge(right)
+    assert len(merged) == 100 and merged.total == 40_000
+    assert merged.error_bound() <= merged.total / 100 * 2
+    for key, count in merged.most_common():
+        assert count - merged.errors[key] <= exact[key] <= count
+    assert merged.most_common(3)[0][0] == exact.most_common(1)[0][0]
+
+
+def test_exact_counter_shares_the_interface():
+    counter = ExactCounter()
+    counter.add("a")
+    counter.add("a")
+    counter.merge(ExactCounter.from_state({"counts": {"b": 5}}))
+    assert counter.most_common() == [("b", 5), ("a", 2)]
+    assert counter.error_bound() == 0
@@ -0,0 +1,106 @@
+import os
+import time
+from concurrent.futures import TimeoutError as FutureTimeout
+
+import pytest
+
+from deceptgold.helper.notify.inference_worker import InferenceUnavailable, InferenceWorker, normalize_analysis
+
+
+def _echo_worker(model_path, n_ctx, n_threads, jobs, results):
+    results.put(("__ready__", True, None))
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        job_id, prompt, timeout, max_tokens = job
+        if prompt == "hang":
+            time.sleep(60)
+        results.put((job_id, True, f"[LOW] {prompt} pid={os.getpid()}"))
+
+
+def _broken_worker(model_path, n_ctx, n_threads, jobs, results):
+    results.put(("__ready__", False, "model file is corrupt"))
+
+
+def _flaky_worker(model_path, n_ctx, n_threads, jobs, results):
+    # Fails the first load (the marker file does not exist yet), then behaves like _echo_worker.
+    if not os.path.exists(model_path):
+        open(model_path, "w").close()
+        results.put(("__ready__", False, "model file is still being downloaded"))
+        return
+    _echo_worker(model_path, n_ctx, n_threads, jobs, results)
+
+
+@pytest.fixture
+def make_worker():
+    workers = []
+
+    def factory(model_path="model.gguf", **kwargs):
+        worker = InferenceWorker(model_path, load_timeout=20, **kwargs).start()
+        workers.append(worker)
+        return worker
+
+    yield factory
+    for worker in workers:
+        worker.stop()
+
+
+def test_normalize_analysis():
+    assert normalize_analysis("noise\n[HIGH] brute force - Action: block") == "[HIGH] brute force - Action: block"
+    assert normalize_analysis("plain analysis text") == "[MEDIUM] plain analysis text"
+    assert normalize_analysis("short") is None
+    assert normalize_analysis(None) is None
+
+
+def test_worker_serves_many_jobs_from_one_process(make_worker):
+    worker = make_worker(target=_echo_worker)
+    futures = [worker.submit(f"job {i}") for i in range(5)]
+    results = [future.result(timeout=20) for future in futures]
+
+    assert [r.split(" pid=")[0] for r in results] == [f"[LOW] job {i}" for i in range(5)]
+    assert len({r.split(" pid=")[1] for r in results}) == 1
+    assert worker.stats["completed"] == 5
+
+
+def test_worker_bounds_pending_jobs(make_worker):
+    worker = make_worker(target=_echo_worker, max_pending=1, job_timeout=30)
+    first = worker.submit("hang")
+    second = worker.submit("quick")
+
+    with pytest.raises(InferenceUnavailable):
+        second.result(timeout=1)
+    assert not first.done()
+    assert worker.stats["rejected"] == 1
+
+
+def test_worker_times_out_and_restarts_stuck_model(make_worker):
+    worker = make_worker(target=_echo_worker, job_timeout=0.5)
+    assert worker.infer("warm up")
+
+    with pytest.raises(FutureTimeout):
+        worker.submit("hang").result(timeout=10)
+
+    deadline = time.monotonic() + 10
+    while worker._process.is_alive() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert worker.infer("after restart", timeout=20).startswith("[LOW] after restart")
+    assert worker.stats["restarts"] == 1
+
+
+def test_worker_reports_model_load_failure(make_worker):
+    worker = make_worker(target=_broken_worker)
+    assert worker.infer("anything") is None
+    with pytest.raises(InferenceUnavailable):
+        worker.submit("again").result(timeout=1)
+
+
+def test_worker_retries_a_failed_model_load_after_a_backoff(make_worker, tmp_path):
+    worker = make_worker(model_path=str(tmp_path / "marker"), target=_flaky_worker, load_retry=0.5)
+    assert worker.infer("first") is None
+    with pytest.raises(InferenceUnavailable):
+        worker.submit("during backoff").result(timeout=1)
+
+    time.sleep(0.6)
+    assert worker.infer("after backoff", timeout=20).startswith("[LOW] after backoff")
+    assert worker.stats["restarts"] == 1
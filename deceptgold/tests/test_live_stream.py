@@ -0,0 +1,102 @@
+import io
+import json
+
+from deceptgold.helper.live_stream import LiveAggregator, event_severity, serve_event_stream
+
+
+def _append(path, *events):
+    with open(path, "a", encoding="utf-8") as f:
+        for evt in events:
+            f.write(json.dumps(evt) + "\n")
+
+
+def _ssh(src, username="root"):
+    return {"logtype": 4002, "src_host": src, "local_time": "2026-10-18 10:00:00.000000",
+            "logdata": {"USERNAME": username, "PASSWORD": "<b>x</b>"}}
+
+
+class _Handler:
+    def __init__(self, last_event_id=None):
+        self.headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+        self.wfile = io.BytesIO()
+        self.status = None
+
+    def send_response(self, status):
+        self.status = status
+
+    def send_header(self, name, value):
+        pass
+
+    def end_headers(self):
+        pass
+
+
+def _frames(raw):
+    frames = []
+    for block in raw.decode("utf-8").split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line and line[0] != ":")
+        if "event" in fields:
+            frames.append((fields["event"], fields.get("id"), json.loads(fields["data"])))
+    return frames
+
+
+def test_severity_prefers_the_event_field_over_the_logtype():
+    assert event_severity({"logtype": 5000, "severity": "critical"}) == "high"
+    assert event_severity({"logtype": 1001}) == "info"
+    assert event_severity({"logtype": "bogus"}) == "low"
+
+
+def test_existing_log_is_a_snapshot_and_appends_become_deltas(tmp_path):
+    log = tmp_path / "opencanary.log"
+    _append(log, _ssh("203.0.113.1"), _ssh("203.0.113.1"))
+    aggregator = LiveAggregator(log, use_inotify=False).start()
+    assert aggregator.ready.wait(5)
+    assert aggregator.snapshot()["totalEvents"] == 2 and aggregator.seq == 0
+
+    _append(log, _ssh("198.51.100.7"), {"logtype": 1001, "src_host": "203.0.113.1"})
+    deltas = aggregator.deltas_after(0, timeout=5)
+    aggregator.stop()
+
+    # Deltas carry the running totals, not increments.
+    seq, delta = deltas[0]
+    assert seq == 1 and delta["totalEvents"] == 4 and delta["uniqueIPs"] == 2
+    assert delta["severityCounts"] == {"medium": 3, "info": 1}
+    assert [incident["srcHost"] for incident in delta["incidents"]] == ["198.51.100.7", "203.0.113.1"]
+    assert delta["incidents"][0]["credentials"] == " | Credentials: root/&lt;b&gt;x&lt;/b&gt;"
+
+    snapshot = aggregator.snapshot()
+    assert snapshot["uniqueIPs"] == 2 and len(snapshot["incidents"]) == 4
+
+
+def test_source_table_is_bounded(tmp_path):
+    log = tmp_path / "opencanary.log"
+    _append(log, *(_ssh(f"203.0.113.{n}") for n in range(10)), _ssh("203.0.113.9"))
+    aggregator = LiveAggregator(log, use_inotify=False, max_sources=4).start()
+    assert aggregator.ready.wait(5)
+    aggregator.stop()
+
+    assert len(aggregator._sources) == 4
+    assert aggregator.snapshot()["uniqueIPs"] == 10
+
+
+def test_stream_replays_from_last_event_id_or_resets_with_a_snapshot(tmp_path):
+    log = tmp_path / "opencanary.log"
+    log.touch()
+    aggregator = LiveAggregator(log, history=2, use_inotify=False).start()
+    assert aggregator.ready.wait(5)
+    for n in range(3):
+        _append(log, _ssh(f"203.0.113.{n}"))
+        assert aggregator.deltas_after(n, timeout=5)
+    aggregator.stop()
+
+    handler = _Handler(last_event_id="1")
+    serve_event_stream(handler, aggregator, keepalive=0.1)
+    assert handler.status == 200
+    assert [(event, event_id) for event, event_id, _ in _frames(handler.wfile.getvalue())] == \
+        [("delta", "2"), ("delta", "3")]
+
+    # Delta 1 has left the ring of 2: the client starts over from a snapshot.
+    handler = _Handler(last_event_id="0")
+    serve_event_stream(handler, aggregator, keepalive=0.1)
+    (event, event_id, data), = _frames(handler.wfile.getvalue())
+    assert (event, event_id, data["totalEvents"]) == ("snapshot", "3", 3)
@@ -0,0 +1,130 @@
+import json
+
+from deceptgold.helper import log_aggregate
+from deceptgold.helper.log_aggregate import aggregate_log, load_checkpoint
+
+
+def _event(i, src="203.0.113.7"):
+    return json.dumps({
+        "logtype": 3001 if i % 2 else 4000,
+        "src_host": src,
+        "dst_port": 80,
+        "local_time": f"2025-01-01 10:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+        "logdata": {"USERNAME": "admin", "PATH": f"/p{i % 3}"},
+    }) + "\n"
+
+
+def _write(path, lines, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def test_incremental_run_matches_full_aggregation(tmp_path, monkeypatch):
+    log, state = tmp_path / "events.log", tmp_path / "state.json"
+    _write(log, [_event(i) for i in range(100)], "w")
+    first = aggregate_log(log, state)
+    assert first.total == 100
+
+    _write(log, [_event(i, "198.51.100.1") for i in range(100, 150)])
+    parsed = []
+    original = log_aggregate.parse_event
+    monkeypatch.setattr(log_aggregate, "parse_event", lambda line: parsed.append(line) or original(line))
+    resumed = aggregate_log(log, state).result()
+    assert len(parsed) == 50
+
+    full = aggregate_log(log, None).result()
+    for key in ("total_events", "time_range", "top_sources", "top_paths", "top_logtypes"):
+        assert resumed[key] == full[key]
+    assert resumed["total_events"] == 150
+    assert len(resumed["event_samples"]) == log_aggregate.SAMPLE_LIMIT
+
+
+def test_unterminated_line_is_not_checkpointed(tmp_path):
+    log, state = tmp_path / "events.log", tmp_path / "state.json"
+    _write(log, [_event(0), _event(1).rstrip("\n")], "w")
+    assert aggregate_log(log, state).total == 2
+    _write(log, ["\n", _event(2)])
+    assert aggregate_log(log, state).total == 3
+
+
+def test_truncated_or_replaced_log_is_rebuilt(tmp_path):
+    log, state = tmp_path / "events.log", tmp_path / "state.json"
+    _write(log, [_event(i) for i in range(20)], "w")
+    aggregate_log(log, state)
+
+    _write(log, [_event(i) for i in range(5)], "w")
+    assert load_checkpoint(state, log) == (None, 0)
+    assert aggregate_log(log, state).total == 5
+
+    rotated = tmp_path / "new.log"
+    _write(rotated, [_event(i, "192.0.2.9") for i in range(30)], "w")
+    rotated.replace(log)
+    result = aggregate_log(log, state).result()
+    assert result["total_events"] == 30
+    assert result["top_sources"] == [{"value": "192.0.2.9", "count": 30}]
+
+
+def test_rebuild_ignores_checkpoint(tmp_path):
+    log, state = tmp_path / "events.log", tmp_path / "state.json"
+    _write(log, [_event(i) for i in range(10)], "w")
+    aggregate_log(log, state)
+    assert aggregate_log(log, state, incremental=False).total == 10
+    assert aggregate_log(log, state).total == 10
+
+
+def test_split_ranges_are_newline_aligned_and_cover_the_range(tmp_path):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i) for i in range(50)], "w")
+    size = log.stat().st_size
+    data = log.read_bytes()
+    ranges = log_aggregate.split_ranges(log, 0, size, 7)
+    assert ranges[0][0] == 0 and ranges[-1][1] == size
+    assert all(a < b for a, b in ranges)
+    assert all(data[a - 1:a] == b"\n" for a, _ in ranges[1:])
+    assert sum(log_aggregate.aggregate_range(log, a, b).total for a, b in ranges) == 50
+
+
+def test_parallel_aggregation_matches_sequential(tmp_path, monkeypatch):
+    log = tmp_path / "events.log"
+    _write(log, [_event(i, f"10.0.0.{i % 13}") for i in range(400)] + [_event(400).rstrip("\n")], "w")
+    monkeypatch.setattr(log_aggregate, "PARALLEL_MIN_BYTES", 1)
+
+    parallel = aggregate_log(log, tmp_path / "state.json", workers=3).result()
+    sequential = aggregate_log(log, None).result()
+    assert parallel["total_events"] == sequential["total_events"] == 401
+    assert parallel["time_range"] == sequential["time_range"]
+    for key in ("top_sources", "top_paths", "top_logtypes", "top_usernames"):
+        assert sorted(map(str, parallel[key])) == sorted(map(str, sequential[key]))
+    assert len(parallel["event_samples"]) == log_aggregate.SAMPLE_LIMIT
+
+
+def test_merged_reservoirs_stay_uniform():
+    random = log_aggregate.random
+    random.seed(7)
+    hits_a = 0
+    rounds = 2000
+    for _ in range(rounds):
+        # Stream A has 300 events, stream B 100: a uniform sample of the union holds 75% of A's events on average.
+        merged = log_aggregate.merge_reservoirs(["a"] * 4, 300, ["b"] * 4, 100, 4)
+        hits_a += merged.count("a")
+    assert abs(hits_a / (rounds * 4) - 0.75) < 0.02
+    assert sorted(log_aggregate.merge_reservoirs(["a"], 1, ["b", "c"], 2, 4)) == ["a", "b", "c"]
+
+
+def test_approximate_mode_reports_error_bounds_and_checkpoints(tmp_path):
+    log, state = tmp_path / "events.log", tmp_path / "state.json"
+    _write(log, [_event(i, "198.51.100.1" if i % 2 else f"10.1.{i // 256}.{i % 256}") for i in range(3000)], "w")
+
+    result = aggregate_log(log, state, approximate=50).result()
+    assert result["top_sources"][0] == {"value": "198.51.100.1", "count": 1500}
+    assert result["count_error_bounds"]["top_sources"]["capacity"] == 50
+    assert "top_logtypes" not in result["count_error_bounds"]
+    assert len(aggregate_log(log, None, approximate=50).counters["sources"]) == 50
+
+    _write(log, [_event(3000, "198.51.100.1")])
+    resumed = aggregate_log(log, state, approximate=50).result()
+    assert resumed["total_events"] == 3001
+    assert resumed["top_sources"][0]["value"] == "198.51.100.1"
+    # Switching back to exact counting cannot reuse the approximate checkpoint.
+    assert load_checkpoint(state, log) == (None, 0)
+    assert "count_error_bounds" not in aggregate_log(log, state).result()
@@ -0,0 +1,131 @@
+import os
+import threading
+import time
+
+import pytest
+
+from deceptgold.helper.log_follower import FollowerCursor, LogFollower, open_follower
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_starts_after_the_last_complete_line_and_keeps_partial_lines(tmp_path, use_inotify):
+    log = tmp_path / "events.log"
+    _append(log, '{"old": 1}\n{"half": ')
+    with LogFollower(log, poll_interval=0.01, use_inotify=use_inotify) as follower:
+        assert follower.poll() == []
+        _append(log, '1}\n{"a": 1}\n{"b"')
+        assert follower.poll() == ['{"half": 1}', '{"a": 1}']
+        _append(log, ': 2}\n')
+        assert follower.poll() == ['{"b": 2}']
+        assert follower.offset == log.stat().st_size
+
+
+def test_rotation_finishes_the_old_file_before_the_new_one(tmp_path):
+    log = tmp_path / "events.log"
+    _append(log, "")
+    with LogFollower(log, use_inotify=False) as follower:
+        follower.poll()
+        _append(log, "1\n2\n")
+        os.replace(log, tmp_path / "events.log.1")
+        _append(log, "3\n")
+        assert follower.poll() == ["1", "2", "3"]
+        _append(log, "4\n")
+        assert follower.poll() == ["4"]
+
+
+def test_truncated_log_is_read_again_from_the_start(tmp_path):
+    log = tmp_path / "events.log"
+    _append(log, "1\n2\n")
+    with LogFollower(log, start="start", use_inotify=False) as follower:
+        assert follower.poll() == ["1", "2"]
+        with open(log, "w", encoding="utf-8") as f:
+            f.write("3\n")
+        assert follower.poll() == ["3"]
+
+
+def test_missing_log_is_read_from_its_start_once_created(tmp_path):
+    log = tmp_path / "events.log"
+    with LogFollower(log, use_inotify=False) as follower:
+        assert follower.poll() == []
+        _append(log, "1\n")
+        assert follower.poll() == ["1"]
+
+
+def test_inotify_wakes_the_follower_on_write(tmp_path):
+    log = tmp_path / "events.log"
+    _append(log, "")
+    with LogFollower(log) as follower:
+        if not follower.event_driven:
+            pytest.skip("inotify is not available")
+        follower.poll()
+        threading.Timer(0.05, _append, (log, "1\n")).start()
+        started = time.monotonic()
+        follower.wait(timeout=5)
+        assert time.monotonic() - started < 2
+        assert follower.poll() == ["1"]
+
+
+def _consume(follower, cursor):
+    lines = []
+    for line, position in follower.poll_entries():
+        lines.append(line)
+        cursor.advance(line, position)
+    return lines
+
+
+def test_checkpoint_resumes_after_the_last_committed_line(tmp_path):
+    log = tmp_path / "events.log"
+    cursor = FollowerCursor("ai", directory=tmp_path / "cursors", commit_every=2, commit_interval=3600)
+    _append(log, "1\n2\n3\n")
+    with open_follower(log, start="start", use_inotify=False) as follower:
+        assert _consume(follower, cursor) == ["1", "2", "3"]
+    # Only the batch of two was written; the third line is processed again.
+    _append(log, "4\n")
+    with open_follower(log, start="checkpoint", cursor=cursor, use_inotify=False) as follower:
+        assert _consume(follower, cursor) == ["3", "4"]
+    cursor.commit()
+    with open_follower(log, start="checkpoint", cursor=cursor, use_inotify=False) as follower:
+        assert follower.poll() == []
+
+
+def test_checkpoint_finishes_a_log_rotated_while_stopped(tmp_path):
+    log = tmp_path / "events.log"
+    cursor = FollowerCursor("ai", directory=tmp_path / "cursors")
+    _append(log, "1\n")
+    with open_follower(log, start="start", use_inotify=False) as follower:
+        _consume(follower, cursor)
+    cursor.commit()
+    _append(log, "2\n")
+    os.replace(log, tmp_path / "events.log.1")
+    _append(log, "3\n")
+    with open_follower(log, start="checkpoint", cursor=cursor, use_inotify=False) as follower:
+        assert follower.poll() == ["2", "3"]
+
+
+def test_checkpoint_of_a_replaced_log_reads_it_from_the_start(tmp_path):
+    log = tmp_path / "events.log"
+    cursor = FollowerCursor("ai", directory=tmp_path / "cursors")
+    _append(log, "1\n2\n")
+    with open_follower(log, start="start", use_inotify=False) as follower:
+        _consume(follower, cursor)
+    cursor.commit()
+    with open(log, "w", encoding="utf-8") as f:
+        f.write("3\n4\n")
+    with open_follower(log, start="checkpoint", cursor=cursor, use_inotify=False) as follower:
+        assert follower.poll() == ["3", "4"]
+
+
+def test_backlog_is_returned_in_batches(tmp_path):
+    log = tmp_path / "events.log"
+    _append(log, "".join(f"{i}\n" for i in range(1000)))
+    with LogFollower(log, start="start", read_size=256, use_inotify=False) as follower:
+        first = follower.poll(max_bytes=512)
+        assert first and not follower.caught_up
+        rest = follower.poll()
+        assert follower.caught_up
+        assert first + rest == [str(i) for i in range(1000)]
@@ -0,0 +1,59 @@
+import json
+from urllib.request import urlopen
+
+from deceptgold.helper import metrics
+from deceptgold.helper.metrics import MetricsRegistry, stats_collector
+
+
+def test_counter_and_histogram_render_prometheus_text():
+    registry = MetricsRegistry()
+    events = registry.counter("dg_events", "Events.", ("kind",))
+    latency = registry.histogram("dg_latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    events.inc(kind="ssh")
+    events.inc(2, kind="ssh")
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value)
+
+    text = registry.render_prometheus()
+    assert "# HELP dg_events_total Events." in text and "# TYPE dg_events_total counter" in text
+    assert 'dg_events_total{kind="ssh"} 3' in text
+    assert 'dg_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'dg_latency_seconds_bucket{le="1.0"} 2' in text
+    assert 'dg_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "dg_latency_seconds_count 3" in text
+    assert registry.counter("dg_events", "Events.", ("kind",)) is events
+
+
+def test_stats_collector_and_json_snapshot():
+    registry = MetricsRegistry()
+    registry.register_collector(stats_collector(
+        "dg_notify", "Channel", lambda: {"slack": {"sent": 4, "depth": 1}, "discord": {"sent": 2, "depth": 0}},
+        counters=("sent",), gauges=("depth",), label="channel"))
+    registry.register_collector(lambda: 1 / 0)
+    latency = registry.histogram("dg_send_seconds", "Send.", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+
+    text = registry.render_prometheus()
+    assert 'dg_notify_sent_total{channel="slack"} 4' in text
+    assert 'dg_notify_depth{channel="discord"} 0' in text
+
+    snapshot = registry.snapshot()
+    assert {"labels": {"channel": "slack"}, "value": 4} in snapshot["dg_notify_sent"]
+    assert snapshot["dg_send_seconds"][0]["count"] == 1
+    assert snapshot["dg_send_seconds"][0]["p50"] == 0.1
+
+
+def test_metrics_server_serves_text_and_json():
+    registry = MetricsRegistry()
+    registry.counter("dg_up", "Up.").inc()
+    server = metrics.start_metrics_server("127.0.0.1", 0, registry=registry)
+    try:
+        assert metrics.start_metrics_server("127.0.0.1", 0, registry=registry) is server
+        port = server.server_address[1]
+        with urlopen(f"http://127.0.0.1:{port}/metrics", timeout=2) as response:
+            assert "dg_up_total 1" in response.read().decode()
+        assert metrics.read_metrics("127.0.0.1", port)["dg_up"] == [{"labels": {}, "value": 1}]
+    finally:
+        server.shutdown()
+        server.server_close()
+        metrics._serve_metrics.cache_clear()
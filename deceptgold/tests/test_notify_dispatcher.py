@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from deceptgold.helper.notify.dispatcher import Channel, NotificationDispatcher
+
+
+@pytest.fixture
+def server():
+    hits = {}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with lock:
+                hits.setdefault(self.path, []).append(time.monotonic())
+                count = len(hits[self.path])
+            if self.path == "/slow":
+                time.sleep(1.5)
+            status = 503 if self.path == "/flaky" and count <= 2 else 404 if self.path == "/gone" else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", hits
+    httpd.shutdown()
+
+
+def _channel(name, url, **kwargs):
+    return Channel(name, lambda message, fingerprint, parse_mode: (url, {"json": {"msg": message}}),
+                   backoff_base=0.01, **kwargs)
+
+
+def test_slow_channel_does_not_delay_the_others(server):
+    base, hits = server
+    dispatcher = NotificationDispatcher([_channel("slow", f"{base}/slow"), _channel("fast", f"{base}/fast")]).start()
+    started = time.monotonic()
+    assert dispatcher.dispatch("hello") == ["slow", "fast"]
+    assert time.monotonic() - started < 0.5
+
+    deadline = time.monotonic() + 5
+    while not hits.get("/fast") and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert hits["/fast"][0] - started < 1.0
+
+    assert dispatcher.flush(10)
+    assert dispatcher.stats()["slow"]["sent"] == 1
+    dispatcher.stop()
+
+
+def test_retries_with_backoff_and_isolates_failures(server):
+    base, hits = server
+    dispatcher = NotificationDispatcher([
+        _channel("flaky", f"{base}/flaky"),
+        _channel("gone", f"{base}/gone"),
+        _channel("ok", f"{base}/ok"),
+        Channel("unconfigured", lambda message, fingerprint, parse_mode: None),
+    ]).start()
+
+    assert dispatcher.dispatch("hello") == ["flaky", "gone", "ok"]
+    assert dispatcher.flush(10)
+    stats = dispatcher.stats()
+
+    assert len(hits["/flaky"]) == 3
+    assert stats["flaky"]["sent"] == 1 and stats["flaky"]["retried"] == 2
+    assert len(hits["/gone"]) == 1 and stats["gone"]["failed"] == 1
+    assert stats["ok"]["sent"] == 1
+    dispatcher.stop()
+
+
+def test_full_channel_queue_drops_oldest(server):
+    base, _ = server
+    dispatcher = NotificationDispatcher([_channel("slow", f"{base}/slow", queue_size=1)]).start()
+    for i in range(4):
+        dispatcher.dispatch(f"event {i}")
+    assert dispatcher.flush(10)
+    stats = dispatcher.stats()["slow"]
+    assert stats["dropped"] >= 1
+    assert stats["sent"] + stats["dropped"] == 4
+    dispatcher.stop()
+
+
+def test_dispatch_drops_when_the_loop_is_not_running(server, monkeypatch):
+    base, hits = server
+    dispatcher = NotificationDispatcher([_channel("ok", f"{base}/ok")]).start()
+    dispatcher.stop()
+    assert dispatcher.dispatch("after exit") == []
+
+    def broken_loop():
+        raise RuntimeError("no event loop")
+
+    monkeypatch.setattr(asyncio, "new_event_loop", broken_loop)
+    dispatcher = NotificationDispatcher([_channel("ok", f"{base}/ok")])
+    assert dispatcher.dispatch("no loop") == []
+    assert not hits
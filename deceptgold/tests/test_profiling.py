@@ -0,0 +1,63 @@
+import json
+import os
+import signal
+import tracemalloc
+
+import pytest
+
+from deceptgold.helper.profiling import RequestProfiler, install_signal_handlers
+
+
+def test_disabled_profiler_samples_nothing():
+    profiler = RequestProfiler(sample_every=1)
+    assert profiler.begin("/") is None
+    assert not profiler.samples
+
+
+def test_samples_one_request_in_n_into_ring_buffer():
+    profiler = RequestProfiler(sample_every=3, capacity=4)
+    profiler.enable()
+    try:
+        for i in range(30):
+            token = profiler.begin(f"/r{i}")
+            if token is not None:
+                profiler.end(token)
+    finally:
+        profiler.disable()
+
+    assert profiler.requests == 30
+    assert [sample["context"] for sample in profiler.samples] == ["/r20", "/r23", "/r26", "/r29"]
+    assert "heap_delta_kb" in profiler.samples[0]
+    assert not tracemalloc.is_tracing()
+
+
+def test_dump_writes_report(tmp_path):
+    profiler = RequestProfiler(sample_every=1)
+    profiler.enable()
+    try:
+        profiler.end(profiler.begin("/login"))
+        path = profiler.dump(str(tmp_path / "profile.json"))
+    finally:
+        profiler.disable()
+
+    report = json.loads(open(path).read())
+    assert report["enabled"] is True
+    assert report["samples"][0]["context"] == "/login"
+    assert report["wall_ms"]["max"] >= 0
+    assert report["top_allocations"]
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="POSIX signals only")
+def test_sigusr1_toggles_profiling():
+    previous = signal.getsignal(signal.SIGUSR1), signal.getsignal(signal.SIGUSR2)
+    profiler = RequestProfiler()
+    try:
+        assert install_signal_handlers(profiler)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert profiler.enabled
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert not profiler.enabled
+    finally:
+        signal.signal(signal.SIGUSR1, previous[0])
+        signal.signal(signal.SIGUSR2, previous[1])
+        profiler.disable()
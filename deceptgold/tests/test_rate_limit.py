@@ -0,0 +1,78 @@
+from deceptgold.helper.rate_limit import SourceRateLimiter, TokenBucket, source_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_token_bucket_refills_at_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert bucket.delay() == 0.5
+
+    clock.now += 0.5
+    assert bucket.try_acquire()
+    clock.now += 10
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+
+
+def test_token_bucket_block_for_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=100, capacity=5, clock=clock)
+    bucket.block_for(3)
+    assert bucket.delay() == 3
+    clock.now += 2.9
+    assert not bucket.try_acquire()
+    clock.now += 0.2
+    assert bucket.try_acquire()
+
+
+def test_source_key_aggregation():
+    assert source_key("198.51.100.7") == "198.51.100.7"
+    assert source_key("198.51.100.7", ipv4_prefix=24) == "198.51.100.0/24"
+    assert source_key("198.51.100.7", ipv4_prefix=16) == "198.51.0.0/16"
+    assert source_key("::ffff:198.51.100.7", ipv4_prefix=24) == "198.51.100.0/24"
+    assert source_key("2001:db8:1:2:3:4:5:6", ipv6_prefix=64) == "2001:db8:1:2::/64"
+    assert source_key("2001:db8::1") == "2001:db8::1"
+
+
+def test_source_limiter_rejects_over_rate_and_refills():
+    clock = FakeClock()
+    limiter = SourceRateLimiter(rate=3, window=1, clock=clock)
+    assert [limiter.allow("10.0.0.1") for _ in range(4)] == [True, True, True, False]
+    assert limiter.allow("10.0.0.2")
+
+    clock.now += 0.4
+    assert limiter.allow("10.0.0.1")
+    assert not limiter.allow("10.0.0.1")
+    assert limiter.stats()["rejected"] == 2
+    assert limiter.stats()["allowed"] == 5
+
+
+def test_source_limiter_aggregates_subnets():
+    limiter = SourceRateLimiter(rate=2, window=1, ipv4_prefix=24, clock=FakeClock())
+    assert limiter.allow("10.0.0.1") and limiter.allow("10.0.0.2")
+    assert not limiter.allow("10.0.0.3")
+    assert limiter.allow("10.0.1.1")
+
+
+def test_source_limiter_is_memory_bounded():
+    clock = FakeClock()
+    limiter = SourceRateLimiter(rate=1, window=1, max_sources=1000, ttl=60, clock=clock)
+    for i in range(50_000):
+        limiter.allow(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}")
+    stats = limiter.stats()
+    assert stats["tracked"] == 1000
+    assert stats["evicted"] == 49_000
+
+    clock.now += 120
+    for i in range(10):
+        limiter.allow(f"192.0.2.{i}")
+    assert limiter.stats()["tracked"] < 1000
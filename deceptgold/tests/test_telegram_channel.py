@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+import pytest
+
+from deceptgold.helper.notify.dispatcher import NotificationDispatcher
+from deceptgold.helper.notify.telegram_channel import PendingMessage, TelegramChannel, build_digest
+
+
+@pytest.fixture
+def bot_api():
+    received = []
+    state = {"throttle": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode()
+            if state["throttle"] > 0:
+                state["throttle"] -= 1
+                payload = json.dumps({"ok": False, "error_code": 429, "parameters": {"retry_after": 1}}).encode()
+                self.send_response(429)
+            else:
+                received.append((time.monotonic(), parse_qs(body)["text"][0]))
+                payload = b'{"ok": true}'
+                self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/sendMessage", received, state
+    httpd.shutdown()
+
+
+def _dispatcher(url, **kwargs):
+    channel = TelegramChannel(lambda message, fingerprint, parse_mode: (url, {"data": {"chat_id": 42, "text": message}}),
+                              backoff_base=0.01, **kwargs)
+    return NotificationDispatcher([channel]).start(), channel
+
+
+def _event(i, attack_type="brute_force_login"):
+    return {"attack_type": attack_type, "src_host": f"203.0.113.{i % 3}"}
+
+
+def test_burst_is_coalesced_into_a_digest(bot_api):
+    url, received, _ = bot_api
+    dispatcher, channel = _dispatcher(url, chat_rate=2.0)
+    dispatcher.dispatch("attack 0", event=_event(0, "port_scan"))
+    time.sleep(0.2)
+    for i in range(1, 30):
+        dispatcher.dispatch(f"attack {i}", event=_event(i, "port_scan" if i % 5 == 0 else "brute_force_login"))
+    assert dispatcher.flush(10)
+
+    assert received[0][1] == "attack 0"
+    assert len(received) == 2
+    digest = received[1][1]
+    assert "Deceptgold digest: 29 notifications" in digest
+    assert "brute_force_login: 24" in digest and "port_scan: 5" in digest
+    assert "203.0.113.1" in digest
+    assert channel.stats["coalesced"] == 29
+    dispatcher.stop()
+
+
+def test_retry_after_is_honoured_without_losing_messages(bot_api):
+    url, received, state = bot_api
+    state["throttle"] = 1
+    dispatcher, channel = _dispatcher(url, chat_rate=50.0, chat_burst=5)
+    started = time.monotonic()
+    dispatcher.dispatch("first")
+    time.sleep(0.2)
+    dispatcher.dispatch("second")
+    assert dispatcher.flush(10)
+
+    assert received[0][0] - started >= 0.9
+    assert "first" in received[0][1] and "second" in received[0][1]
+    assert channel.stats["throttled"] == 1 and channel.stats["failed"] == 0
+    dispatcher.stop()
+
+
+def test_digest_merges_folded_backlog_and_plain_messages():
+    messages = [PendingMessage("u", {"data": {"chat_id": 1, "text": f"m{i}"}}, _event(i)) for i in range(4)]
+    messages.append(PendingMessage("u", {"data": {"chat_id": 1, "text": "Deceptgold has been initialized."}}, None))
+    messages.append(PendingMessage("u", {"data": {"chat_id": 1, "text": "group"}},
+                                   {"attack_type": "port_scan", "event_count": 500, "sources": {"10.0.0.1": 500}}))
+    digest = build_digest(messages)
+
+    assert "6 notifications" in digest
+    assert "port_scan: 500" in digest and "brute_force_login: 4" in digest
+    assert "- 10.0.0.1: 500" in digest
+    assert "Deceptgold has been initialized." in digest
@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from deceptgold.helper.timestamps import KNOWN_FORMATS, TimestampParser
+
+
+def strptime_loop(value):
+    if not value:
+        return None
+    for fmt in KNOWN_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except Exception:
+            continue
+    return None
+
+
+def test_matches_strptime_on_log_layouts_and_edge_cases():
+    values = [
+        "2025-01-01 10:00:00.123456", "2025-01-01 10:00:00", "2025-01-01T10:00:00.5", "2025-01-01T23:59:59",
+        "2025-1-1 10:00:00", "2025-01-01 10:00:00.1234567", "2025-01-01 10:00:00Z", "2025-01-01T10:00:00+00:00",
+        "2025-02-30 10:00:00", "2025-01-01 10:00:00.", " 2025-01-01 10:00:00", "2025-W01-1 10:00:00",
+        "20250101T100000", "garbage", "", None, 1735725600,
+    ]
+    parser = TimestampParser()
+    for value in values:
+        assert parser.parse(value) == strptime_loop(value), value
+
+
+def test_slow_path_remembers_the_last_format():
+    parser = TimestampParser()
+    assert parser.parse("2025-1-1T10:00:00") == datetime(2025, 1, 1, 10)
+    assert parser.formats[0] == "%Y-%m-%dT%H:%M:%S"
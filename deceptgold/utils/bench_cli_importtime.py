@@ -0,0 +1,62 @@
+"""
+Startup import profile of the CLI, based on ``python -X importtime``.
+
+Prints the total import time and the heaviest top-level imports for a given command line, and fails (exit code 1)
+when one of the modules that must stay lazy gets imported, or when --max-ms is exceeded.
+
+Usage: PYTHONPATH=src python utils/bench_cli_importtime.py [--max-ms N] [--top N] -- service status
+"""
+import argparse
+import re
+import subprocess
+import sys
+
+# Heavy dependencies that must only be imported by the commands that use them.
+LAZY_MODULES = ("web3", "opencanary", "twisted", "httpx", "llama_cpp", "requests", "qrcode_terminal")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def import_profile(argv):
+    """Return a list of (module, self_us, cumulative_us, depth) for ``deceptgold <argv>``."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "deceptgold", *argv],
+                            capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    rows = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def imported_lazy_modules(rows):
+    return sorted({module.split(".")[0] for module, *_ in rows if module.split(".")[0] in LAZY_MODULES})
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("command", nargs="*", default=["--help"])
+    args = parser.parse_args()
+
+    rows = import_profile(args.command)
+    total_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+    print(f"deceptgold {' '.join(args.command)}: {len(rows)} modules, {total_ms:.1f} ms importing")
+    for module, _, cumulative_us, _ in sorted((r for r in rows if r[3] == 0), key=lambda r: -r[2])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    failed = False
+    lazy = imported_lazy_modules(rows)
+    if lazy:
+        print(f"Eagerly imported: {', '.join(lazy)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Import time {total_ms:.1f} ms exceeds the {args.max_ms:.1f} ms budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Measure the cold import of the honeypot log handler, which pulls in the reward module.
+
+Before the lazy blockchain client, that import built a Web3 provider and made several RPC calls, so every CLI
+invocation paid network round-trips (or a connect timeout). Now it must not touch the RPC or import web3 at all;
+the second measurement shows what the first reward claim pays against an unreachable endpoint instead.
+
+Usage: PYTHONPATH=src python utils/bench_cli_startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+import time
+
+IMPORT_REWARD_PATH = (
+    "import deceptgold.helper.opencanary.proxy_logger, sys;"
+    "print('web3' in sys.modules)"
+)
+
+
+def run(code):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=os.environ.copy())
+    return time.perf_counter() - started, result.stdout.strip() or result.stderr.strip().splitlines()[-1:]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    timings = []
+    for _ in range(runs):
+        elapsed, output = run(IMPORT_REWARD_PATH)
+        timings.append(elapsed)
+    timings.sort()
+    print(f"import proxy_logger: median {timings[len(timings) // 2] * 1000:.0f} ms, "
+          f"max {timings[-1] * 1000:.0f} ms over {runs} runs (web3 imported: {output})")
+
+    started = time.perf_counter()
+    from deceptgold.helper.blockchain.client import BlockchainClient
+    status = BlockchainClient(rpc_url="http://10.255.255.1:8545", timeout=2).health_check()
+    print(f"health_check against unreachable RPC: connected={status['connected']} in "
+          f"{(time.perf_counter() - started) * 1000:.0f} ms ({status['error']})")
+
+
+if __name__ == "__main__":
+    main()
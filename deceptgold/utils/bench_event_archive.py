@@ -0,0 +1,62 @@
+"""
+Benchmark for the columnar event archive: top sources of a time window from the JSONL log versus the archive.
+
+Usage: PYTHONPATH=src python utils/bench_event_archive.py [lines]
+"""
+import json
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+from deceptgold.helper.event_archive import EventArchive
+from deceptgold.helper.log_aggregate import event_timestamp, parse_event
+
+
+def write_log(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(json.dumps({
+                "dst_host": "10.0.0.5", "dst_port": 22 if i % 3 else 80, "logtype": 4002 if i % 3 else 3001,
+                "local_time": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+                "logdata": {"USERNAME": f"user{i % 500}", "PASSWORD": "hunter2"},
+                "node_id": "opencanary-1", "src_host": f"203.0.{i % 256}.{i * 7 % 256}", "src_port": 51234}) + "\n")
+
+
+def scan_json(path, since, until):
+    counts = Counter()
+    with open(path, "rb") as f:
+        for line in f:
+            evt = parse_event(line)
+            ts = evt and event_timestamp(evt)
+            if ts and since <= ts < until:
+                counts[evt.get("src_host")] += 1
+    return counts.most_common(10)
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    since, until = datetime(2025, 1, 1, 6), datetime(2025, 1, 1, 12)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "events.log"
+        write_log(log, lines)
+        archive = EventArchive(Path(tmp) / "archive")
+
+        started = time.perf_counter()
+        expected = scan_json(log, since, until)
+        print(f"json scan      {time.perf_counter() - started:8.3f} s")
+
+        started = time.perf_counter()
+        archive.compact(log)
+        print(f"compaction     {time.perf_counter() - started:8.3f} s  (once per closed segment)")
+
+        started = time.perf_counter()
+        result = archive.top("src_host", since=since, until=until)
+        print(f"archive query  {time.perf_counter() - started:8.3f} s")
+        assert [count for _, count in result] == [count for _, count in expected]
+
+
+if __name__ == "__main__":
+    main()
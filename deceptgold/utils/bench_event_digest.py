@@ -0,0 +1,44 @@
+"""
+Micro-benchmark for the per-event dedup digest and the reward path that uses it (skip rules, then digest).
+
+Usage: PYTHONPATH=src python utils/bench_event_digest.py [iterations]
+"""
+import json
+import sys
+import timeit
+
+from deceptgold.helper.blockchain.token import reward_skip_reason
+from deceptgold.helper.digest import event_digest
+
+
+SAMPLE_EVENT = json.dumps({
+    "dst_host": "10.0.0.5", "dst_port": 22, "local_time": "2025-01-01 12:00:00.000000",
+    "local_time_adjusted": "2025-01-01 09:00:00.000000", "logdata": {
+        "LOCALVERSION": "SSH-2.0-OpenSSH_5.1p1 Debian-4", "PASSWORD": "hunter2",
+        "REMOTEVERSION": "SSH-2.0-libssh2_1.9.0", "USERNAME": "root"},
+    "logtype": 4002, "node_id": "opencanary-1", "src_host": "203.0.113.7", "src_port": 51234,
+    "utc_time": "2025-01-01 12:00:00.000000"})
+
+
+def legacy(raw):
+    return hash(json.dumps(json.loads(raw), sort_keys=True))
+
+
+def reward_path(raw):
+    return reward_skip_reason(raw) or event_digest(raw)
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    cases = {
+        "legacy json.loads + dumps(sort_keys) + hash": lambda: legacy(SAMPLE_EVENT),
+        "event_digest(raw)": lambda: event_digest(SAMPLE_EVENT),
+        "reward_skip_reason + event_digest": lambda: reward_path(SAMPLE_EVENT),
+    }
+    for label, fn in cases.items():
+        seconds = min(timeit.repeat(fn, number=iterations, repeat=3))
+        print(f"{label:<45} {seconds / iterations * 1e9:8.0f} ns/event")
+
+
+if __name__ == "__main__":
+    main()
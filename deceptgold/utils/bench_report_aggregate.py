@@ -0,0 +1,44 @@
+"""
+Benchmark for the report log aggregation: sequential versus process pool on a synthetic honeypot log.
+
+Usage: PYTHONPATH=src python utils/bench_report_aggregate.py [lines] [workers]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from deceptgold.helper.log_aggregate import aggregate_log
+
+
+def write_log(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(json.dumps({
+                "dst_host": "10.0.0.5", "dst_port": 22 if i % 3 else 80, "logtype": 4002 if i % 3 else 3001,
+                "local_time": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+                "local_time_adjusted": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000",
+                "logdata": {"USERNAME": f"user{i % 500}", "PASSWORD": "hunter2", "PATH": f"/admin/{i % 2000}",
+                            "USERAGENT": "Mozilla/5.0"},
+                "node_id": "opencanary-1", "src_host": f"203.0.{i % 256}.{i * 7 % 256}", "src_port": 51234,
+                "utc_time": f"2025-01-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000000"}) + "\n")
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else (os.cpu_count() or 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = Path(tmp) / "events.log"
+        write_log(log, lines)
+        print(f"{lines} lines, {log.stat().st_size / 1024 / 1024:.1f} MB, {os.cpu_count()} CPUs")
+        for label, n in (("sequential", 1), (f"workers={workers}", workers)):
+            started = time.perf_counter()
+            aggregate = aggregate_log(log, state_path=None, workers=n)
+            seconds = time.perf_counter() - started
+            print(f"{label:<12} {seconds:7.2f} s  {lines / seconds:10.0f} lines/s  ({aggregate.total} events)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Benchmark for report timestamp parsing on a synthetic million-line honeypot log.
+
+Compares the previous strptime loop with helper.timestamps over the three timestamp fields of every event
+(local_time_adjusted, local_time, utc_time), as the report aggregation reads them.
+
+Usage: PYTHONPATH=src python utils/bench_timestamps.py [lines]
+"""
+import json
+import sys
+import time
+from datetime import datetime
+
+from deceptgold.helper.timestamps import TimestampParser
+
+FIELDS = ("local_time_adjusted", "local_time", "utc_time")
+
+
+def legacy_parse(value):
+    if not value:
+        return None
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%dT%H:%M:%S"):
+        try:
+            return datetime.strptime(value, fmt)
+        except Exception:
+            continue
+    return None
+
+
+def synthetic_events(lines):
+    # A mix of what the log holds: opencanary events (local_time/utc_time, no local_time_adjusted),
+    # events without fractional seconds and Web3 events with an ISO 'T' timestamp only.
+    for i in range(lines):
+        stamp = f"2025-01-{1 + i // 86400 % 28:02d} {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}"
+        kind = i % 10
+        if kind < 7:
+            event = {"local_time": f"{stamp}.{i % 1000000:06d}", "utc_time": f"{stamp}.{i % 1000000:06d}"}
+        elif kind < 9:
+            event = {"local_time_adjusted": stamp, "utc_time": stamp}
+        else:
+            event = {"utc_time": stamp.replace(" ", "T") + ".123"}
+        yield json.dumps(event)
+
+
+def run(label, parse, events):
+    started = time.perf_counter()
+    parsed = 0
+    for event in events:
+        if parse(event.get(FIELDS[0])) or parse(event.get(FIELDS[1])) or parse(event.get(FIELDS[2])):
+            parsed += 1
+    seconds = time.perf_counter() - started
+    print(f"{label:<22} {seconds:6.2f} s  {seconds / len(events) * 1e9:7.0f} ns/event  ({parsed} parsed)")
+    return seconds
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    events = [json.loads(line) for line in synthetic_events(lines)]
+    legacy = run("strptime loop", legacy_parse, events)
+    fast = run("TimestampParser", TimestampParser().parse, events)
+    print(f"speedup: {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()